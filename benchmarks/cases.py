@@ -0,0 +1,207 @@
+"""Benchmark cases.
+
+Every case runs one operation on a problem,
+and returns the wall-clock time of each of its phases in seconds, and of the whole operation as ``"total"``.
+A case returns None if it is not available for the problem in the current environment.
+"""
+
+from time import perf_counter
+
+import numpy as np
+from problems import CONSTRAINT_TYPES
+
+from compas_fd.loads import SelfweightCalculator
+from compas_fd.solvers import FDSession
+from compas_fd.solvers import LoadPathObjective
+from compas_fd.solvers import fd_constrained_newton_numpy
+from compas_fd.solvers import fd_constrained_nullspace_numpy
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_matrix_free_numpy
+from compas_fd.solvers import fd_numpy
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+class Timer:
+    """Accumulate the wall-clock time of named phases."""
+
+    def __init__(self):
+        self.times = {}
+        self._name = None
+        self._start = None
+
+    def __call__(self, name):
+        self._name = name
+        return self
+
+    def __enter__(self):
+        self._start = perf_counter()
+
+    def __exit__(self, *args):
+        self.times[self._name] = self.times.get(self._name, 0.0) + perf_counter() - self._start
+
+
+def bench_fd_numpy(problem):
+    """Time fd_numpy, and the assembly, factorization and solve of its numerical data separately."""
+    params = problem.params()
+    timer = Timer()
+
+    with timer("assembly"):
+        numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    with timer("factorization"):
+        numdata.factorize()
+    with timer("solve"):
+        b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+        numdata.solve(b)
+    with timer("total"):
+        fd_numpy(**params)
+    return timer.times
+
+
+def bench_load_cases(problem, count=12):
+    """Solve a number of load cases with one call, and with one call per load case."""
+    params = problem.params()
+    cases = np.random.default_rng(0).normal(size=(count, len(params["vertices"]), 3))
+    cases[:, :, 2] -= 1.0
+    timer = Timer()
+
+    with timer("stacked"):
+        fd_numpy(**dict(params, loads=cases))
+    with timer("sequential"):
+        for loads in cases:
+            fd_numpy(**dict(params, loads=loads))
+    timer.times["total"] = timer.times["stacked"]
+    return timer.times
+
+
+def bench_matrix_free(problem):
+    """Solve with the matrix-free operator, and with the conjugate gradient solver of the assembled matrix."""
+    params = problem.params()
+    timer = Timer()
+
+    with timer("matrix-free"):
+        fd_matrix_free_numpy(**params)
+    with timer("assembled"):
+        fd_numpy(**params, solver="cg")
+    timer.times["total"] = timer.times["matrix-free"]
+    return timer.times
+
+
+def bench_session(problem):
+    """Solve after single edits of a force density, a load and a support of a persistent session."""
+    params = problem.params()
+    vertex = params["fixed"][0]
+    timer = Timer()
+
+    with timer("construction"):
+        session = FDSession(**params)
+        session.solve()
+    with timer("forcedensity"):
+        session.set_forcedensities([0], [2.0])
+        session.solve()
+    with timer("load"):
+        session.set_loads([vertex], [[0, 0, -2.0]])
+        session.solve()
+    with timer("support"):
+        session.move_vertices([vertex], [np.add(params["vertices"][vertex], [0, 0, 1.0])])
+        session.solve()
+    timer.times["total"] = timer.times["forcedensity"] + timer.times["load"] + timer.times["support"]
+    return timer.times
+
+
+def bench_from_params(problem):
+    params = problem.params()
+    timer = Timer()
+    with timer("total"):
+        FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    return timer.times
+
+
+def bench_update_forcedensities(problem, count=10):
+    """Change the force densities of a few edges of a factorized system, and solve again."""
+    params = problem.params()
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    numdata.factorize()
+    edges = np.linspace(0, len(params["edges"]) - 1, count).astype(int)
+    b = numdata.p.take(numdata.free, axis=0) - numdata.Af.dot(numdata.xyz.take(numdata.fixed, axis=0))
+    timer = Timer()
+
+    with timer("update"):
+        numdata.update_forcedensities(edges, np.full(count, 2.0))
+    with timer("solve"):
+        numdata.solve(b)
+    timer.times["total"] = timer.times["update"] + timer.times["solve"]
+    return timer.times
+
+
+def bench_gradient(problem):
+    """Solve the equilibrium, and compute the gradient of the load path with respect to all force densities."""
+    params = problem.params()
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    timer = Timer()
+
+    with timer("forward"):
+        numdata.xyz[numdata.free] = numdata.solve(numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed]))
+    with timer("adjoint"):
+        LoadPathObjective().gradient(numdata)
+    timer.times["total"] = timer.times["forward"] + timer.times["adjoint"]
+    return timer.times
+
+
+def bench_selfweight(problem):
+    timer = Timer()
+    with timer("construction"):
+        calculator = SelfweightCalculator(problem.mesh, density=1.0)
+    with timer("evaluation"):
+        calculator(problem.vertices)
+    timer.times["total"] = timer.times["construction"] + timer.times["evaluation"]
+    return timer.times
+
+
+def bench_fd_constrained(problem, ctype, kmax=100, tol_res=1e-3, tol_disp=1e-3, damping=0.1):
+    """Time fd_constrained_numpy, with the time of its phases summed over the iterations of its history."""
+    params = problem.constrained_params(ctype)
+    if params is None:
+        return None
+    options = dict(kmax=kmax, tol_res=tol_res, tol_disp=tol_disp, damping=damping)
+    timer = Timer()
+
+    result = fd_constrained_numpy(history=True, **options, **params)
+    for info in result.history:
+        for phase, value in info.timings.items():
+            timer.times[phase] = timer.times.get(phase, 0.0) + value
+
+    # the total is timed without the instrumentation of the iterations
+    params = problem.constrained_params(ctype)
+    with timer("total"):
+        fd_constrained_numpy(**options, **params)
+    timer.times["iterations"] = len(result.history)
+    return timer.times
+
+
+def bench_fd_constrained_history(solver, problem, ctype):
+    """Run a constrained solver that reports the number of iterations in its history."""
+    params = problem.constrained_params(ctype)
+    if params is None:
+        return None
+    timer = Timer()
+    with timer("total"):
+        result = solver(history=True, **params)
+    timer.times["iterations"] = len(result.history)
+    return timer.times
+
+
+CASES = {
+    "fd_numpy": bench_fd_numpy,
+    "from_params": bench_from_params,
+    "update_forcedensities": bench_update_forcedensities,
+    "selfweight": bench_selfweight,
+    "gradient": bench_gradient,
+    "load_cases": bench_load_cases,
+    "matrix_free": bench_matrix_free,
+    "session": bench_session,
+}
+
+for _ctype in CONSTRAINT_TYPES:
+    CASES["fd_constrained_numpy[{}]".format(_ctype)] = lambda problem, ctype=_ctype: bench_fd_constrained(problem, ctype)
+    CASES["fd_constrained_nullspace_numpy[{}]".format(_ctype)] = lambda problem, ctype=_ctype: bench_fd_constrained_history(fd_constrained_nullspace_numpy, problem, ctype)
+    CASES["fd_constrained_newton_numpy[{}]".format(_ctype)] = lambda problem, ctype=_ctype: bench_fd_constrained_history(fd_constrained_newton_numpy, problem, ctype)
@@ -0,0 +1,117 @@
+import os
+
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import NurbsCurve
+from compas.geometry import NurbsSurface
+from compas.geometry import Plane
+from compas.geometry import Vector
+from compas.plugins import PluginNotInstalledError
+
+import compas_fd
+from compas_fd.constraints import Constraint
+
+GRID_SIZES = [10, 50, 100, 200, 500]
+
+MESH_FILES = ["hypar.obj", "faces.obj"]
+
+CONSTRAINT_TYPES = ["plane", "line", "vector", "frame", "circle", "curve", "surface"]
+
+
+class Problem:
+    """A form finding problem constructed from a mesh.
+
+    The corners of the mesh are fixed,
+    and all vertices are loaded with a vertical unit load.
+
+    Parameters
+    ----------
+    name : str
+        The name of the problem.
+    mesh : :class:`compas.datastructures.Mesh`
+        The mesh.
+
+    """
+
+    def __init__(self, name, mesh):
+        self.name = name
+        self.mesh = mesh
+        self.mesh.update_default_vertex_attributes(t=0.1)
+        vertex_index = mesh.vertex_index()
+        self.vertices = mesh.vertices_attributes("xyz")
+        self.fixed = [vertex_index[vertex] for vertex in mesh.vertices_where(vertex_degree=2)]
+        self.edges = [(vertex_index[u], vertex_index[v]) for u, v in mesh.edges()]
+        self.forcedensities = [1.0] * len(self.edges)
+        self.loads = [[0.0, 0.0, -1.0]] * len(self.vertices)
+        fixed = set(self.fixed)
+        self.boundary = [vertex_index[vertex] for vertex in mesh.vertices_on_boundary() if vertex_index[vertex] not in fixed]
+
+    @property
+    def size(self):
+        return len(self.vertices)
+
+    def params(self):
+        """The keyword arguments of the force density solvers."""
+        return dict(vertices=self.vertices, fixed=self.fixed, edges=self.edges, forcedensities=self.forcedensities, loads=self.loads)
+
+    def constrained_params(self, ctype):
+        """The keyword arguments of the constrained force density solver, with the non-fixed boundary vertices constrained.
+
+        The constrained vertices are also excluded from the linear solve,
+        such that they only move through the updates of their constraints.
+        Returns None if the constraint type is not available in the current environment.
+        """
+        try:
+            constraints = self.constraints(ctype)
+        except PluginNotInstalledError:
+            return None
+        params = self.params()
+        params["fixed"] = self.fixed + self.boundary
+        params["constraints"] = constraints
+        return params
+
+    def constraints(self, ctype):
+        """Construct constraints of one type for the non-fixed boundary vertices."""
+        constraints = [None] * len(self.vertices)
+        points = [self.vertices[vertex] for vertex in self.boundary]
+        if ctype in ("circle", "curve", "surface"):
+            shared = self._shared_geometry(ctype)
+        for vertex, point in zip(self.boundary, points):
+            if ctype == "plane":
+                geometry = Plane(point, [0, 0, 1])
+            elif ctype == "line":
+                geometry = Line([point[0], point[1], point[2] - 10], [point[0], point[1], point[2] + 10])
+            elif ctype == "vector":
+                geometry = Vector(0, 0, 1)
+            elif ctype == "frame":
+                geometry = Frame(point, [1, 0, 0], [0, 1, 0])
+            else:
+                geometry = shared
+            constraints[vertex] = Constraint(geometry)
+        return constraints
+
+    def _shared_geometry(self, ctype):
+        xmin, ymin, _ = [min(axis) for axis in zip(*self.vertices)]
+        xmax, ymax, _ = [max(axis) for axis in zip(*self.vertices)]
+        cx = 0.5 * (xmin + xmax)
+        cy = 0.5 * (ymin + ymax)
+        if ctype == "circle":
+            return Circle(0.5 * max(xmax - xmin, ymax - ymin), Frame([cx, cy, 0], [1, 0, 0], [0, 1, 0]))
+        if ctype == "curve":
+            return NurbsCurve.from_points([[xmin, ymin, 0], [cx, ymin, 2], [xmax, cy, 2], [xmax, ymax, 0]], degree=3)
+        xs = [xmin + (xmax - xmin) * i / 3 for i in range(4)]
+        ys = [ymin + (ymax - ymin) * j / 3 for j in range(4)]
+        controlpoints = [[[x, y, 2.0 if 0 < i < 3 and 0 < j < 3 else 0.0] for j, y in enumerate(ys)] for i, x in enumerate(xs)]
+        return NurbsSurface.from_points(controlpoints, degree_u=3, degree_v=3)
+
+
+def grid_problem(size):
+    """Construct the problem of a square grid with ``size`` faces per side."""
+    return Problem("grid-{}".format(size), Mesh.from_meshgrid(dx=10, nx=size))
+
+
+def file_problem(filename):
+    """Construct the problem of a mesh in the data folder of the package."""
+    return Problem(os.path.splitext(filename)[0], Mesh.from_obj(os.path.join(compas_fd.DATA, filename)))
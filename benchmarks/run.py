@@ -0,0 +1,116 @@
+"""Run the benchmark suite.
+
+Examples
+--------
+Run all cases on the default problems, and store the timings as a baseline::
+
+    python benchmarks/run.py --save benchmarks/baselines/local.json
+
+Run the cases of the constrained solver on the small grids, and compare with the baseline::
+
+    python benchmarks/run.py --sizes 10 50 --cases fd_constrained --compare benchmarks/baselines/local.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+import numpy
+import scipy
+from cases import CASES
+from problems import GRID_SIZES
+from problems import MESH_FILES
+from problems import file_problem
+from problems import grid_problem
+
+import compas_fd
+
+
+def run(problems, cases, repeat):
+    """Run the cases on the problems, and keep the fastest time of every phase over the repetitions."""
+    results = {}
+    for problem in problems:
+        for name in cases:
+            times = None
+            for _ in range(repeat):
+                sample = CASES[name](problem)
+                if sample is None:
+                    break
+                times = sample if times is None else {phase: min(times[phase], value) for phase, value in sample.items()}
+            key = "{}/{}".format(name, problem.name)
+            if times is None:
+                print("{:<48} {:>8} skipped".format(key, problem.size))
+                continue
+            results[key] = times
+            phases = "  ".join("{}={}".format(phase, _format(value)) for phase, value in times.items() if phase != "total")
+            print("{:<48} {:>8} {:>10}  {}".format(key, problem.size, _format(times["total"]), phases))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Report the cases of which the total time exceeds the baseline by more than the threshold."""
+    regressions = []
+    for key, times in results.items():
+        if key not in baseline:
+            continue
+        ratio = times["total"] / max(baseline[key]["total"], 1e-9)
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    for key, ratio in regressions:
+        print("REGRESSION {:<48} {:.2f}x".format(key, ratio))
+    return regressions
+
+
+def _format(value):
+    if isinstance(value, int):
+        return str(value)
+    return "{:.2f}ms".format(value * 1e3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the compas_fd benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=GRID_SIZES, help="The number of faces per side of the grid problems.")
+    parser.add_argument("--meshes", nargs="*", default=MESH_FILES, help="The mesh files of the data folder to include.")
+    parser.add_argument("--cases", nargs="*", default=None, help="Run only the cases of which the name starts with one of these prefixes.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of repetitions of every case.")
+    parser.add_argument("--save", help="Store the timings in this JSON file.")
+    parser.add_argument("--compare", help="Compare the timings with the baseline in this JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="The relative slowdown reported as a regression.")
+    args = parser.parse_args(argv)
+
+    cases = [name for name in CASES if args.cases is None or any(name.startswith(prefix) for prefix in args.cases)]
+    problems = [file_problem(filename) for filename in args.meshes]
+    problems += [grid_problem(size) for size in args.sizes]
+
+    results = run(problems, cases, args.repeat)
+
+    if args.save:
+        folder = os.path.dirname(args.save)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        meta = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "machine": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "scipy": scipy.__version__,
+            "compas_fd": compas_fd.__version__,
+        }
+        with open(args.save, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=4)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
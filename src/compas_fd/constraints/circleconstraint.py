@@ -3,7 +3,6 @@ from __future__ import division
 from __future__ import print_function
 
 from compas.geometry import Circle
-from compas.geometry import NurbsCurve
 from compas.geometry import Point
 from compas.geometry import Vector
 from compas.geometry import vector_component
@@ -26,8 +25,7 @@ class CircleConstraint(Constraint):
     @classmethod
     def __from_data__(cls, data):
         circle = Circle.__from_data__(data["geometry"])
-        curve = NurbsCurve.from_circle(circle)
-        constraint = cls(curve)
+        constraint = cls(circle)
         if "rhino_guid" in data:
             constraint._rhino_guid = str(data["rhino_guid"])
         return constraint
@@ -110,6 +110,7 @@ class Constraint(Data):
         self._residual = None
         self._tangent = None
         self._normal = None
+        self._param = None
         self._geometry = geometry
 
     @property
@@ -40,6 +40,7 @@ class PlaneConstraint(Constraint):
 
     def update(self, damping=0.1):
         self._location = self.location + self.tangent * damping
+        self.project()
 
     def project(self):
         self._location = Point(*project_point_plane(self._location, self.geometry))
@@ -1,8 +1,6 @@
 import numpy
 import scipy.sparse
 from compas.datastructures import Mesh
-from compas.geometry import cross_vectors
-from compas.geometry import length_vector
 from compas.matrices import face_matrix
 
 from compas_fd.types import FloatNx1
@@ -54,6 +52,7 @@ class SelfweightCalculator:
         self.fvertex_index = {fkey: index for index, fkey in enumerate(mesh.faces())}
         self.is_loaded = {fkey: True for fkey in mesh.faces()}
         self.F = self.compute_face_matrix()
+        self.halfedges, self.halfedge_faces = self.compute_halfedge_arrays()
 
     def __call__(self, xyz: FloatNx3) -> FloatNx1:
         ta = self.compute_tributary_areas(numpy.asarray(xyz))
@@ -76,6 +75,35 @@ class SelfweightCalculator:
             face_vertices[self.fvertex_index[fkey]] = [self.vertex_index[key] for key in self.mesh.face_vertices(fkey)]
         return face_matrix(face_vertices, rtype="csr", normalize=True)
 
+    def compute_halfedge_arrays(self):
+        """Compute the vertex and face indices of the halfedges of the mesh.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The first array contains the start and end vertex of every halfedge.
+            The second array contains the face to the left and the face to the right of every halfedge,
+            or ``-1`` if there is no face on that side.
+            The halfedges are ordered per vertex, in the order of the halfedge dict of the mesh.
+
+        """
+        mesh = self.mesh
+        vertex_index = self.vertex_index
+        fvertex_index = self.fvertex_index
+
+        halfedges = []
+        faces = []
+        for u in mesh.vertices():
+            for v in mesh.halfedge[u]:
+                left = mesh.halfedge[u][v]
+                right = mesh.halfedge[v][u]
+                halfedges.append((vertex_index[u], vertex_index[v]))
+                faces.append((-1 if left is None else fvertex_index[left], -1 if right is None else fvertex_index[right]))
+
+        halfedges = numpy.array(halfedges, dtype=int).reshape((-1, 2))
+        faces = numpy.array(faces, dtype=int).reshape((-1, 2))
+        return halfedges, faces
+
     def compute_tributary_areas(self, xyz: FloatNx3) -> FloatNx1:
         """Compute the tributary are of every vertex for the current coordinates.
 
@@ -90,33 +118,25 @@ class SelfweightCalculator:
             The tributary are per vertex.
 
         """
-        mesh = self.mesh
-        vertex_index = self.vertex_index
-        fvertex_index = self.fvertex_index
-        is_loaded = self.is_loaded
+        xyz = numpy.asarray(xyz, dtype=float)
+        loaded = numpy.fromiter(self.is_loaded.values(), dtype=bool, count=len(self.is_loaded))
 
         C = self.F.dot(xyz)
 
-        areas = numpy.zeros((xyz.shape[0], 1))
-
-        for u in mesh.vertices():
-            p0 = xyz[vertex_index[u]]
-
-            a = 0
-            for v in mesh.halfedge[u]:
-                p1 = xyz[vertex_index[v]]
-                p01 = p1 - p0
-
-                fkey = mesh.halfedge[u][v]
-                if fkey is not None and is_loaded[fkey]:
-                    p2 = C[fvertex_index[fkey]]
-                    a += 0.25 * length_vector(cross_vectors(p01, p2 - p0))
-
-                fkey = mesh.halfedge[v][u]
-                if fkey is not None and is_loaded[fkey]:
-                    p3 = C[fvertex_index[fkey]]
-                    a += 0.25 * length_vector(cross_vectors(p01, p3 - p0))
-
-            areas[vertex_index[u]] = a
-
-        return areas
+        u = self.halfedges[:, 0]
+        v = self.halfedges[:, 1]
+        p0 = xyz[u]
+        p01 = xyz[v] - p0
+
+        # the contributions of the faces on both sides of every halfedge
+        # are interleaved, to sum them in the same order as the halfedge dict of the mesh
+        contributions = numpy.zeros(self.halfedge_faces.shape)
+        for side in range(2):
+            faces = self.halfedge_faces[:, side]
+            mask = faces > -1
+            mask[mask] = loaded[faces[mask]]
+            c = numpy.cross(p01[mask], C[faces[mask]] - p0[mask])
+            contributions[mask, side] = 0.25 * numpy.sqrt(c[:, 0] ** 2 + c[:, 1] ** 2 + c[:, 2] ** 2)
+
+        areas = numpy.bincount(numpy.repeat(u, 2), weights=contributions.ravel(), minlength=xyz.shape[0])
+        return areas.reshape((-1, 1))
@@ -1,5 +1,22 @@
+from .linear_solvers import LinearSolver
+from .acceleration import Acceleration
+from .fd_operator import FDOperator
+from .fd_session import FDSession
+from .objectives import Objective
+from .objectives import TargetPointsObjective
+from .objectives import TargetLengthsObjective
+from .objectives import TargetForcesObjective
+from .objectives import RegularizationObjective
+from .objectives import LoadPathObjective
+from .objectives import MaxForceObjective
 from .fd_numpy import fd_numpy
 from .fd_constrained_numpy import fd_constrained_numpy
+from .fd_nullspace_numpy import fd_constrained_nullspace_numpy
+from .fd_newton_numpy import fd_constrained_newton_numpy
+from .fd_matrix_free_numpy import fd_matrix_free_numpy
+from .fd_inverse_numpy import fd_inverse_numpy
+from .fd_batch_numpy import fd_batch_numpy
+from .fd_pool_numpy import fd_constrained_pool_numpy
 
 # from .mesh_fd_numpy import mesh_fd_numpy
 # from .mesh_fd_constrained_numpy import mesh_fd_constrained_numpy
@@ -9,8 +26,25 @@ from .fd_constrained_numpy import fd_constrained_numpy
 # from .mesh_fd_constrained_cache import mesh_fd_constrained_cache_delete  # noqa: F401
 
 __all__ = [
+    "LinearSolver",
+    "Acceleration",
+    "FDOperator",
+    "FDSession",
+    "Objective",
+    "TargetPointsObjective",
+    "TargetLengthsObjective",
+    "TargetForcesObjective",
+    "RegularizationObjective",
+    "LoadPathObjective",
+    "MaxForceObjective",
     "fd_numpy",
     "fd_constrained_numpy",
+    "fd_constrained_nullspace_numpy",
+    "fd_constrained_newton_numpy",
+    "fd_matrix_free_numpy",
+    "fd_inverse_numpy",
+    "fd_batch_numpy",
+    "fd_constrained_pool_numpy",
     # "mesh_fd_numpy",
     # "mesh_fd_constrained_numpy",
 ]
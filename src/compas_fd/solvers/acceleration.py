@@ -0,0 +1,182 @@
+from typing import Optional
+
+import numpy as np
+from scipy.linalg import lstsq
+
+from compas_fd.types import FloatNxM
+
+
+class Acceleration:
+    """Base class for the acceleration of the fixed-point iteration of the constrained vertices.
+
+    An iteration of the constrained solver maps the coordinates of the constrained vertices ``x``
+    to updated coordinates ``g``, through a solve of the equilibrium and a damped update of the constraints.
+    An acceleration computes the next iterate from the current and previous pairs of ``x`` and ``g``.
+
+    If the norm of the fixed-point residual ``g - x`` grows by more than the safeguard factor,
+    the memory of the acceleration is cleared, and the plain damped update ``g`` is used instead.
+
+    Parameters
+    ----------
+    safeguard : float, optional
+        The maximum ratio of the norms of two consecutive fixed-point residuals.
+
+    """
+
+    ACCELERATIONS = {}
+
+    @staticmethod
+    def register(name, cls):
+        Acceleration.ACCELERATIONS[name] = cls
+
+    @staticmethod
+    def get_acceleration_cls(name):
+        if isinstance(name, type) and issubclass(name, Acceleration):
+            return name
+        try:
+            return Acceleration.ACCELERATIONS[name]
+        except KeyError:
+            raise ValueError("No acceleration is registered with this name: {}".format(name))
+
+    def __init__(self, safeguard: float = 1.0):
+        self.safeguard = safeguard
+        self.fallbacks = 0
+        self._norm = None
+
+    def __call__(self, x: FloatNxM, g: FloatNxM) -> FloatNxM:
+        """Compute the next iterate.
+
+        Parameters
+        ----------
+        x : FloatNxM
+            The coordinates of the constrained vertices at the start of the iteration.
+        g : FloatNxM
+            The coordinates of the constrained vertices after the damped update of the iteration.
+
+        Returns
+        -------
+        FloatNxM
+            The coordinates of the constrained vertices at the start of the next iteration.
+
+        """
+        x = np.asarray(x, dtype=float)
+        g = np.asarray(g, dtype=float)
+        f = g - x
+        norm = np.linalg.norm(f)
+        grows = self._norm is not None and norm > self.safeguard * self._norm
+        self._norm = norm
+        if grows:
+            self.fallbacks += 1
+            self.reset()
+            self.store(x.ravel(), g.ravel(), f.ravel())
+            return g
+        return self.accelerate(x.ravel(), g.ravel(), f.ravel()).reshape(g.shape)
+
+    def reset(self) -> None:
+        """Clear the memory of previous iterates."""
+        raise NotImplementedError
+
+    def store(self, x, g, f) -> None:
+        """Store an iterate without accelerating it."""
+        raise NotImplementedError
+
+    def accelerate(self, x, g, f):
+        raise NotImplementedError
+
+
+class AndersonAcceleration(Acceleration):
+    """Anderson mixing of the last iterates.
+
+    Parameters
+    ----------
+    memory : int, optional
+        The number of previous iterates used in the mixing.
+    safeguard : float, optional
+        The maximum ratio of the norms of two consecutive fixed-point residuals.
+    regularization : float, optional
+        Tikhonov regularization of the least-squares problem of the mixing coefficients,
+        relative to the norm of its matrix.
+
+    """
+
+    def __init__(self, memory: int = 5, safeguard: float = 1.0, regularization: float = 1e-10):
+        super(AndersonAcceleration, self).__init__(safeguard=safeguard)
+        self.memory = memory
+        self.regularization = regularization
+        self.reset()
+
+    def reset(self):
+        self._g = None
+        self._f = None
+        self._dG = []
+        self._dF = []
+
+    def store(self, x, g, f):
+        if self._g is not None:
+            self._dG.append(g - self._g)
+            self._dF.append(f - self._f)
+            if len(self._dF) > self.memory:
+                del self._dG[0]
+                del self._dF[0]
+        self._g = g
+        self._f = f
+
+    def accelerate(self, x, g, f):
+        self.store(x, g, f)
+        if not self._dF:
+            return g
+        dF = np.column_stack(self._dF)
+        dG = np.column_stack(self._dG)
+        gamma = _regularized_lstsq(dF, f, self.regularization)
+        return g - dG.dot(gamma)
+
+
+class AitkenAcceleration(Acceleration):
+    """Aitken adaptive relaxation of the fixed-point update.
+
+    Parameters
+    ----------
+    relaxation : float, optional
+        The initial relaxation factor.
+    bounds : tuple[float, float], optional
+        The minimum and maximum relaxation factor.
+    safeguard : float, optional
+        The maximum ratio of the norms of two consecutive fixed-point residuals.
+
+    """
+
+    def __init__(self, relaxation: float = 1.0, bounds=(0.1, 10.0), safeguard: float = 1.0):
+        super(AitkenAcceleration, self).__init__(safeguard=safeguard)
+        self.initial = relaxation
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self):
+        self.relaxation = self.initial
+        self._f = None
+
+    def store(self, x, g, f):
+        self._f = f
+
+    def accelerate(self, x, g, f):
+        if self._f is not None:
+            df = f - self._f
+            dd = df.dot(df)
+            if dd > 0:
+                self.relaxation = float(np.clip(-self.relaxation * self._f.dot(df) / dd, *self.bounds))
+        self._f = f
+        return x + self.relaxation * f
+
+
+Acceleration.register("anderson", AndersonAcceleration)
+Acceleration.register("aitken", AitkenAcceleration)
+
+
+def _regularized_lstsq(A: FloatNxM, b, regularization: Optional[float]):
+    """Solve a least-squares problem with Tikhonov regularization."""
+    if regularization:
+        k = A.shape[1]
+        scale = regularization * np.linalg.norm(A)
+        A = np.vstack((A, scale * np.eye(k)))
+        b = np.concatenate((b, np.zeros(k)))
+    return lstsq(A, b)[0]
@@ -0,0 +1,455 @@
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from compas.geometry import Circle
+from compas.geometry import Point
+from compas.geometry import Vector
+
+from compas_fd.constraints import CircleConstraint
+from compas_fd.constraints import Constraint
+from compas_fd.constraints import CurveConstraint
+from compas_fd.constraints import FrameConstraint
+from compas_fd.constraints import LineConstraint
+from compas_fd.constraints import PlaneConstraint
+from compas_fd.constraints import SurfaceConstraint
+from compas_fd.constraints import VectorConstraint
+from compas_fd.types import FloatNx3
+from compas_fd.types import FloatNxM
+
+from .nurbs_numpy import CircleEvaluator
+from .nurbs_numpy import NurbsCurveEvaluator
+from .nurbs_numpy import NurbsSurfaceEvaluator
+
+
+class ConstraintGroup:
+    """Base class for groups of vertex constraints that are updated together.
+
+    Parameters
+    ----------
+    vertices : list[int]
+        The indices of the constrained vertices.
+    constraints : list[:class:`~compas_fd.constraints.Constraint`]
+        The constraints of the vertices.
+    slots : list[int]
+        The positions of the constrained vertices in the list of all constrained vertices.
+
+    """
+
+    is_affine = True
+
+    def __init__(self, vertices: List[int], constraints: List[Constraint], slots: List[int]):
+        self.vertices = np.asarray(vertices, dtype=int)
+        self.constraints = constraints
+        self.slots = np.asarray(slots, dtype=int)
+        self.location = None
+        self.residual = None
+        self.tangent = None
+
+    def update(self, xyz: FloatNx3, residuals: FloatNx3, damping: float = 0.1) -> FloatNx3:
+        """Update the constrained vertices with the tangent components of their residuals.
+
+        Parameters
+        ----------
+        xyz : FloatNx3
+            The coordinates of all vertices.
+            The coordinates of the constrained vertices are updated in place.
+        residuals : FloatNx3
+            The residual forces at all vertices.
+        damping : float, optional
+            Damping factor for the geometry update.
+
+        Returns
+        -------
+        FloatNx3
+            The tangent components of the residuals at the constrained vertices.
+
+        """
+        location = self.locate(xyz[self.vertices])
+        self.residual = residuals[self.vertices]
+        self.tangent = self.compute_tangent(location, self.residual)
+        self.location = self.project(location + self.tangent * damping)
+        xyz[self.vertices] = self.location
+        return self.tangent
+
+    def project_vertices(self, xyz: FloatNx3) -> None:
+        """Project the constrained vertices onto the constraint geometry.
+
+        Parameters
+        ----------
+        xyz : FloatNx3
+            The coordinates of all vertices.
+            The coordinates of the constrained vertices are updated in place.
+
+        Returns
+        -------
+        None
+
+        """
+        self.location = self.project(xyz[self.vertices])
+        xyz[self.vertices] = self.location
+
+    def sync(self) -> None:
+        """Store the current state of the group in the individual constraint objects."""
+        if self.location is None:
+            return
+        for constraint, location, residual, tangent in zip(self.constraints, self.location, self.residual, self.tangent):
+            constraint._location = Point(*location)
+            constraint._residual = Vector(*residual)
+            constraint._tangent = Vector(*tangent)
+            constraint._normal = None
+            constraint.projected = True
+
+    @classmethod
+    def supports(cls, constraint: Constraint) -> bool:
+        """Verify whether a constraint can be handled by this type of group."""
+        return True
+
+    @classmethod
+    def key(cls, constraint: Constraint):
+        """Compute the key identifying the group of this type to which a constraint belongs."""
+        return cls
+
+    def locate(self, location: FloatNx3) -> FloatNx3:
+        """Compute the locations of the constrained vertices at the start of an update.
+
+        By default, the vertices are projected onto the constraint geometry only at the first update.
+        """
+        if self.location is None:
+            return self.project(location)
+        return location
+
+    def compute_tangent(self, location: FloatNx3, residual: FloatNx3) -> FloatNx3:
+        raise NotImplementedError
+
+    def project(self, location: FloatNx3) -> FloatNx3:
+        return location
+
+    def tangent_space(self, location: FloatNx3, residual: FloatNx3) -> Tuple[FloatNx3, FloatNxM]:
+        """Compute the affine spaces in which the constrained vertices can move, at their current locations.
+
+        For affine constraints, these are the constraint spaces themselves.
+        For other constraints, these are the linearizations of the constraint geometry at the closest points.
+
+        Parameters
+        ----------
+        location : FloatNx3
+            The current locations of the constrained vertices.
+        residual : FloatNx3
+            The residual forces at the constrained vertices.
+
+        Returns
+        -------
+        tuple[FloatNx3, FloatNxM]
+            The origins of the spaces,
+            and their orthonormal basis vectors, as an array with shape ``(len(vertices), 3, 2)``.
+            Unused basis vectors are zero.
+
+        """
+        raise NotImplementedError
+
+    def curvature(self) -> FloatNxM:
+        """Compute the second derivatives of the constraint geometry
+        with respect to the coordinates of the tangent spaces of the last call to :meth:`tangent_space`.
+
+        Only the components normal to the tangent spaces are included.
+        These are zero for affine constraints.
+
+        Returns
+        -------
+        FloatNxM
+            The second derivatives, as an array with shape ``(len(vertices), 3, 2, 2)``.
+
+        """
+        return np.zeros((len(self.vertices), 3, 2, 2))
+
+
+class PlaneConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to planes."""
+
+    def __init__(self, vertices, constraints, slots):
+        super(PlaneConstraintGroup, self).__init__(vertices, constraints, slots)
+        self.point = np.array([c.geometry.point for c in constraints], dtype=float).reshape((-1, 3))
+        self.normal = _unitized([c.geometry.normal for c in constraints])
+
+    def compute_tangent(self, location, residual):
+        return residual - _component(residual, self.normal)
+
+    def project(self, location):
+        return location - _component(location - self.point, self.normal)
+
+    def tangent_space(self, location, residual):
+        return self.project(location), _plane_basis(self.normal)
+
+
+class LineConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to line segments."""
+
+    def __init__(self, vertices, constraints, slots):
+        super(LineConstraintGroup, self).__init__(vertices, constraints, slots)
+        self.start = np.array([c.geometry.start for c in constraints], dtype=float).reshape((-1, 3))
+        self.vector = np.array([c.geometry.vector for c in constraints], dtype=float).reshape((-1, 3))
+        self.direction = _unitized(self.vector)
+
+    def compute_tangent(self, location, residual):
+        return _component(residual, self.direction)
+
+    def project(self, location):
+        t = np.clip(self._param(location), 0.0, 1.0).reshape((-1, 1))
+        return self.start + t * self.vector
+
+    def tangent_space(self, location, residual):
+        t = self._param(location)
+        basis = np.zeros((len(t), 3, 2))
+        basis[:, :, 0] = self.direction
+        # vertices at the end of their segment are held there, as long as they are pushed outwards
+        outwards = np.where(t <= 1e-12, -1.0, np.where(t >= 1.0 - 1e-12, 1.0, 0.0))
+        held = outwards * np.einsum("ij,ij->i", residual, self.direction) > 0
+        basis[held] = 0.0
+        return self.project(location), basis
+
+    def _param(self, location):
+        return np.einsum("ij,ij->i", location - self.start, self.vector) / np.einsum("ij,ij->i", self.vector, self.vector)
+
+
+class VectorConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to move along vectors."""
+
+    def __init__(self, vertices, constraints, slots):
+        super(VectorConstraintGroup, self).__init__(vertices, constraints, slots)
+        self.direction = _unitized([c.geometry for c in constraints])
+
+    def compute_tangent(self, location, residual):
+        return _component(residual, self.direction)
+
+    def tangent_space(self, location, residual):
+        basis = np.zeros((len(location), 3, 2))
+        basis[:, :, 0] = self.direction
+        return location, basis
+
+
+class FrameConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to move parallel to the XY plane of frames."""
+
+    def __init__(self, vertices, constraints, slots):
+        super(FrameConstraintGroup, self).__init__(vertices, constraints, slots)
+        self.normal = _unitized([c.geometry.zaxis for c in constraints])
+
+    def compute_tangent(self, location, residual):
+        return residual - _component(residual, self.normal)
+
+    def tangent_space(self, location, residual):
+        return location, _plane_basis(self.normal)
+
+
+class CurveConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to the same curve or circle.
+
+    The closest points on the curve are computed for all vertices of the group at once.
+    The search for the closest points is warm-started from the parameters of the previous projection,
+    or from the cached parameters of the constraints, if available.
+    """
+
+    is_affine = False
+
+    def __init__(self, vertices, constraints, slots):
+        super(CurveConstraintGroup, self).__init__(vertices, constraints, slots)
+        geometry = constraints[0].geometry
+        if isinstance(geometry, Circle):
+            self.evaluator = CircleEvaluator.from_geometry(geometry)
+        else:
+            self.evaluator = NurbsCurveEvaluator.from_geometry(geometry)
+        self.param = _cached_params(constraints)
+
+    @classmethod
+    def supports(cls, constraint):
+        return isinstance(constraint.geometry, Circle) or not constraint.geometry.is_periodic
+
+    @classmethod
+    def key(cls, constraint):
+        return cls, id(constraint.geometry)
+
+    def locate(self, location):
+        return self.project(location)
+
+    def compute_tangent(self, location, residual):
+        return _component(residual, self.evaluator.tangent_at(self.param))
+
+    def project(self, location):
+        location, self.param = self.evaluator.closest_points(location, self.param)
+        return location
+
+    def tangent_space(self, location, residual):
+        origin = self.project(location)
+        basis = np.zeros((len(origin), 3, 2))
+        basis[:, :, 0] = self.evaluator.tangent_at(self.param)
+        return origin, basis
+
+    def curvature(self):
+        ders = self.evaluator.derivatives_at(self.param, order=2)
+        tangent = _unitized(ders[1])
+        curvature = np.zeros((len(self.param), 3, 2, 2))
+        curvature[:, :, 0, 0] = (ders[2] - _component(ders[2], tangent)) / np.einsum("ij,ij->i", ders[1], ders[1])[:, None]
+        return curvature
+
+    def sync(self):
+        super(CurveConstraintGroup, self).sync()
+        if self.param is not None:
+            for constraint, param in zip(self.constraints, self.param):
+                constraint._param = float(param)
+
+
+class SurfaceConstraintGroup(ConstraintGroup):
+    """Group of vertices constrained to the same surface.
+
+    The closest points on the surface are computed for all vertices of the group at once.
+    The search for the closest points is warm-started from the parameters of the previous projection,
+    or from the cached parameters of the constraints, if available.
+    """
+
+    is_affine = False
+
+    def __init__(self, vertices, constraints, slots):
+        super(SurfaceConstraintGroup, self).__init__(vertices, constraints, slots)
+        self.evaluator = NurbsSurfaceEvaluator.from_geometry(constraints[0].geometry)
+        self.param = _cached_params(constraints)
+
+    @classmethod
+    def supports(cls, constraint):
+        return not (constraint.geometry.is_periodic_u or constraint.geometry.is_periodic_v)
+
+    @classmethod
+    def key(cls, constraint):
+        return cls, id(constraint.geometry)
+
+    def locate(self, location):
+        return self.project(location)
+
+    def compute_tangent(self, location, residual):
+        normal = self.evaluator.normal_at(self.param[:, 0], self.param[:, 1])
+        return residual - _component(residual, normal)
+
+    def tangent_space(self, location, residual):
+        origin = self.project(location)
+        return origin, _plane_basis(self.evaluator.normal_at(self.param[:, 0], self.param[:, 1]))
+
+    def curvature(self):
+        ders = self.evaluator.derivatives_at(self.param[:, 0], self.param[:, 1], order=2)
+        normal = _unitized(np.cross(ders[1, 0], ders[0, 1]))
+        # the derivatives of the parameters with respect to the tangent coordinates
+        jacobian = np.stack((ders[1, 0], ders[0, 1]), axis=2)
+        inverse = np.linalg.inv(np.einsum("kci,kcj->kij", _plane_basis(normal), jacobian))
+        second = np.array([[ders[2, 0], ders[1, 1]], [ders[1, 1], ders[0, 2]]]).transpose((2, 3, 0, 1))
+        second = np.einsum("kcab,kai,kbj->kcij", second, inverse, inverse)
+        return normal[:, :, None, None] * np.einsum("kc,kcij->kij", normal, second)[:, None]
+
+    def project(self, location):
+        location, self.param = self.evaluator.closest_points(location, self.param)
+        return location
+
+    def sync(self):
+        super(SurfaceConstraintGroup, self).sync()
+        if self.param is not None:
+            for constraint, (u, v) in zip(self.constraints, self.param):
+                constraint._param = float(u), float(v)
+
+
+class ObjectConstraintGroup(ConstraintGroup):
+    """Group of vertices with constraints that are updated one by one, through the constraint objects."""
+
+    is_affine = False
+
+    def update(self, xyz, residuals, damping=0.1):
+        tangent = np.empty((len(self.vertices), 3))
+        for i, (vertex, constraint) in enumerate(zip(self.vertices, self.constraints)):
+            constraint.location = xyz[vertex]
+            constraint.residual = residuals[vertex]
+            constraint.update(damping=damping)
+            xyz[vertex] = constraint.location
+            tangent[i] = constraint.tangent
+        return tangent
+
+    def project_vertices(self, xyz):
+        for vertex, constraint in zip(self.vertices, self.constraints):
+            constraint._location = Point(*xyz[vertex])
+            constraint.project()
+            xyz[vertex] = constraint.location
+
+    def sync(self):
+        pass
+
+
+CONSTRAINT_GROUP = {
+    PlaneConstraint: PlaneConstraintGroup,
+    LineConstraint: LineConstraintGroup,
+    VectorConstraint: VectorConstraintGroup,
+    FrameConstraint: FrameConstraintGroup,
+    CurveConstraint: CurveConstraintGroup,
+    CircleConstraint: CurveConstraintGroup,
+    SurfaceConstraint: SurfaceConstraintGroup,
+}
+
+
+def group_constraints(constraints: Sequence[Optional[Constraint]]) -> List[ConstraintGroup]:
+    """Group vertex constraints by type.
+
+    Parameters
+    ----------
+    constraints : list[:class:`~compas_fd.constraints.Constraint` | None]
+        The constraints per vertex.
+        Vertices without constraint have ``None`` instead.
+
+    Returns
+    -------
+    list[:class:`ConstraintGroup`]
+        The groups of constraints.
+        Constraints on curves and surfaces are grouped per geometry object.
+        Constraints without a vectorized group are collected in an :class:`ObjectConstraintGroup`.
+
+    """
+    items = {}
+    slot = 0
+    for vertex, constraint in enumerate(constraints):
+        if not constraint:
+            continue
+        cls = CONSTRAINT_GROUP.get(type(constraint), ObjectConstraintGroup)
+        if not cls.supports(constraint):
+            cls = ObjectConstraintGroup
+        key = cls.key(constraint)
+        if key not in items:
+            items[key] = (cls, [], [], [])
+        items[key][1].append(vertex)
+        items[key][2].append(constraint)
+        items[key][3].append(slot)
+        slot += 1
+    return [cls(*item) for cls, *item in items.values()]
+
+
+def _cached_params(constraints: List[Constraint]):
+    """Collect the cached closest point parameters of constraints, if all of them have one."""
+    params = [constraint._param for constraint in constraints]
+    if any(param is None for param in params):
+        return None
+    return np.array(params, dtype=float)
+
+
+def _plane_basis(normals: FloatNx3) -> FloatNxM:
+    """Compute orthonormal basis vectors of the planes with the given unit normals, as an array with shape ``(n, 3, 2)``."""
+    helper = np.zeros_like(normals)
+    helper[:, 0] = 1.0
+    helper[np.abs(normals[:, 0]) > 0.9] = [0.0, 1.0, 0.0]
+    e1 = _unitized(np.cross(normals, helper))
+    e2 = np.cross(normals, e1)
+    return np.stack((e1, e2), axis=2)
+
+
+def _unitized(vectors) -> FloatNx3:
+    vectors = np.array(vectors, dtype=float).reshape((-1, 3))
+    return vectors / np.linalg.norm(vectors, axis=1).reshape((-1, 1))
+
+
+def _component(vectors: FloatNx3, directions: FloatNx3) -> FloatNx3:
+    """Compute the components of vectors in the direction of the corresponding unit vectors."""
+    return np.einsum("ij,ij->i", vectors, directions).reshape((-1, 1)) * directions
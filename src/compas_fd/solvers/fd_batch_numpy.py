@@ -0,0 +1,138 @@
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from compas.linalg import normrow
+from numpy import arange
+from numpy import argsort
+from numpy import asarray
+from numpy import empty
+from numpy import float64
+from numpy import ones
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from compas_fd.types import FloatNx3
+from compas_fd.types import FloatNxM
+
+from .fd_numerical_data import FDNumericalData
+from .result import Result
+
+
+def fd_batch_numpy(
+    *,
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: FloatNxM,
+    loads: Optional[FloatNx3] = None,
+) -> Result:
+    """Compute the equilibrium coordinates of a system of vertices connected by edges,
+    for a batch of force density distributions.
+
+    The topology of the system is processed only once.
+    The sparsity pattern and the fill-reducing ordering of the stiffness matrix are reused for all samples,
+    such that only the numerical factorization is recomputed per force density distribution.
+    If all force densities of a sample are positive, the free block of the stiffness matrix is symmetric positive definite,
+    and the factorization pivots on the diagonal.
+    Otherwise, for example with edges in compression, the factorization uses partial pivoting for stability.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        The XYZ coordinates of the vertices.
+    fixed : list[int]
+        The fixed vertices.
+    edges : list[tuple[int, int]]
+        The edges between the vertices.
+    forcedensities : FloatNxM
+        The force densities of the edges, with one row per sample and one column per edge.
+    loads : FloatNx3, optional
+        The loads on the vertices.
+
+    Returns
+    -------
+    Result
+        The stacked results, with the results of each sample along the first axis.
+
+    See Also
+    --------
+    :func:`compas_fd.solvers.fd_numpy`
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import fd_batch_numpy
+
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=10)
+
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> loads = [[0, 0, -1] for _ in range(len(vertices))]
+    >>> q = [[1.0] * len(edges), [2.0] * len(edges)]
+
+    >>> result = fd_batch_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
+
+    >>> result.vertices.shape == (2, len(vertices), 3)
+    True
+
+    """
+    qs = asarray(forcedensities, dtype=float64).reshape((-1, len(edges)))
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, ones(len(edges)), loads)
+
+    xyz = numdata.xyz
+    free = numdata.free
+    fixed = numdata.fixed
+    p = numdata.p
+    C = numdata.C
+    # with the columns in the order of the permutation, the free and fixed blocks are contiguous
+    Cp = C[:, numdata.permutation]
+    Ci = Cp[:, : len(free)]
+    Cf = Cp[:, len(free) :]
+
+    n = len(qs)
+    X = empty((n,) + xyz.shape)
+    R = empty((n,) + xyz.shape)
+    F = empty((n, len(edges), 1))
+    L = empty((n, len(edges), 1))
+    X[:] = xyz
+
+    if len(free):
+        # the fill-reducing ordering of the (symmetric) free block is computed only once,
+        # and baked into the sparsity pattern of the permuted matrix,
+        # such that the numerical factorization of every sample can use its natural ordering
+        P = numdata.forcedensity_map("Ai")
+        Ai = numdata.Ai
+        lu = splu(csc_matrix(Ai), permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+        perm = argsort(lu.perm_c)
+        iperm = argsort(perm)
+
+        pattern = Ai.copy()
+        pattern.data = arange(1, Ai.nnz + 1, dtype=float64)
+        pattern = pattern[perm][:, perm].tocsr()
+        pattern.sort_indices()
+        P = P[pattern.data.astype(int) - 1]
+
+        CfX = Cf.dot(xyz.take(fixed, axis=0))
+        pf = p.take(free, axis=0)
+
+        for i, q in enumerate(qs):
+            # the permuted pattern is symmetric
+            # therefore, its CSR arrays also describe the matrix in CSC format
+            Ai = csc_matrix((P.dot(q), pattern.indices, pattern.indptr), shape=pattern.shape)
+            b = pf - Ci.T.dot(q[:, None] * CfX)
+            if q.min() > 0:
+                lu = splu(Ai, permc_spec="NATURAL", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+            else:
+                lu = splu(Ai, permc_spec="NATURAL")
+            X[i, free] = lu.solve(b[perm])[iperm]
+
+    for i, q in enumerate(qs):
+        q = q.reshape((-1, 1))
+        CX = C.dot(X[i])
+        L[i] = normrow(CX)
+        F[i] = q * L[i]
+        R[i] = p - C.T.dot(q * CX)
+
+    return Result(X, R, F, L)
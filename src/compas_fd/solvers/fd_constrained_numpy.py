@@ -1,18 +1,22 @@
+from time import perf_counter
 from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
+from typing import Union
 
 import numpy as np
 from compas.linalg import normrow
-from scipy.linalg import norm
-from scipy.sparse.linalg import spsolve
 
 from compas_fd.constraints import Constraint
 from compas_fd.types import FloatNx3
 
+from .acceleration import Acceleration
+from .constraint_groups import ConstraintGroup
+from .constraint_groups import group_constraints
 from .fd_numerical_data import FDNumericalData
+from .result import IterationInfo
 from .result import Result
 
 
@@ -29,6 +33,14 @@ def fd_constrained_numpy(
     tol_disp: float = 1e-3,
     damping: float = 0.1,
     selfweight=None,
+    refresh: int = 1,
+    solver: str = "lu",
+    solver_options: Optional[dict] = None,
+    callback: Optional[Callable[[IterationInfo], Optional[bool]]] = None,
+    history: bool = False,
+    warmstart: Optional[Union[Result, FDNumericalData]] = None,
+    acceleration: Optional[str] = None,
+    acceleration_options: Optional[dict] = None,
 ) -> Result:
     """
     Iteratively compute the equilibrium coordinates of a system of vertices connected by edges.
@@ -58,6 +70,35 @@ def fd_constrained_numpy(
         Damping factor for the geometry update of constrained vertices between two iterations.
     selfweight : callable, optional
         Function that computes the selfweight of the vertices.
+    refresh : int, optional
+        The number of iterations between two evaluations of the selfweight.
+        In the other iterations, the selfweight of the last evaluation is reused.
+    solver : str, optional
+        The name of the solver of the linear system with the free block of the stiffness matrix.
+        Iterative solvers are warm-started from the coordinates of the previous iteration.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+    callback : callable, optional
+        Function called after every iteration with the :class:`~compas_fd.solvers.result.IterationInfo` of the iteration.
+        If the function returns True, the iterations are stopped.
+    history : bool, optional
+        If True, the information of all iterations is stored in the ``history`` of the result.
+    warmstart : :class:`~compas_fd.solvers.result.Result` | :class:`~compas_fd.solvers.fd_numerical_data.FDNumericalData`, optional
+        The result of a previous solve of the same system, to start the iterations from.
+        The free and constrained vertices start from the previous coordinates,
+        and the other fixed vertices from the input ``vertices``.
+        The closest point searches of the constraints start from the parameters cached in the constraint objects.
+        Numerical data with the same edges and fixed vertices is reused and updated in place,
+        such that an existing factorization is kept, or corrected if only a few force densities were changed.
+    acceleration : {"anderson", "aitken"}, optional
+        The acceleration of the iterations, applied to the stacked coordinates of the constrained vertices.
+        The accelerated coordinates are projected back onto the constraint geometry.
+        If the fixed-point residual grows, the plain damped update is used instead.
+        See :class:`~compas_fd.solvers.Acceleration`.
+    acceleration_options : dict, optional
+        Options passed to the constructor of the acceleration,
+        for example the ``memory`` of the Anderson mixing.
 
     Returns
     -------
@@ -73,37 +114,156 @@ def fd_constrained_numpy(
     >>>
 
     """
-    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+    numdata = _warmstart_numdata(warmstart, vertices, fixed, edges, forcedensities, loads, constraints)
+    numdata.set_solver(solver, **(solver_options or {}))
+    if selfweight and refresh > 1:
+        selfweight = _refreshed(selfweight, refresh)
+    groups = group_constraints(constraints)
+    numdata.tangent_residuals = np.zeros((sum(len(group.vertices) for group in groups), 3))
+    accelerate = None
+    if acceleration is not None and groups:
+        accelerate = Acceleration.get_acceleration_cls(acceleration)(**(acceleration_options or {}))
+        constrained = np.empty(len(numdata.tangent_residuals), dtype=int)
+        for group in groups:
+            constrained[group.slots] = group.vertices
+
+    # buffers for the coordinates of the previous iteration and scratch arrays,
+    # such that the iterations do not allocate new arrays for them
+    xyz_prev = np.empty_like(numdata.xyz)
+    dxyz = np.empty_like(numdata.xyz)
+    loads = np.empty_like(numdata.p)
+    rhs = np.empty((len(numdata.free), 3))
+    numdata.residuals = np.empty_like(numdata.p)
+
+    # the iterations are only instrumented if their information is used
+    instrumented = callback is not None or history
+    iterations = [] if history else None
+    timings = None
 
     for k in range(kmax):
-        xyz_prev = numdata.xyz
-        _solve_fd(numdata, selfweight)
-        # this needs to be turned inside out
-        # - associate vertices with constraint
-        # - compute all projections in one step
-        # - vectorize the computation of residuals
-        # -
-        _update_constraints(numdata, constraints, damping)
-        if _is_converged_residuals(numdata.tangent_residuals, tol_res) and _is_converged_disp(xyz_prev, numdata.xyz, tol_disp):
+        np.copyto(xyz_prev, numdata.xyz)
+        if instrumented:
+            timings = {}
+        _solve_fd(numdata, selfweight, loads, rhs, timings)
+        _update_constraints(numdata, groups, damping, timings)
+        if accelerate is not None:
+            _accelerate(numdata, groups, constrained, xyz_prev, accelerate, timings)
+        if instrumented:
+            info = _iteration_info(k + 1, numdata, xyz_prev, dxyz, timings)
+            if iterations is not None:
+                iterations.append(info)
+            if callback is not None and callback(info):
+                break
+        if _is_converged_residuals(numdata.tangent_residuals, tol_res) and _is_converged_disp(xyz_prev, numdata.xyz, tol_disp, dxyz):
             break
 
+    for group in groups:
+        group.sync()
+
     _post_process_fd(numdata)
-    return numdata.to_result()
+    return numdata.to_result()._replace(history=iterations)
 
 
-def _solve_fd(numdata: FDNumericalData, selfweight: Callable = None) -> None:
+def _warmstart_numdata(
+    warmstart: Optional[Union[Result, FDNumericalData]],
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: List[float],
+    loads: Optional[FloatNx3],
+    constraints: Sequence[Constraint],
+) -> FDNumericalData:
+    """
+    Construct the numerical data of a system, starting from the coordinates of a previous solution, if provided.
+    """
+    if warmstart is None:
+        return FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+
+    if isinstance(warmstart, FDNumericalData) and _has_topology(warmstart, fixed, edges):
+        numdata = warmstart
+        q = np.asarray(forcedensities, dtype=float).reshape(-1)
+        changed = np.nonzero(q != numdata.q[:, 0])[0]
+        if len(changed):
+            numdata.update_forcedensities(changed, q[changed])
+        numdata.p[:] = 0.0 if loads is None else np.asarray(loads, dtype=float).reshape((-1, 3))
+    else:
+        numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+        previous = warmstart.xyz if isinstance(warmstart, FDNumericalData) else warmstart.vertices
+        np.copyto(numdata.xyz, np.asarray(previous, dtype=float).reshape((-1, 3)))
+
+    # the fixed vertices without constraint are the supports
+    supports = np.zeros(len(numdata.xyz), dtype=bool)
+    supports[numdata.fixed] = True
+    supports[[vertex for vertex, constraint in enumerate(constraints) if constraint]] = False
+    numdata.xyz[supports] = np.asarray(vertices, dtype=float).reshape((-1, 3))[supports]
+    return numdata
+
+
+def _has_topology(numdata: FDNumericalData, fixed: List[int], edges: List[Tuple[int, int]]) -> bool:
+    """
+    Verify whether numerical data describes a system with the given edges and fixed vertices.
+    """
+    edges = np.asarray(edges, dtype=int).reshape((-1, 2))
+    fixed = np.unique(np.asarray(fixed, dtype=int))
+    return np.array_equal(numdata._uv, edges) and np.array_equal(numdata.fixed, fixed)
+
+
+def _solve_fd(
+    numdata: FDNumericalData,
+    selfweight: Callable = None,
+    loads: Optional[FloatNx3] = None,
+    rhs: Optional[FloatNx3] = None,
+    timings: Optional[dict] = None,
+) -> None:
     """
     Solve a single iteration for the equilibrium coordinates of a system.
     All updated numerical arrays are stored in the numdata parameter.
+    The optional scratch arrays for the loads and the right-hand side are reused instead of allocating new ones.
+    If a dict of timings is provided, the time spent on the selfweight and on the solve is stored in it.
     """
-    p = numdata.p.copy()
+    if timings is not None:
+        start = perf_counter()
+
+    p = numdata.p
     if selfweight:
-        p[:, 2] -= selfweight(numdata.xyz)[:, 0]
+        if loads is None:
+            loads = np.empty_like(p)
+        np.copyto(loads, p)
+        loads[:, 2] -= selfweight(numdata.xyz)[:, 0]
+        p = loads
+
+    if timings is not None:
+        timings["selfweight"] = perf_counter() - start
+        start = perf_counter()
+
+    free = numdata.free
+    rhs = np.take(p, free, axis=0, out=rhs)
+    rhs -= numdata.Af.dot(numdata.xyz.take(numdata.fixed, axis=0))
+    x0 = None if numdata.factorize().is_direct else numdata.xyz.take(free, axis=0)
+    numdata.xyz[free] = numdata.solve(rhs, x0)
+
+    if numdata.residuals is None or numdata.residuals.shape != p.shape:
+        numdata.residuals = np.empty_like(p)
+    np.subtract(numdata.p, numdata.A.dot(numdata.xyz), out=numdata.residuals)
 
-    p = p[numdata.free]
-    b = p - numdata.Af.dot(numdata.xyz[numdata.fixed])
-    numdata.xyz[numdata.free] = spsolve(numdata.Ai, b)
-    numdata.residuals = numdata.p - numdata.A.dot(numdata.xyz)
+    if timings is not None:
+        timings["solve"] = perf_counter() - start
+
+
+def _refreshed(selfweight: Callable, refresh: int) -> Callable:
+    """
+    Wrap a selfweight function such that it is only evaluated at every ``refresh``-th call,
+    and returns the result of the last evaluation otherwise.
+    """
+    state = {"calls": 0, "weights": None}
+
+    def wrapper(xyz):
+        if state["calls"] % refresh == 0:
+            state["weights"] = selfweight(xyz)
+        state["calls"] += 1
+        return state["weights"]
+
+    return wrapper
 
 
 def _post_process_fd(numdata: FDNumericalData) -> None:
@@ -115,39 +275,97 @@ def _post_process_fd(numdata: FDNumericalData) -> None:
     numdata.forces = numdata.q * numdata.lengths
 
 
-def _update_constraints(numdata: FDNumericalData, constraints: Sequence[Constraint], damping: float) -> None:
+def _update_constraints(
+    numdata: FDNumericalData,
+    groups: Sequence[ConstraintGroup],
+    damping: float,
+    timings: Optional[dict] = None,
+) -> None:
     """
-    Update all vertex constraints by the residuals of the current iteration,
+    Update all groups of vertex constraints by the residuals of the current iteration,
     and store their updated vertex coordinates in the numdata parameter.
+    If a dict of timings is provided, the time spent on the update is stored in it.
+    """
+    if timings is not None:
+        start = perf_counter()
+
+    for group in groups:
+        numdata.tangent_residuals[group.slots] = group.update(numdata.xyz, numdata.residuals, damping)
+
+    if timings is not None:
+        timings["constraints"] = perf_counter() - start
+
+
+def _accelerate(
+    numdata: FDNumericalData,
+    groups: Sequence[ConstraintGroup],
+    constrained: np.ndarray,
+    xyz_prev: FloatNx3,
+    accelerate: Acceleration,
+    timings: Optional[dict] = None,
+) -> None:
     """
-    for vertex, constraint in enumerate(constraints):
-        if not constraint:
-            continue
-        constraint.location = numdata.xyz[vertex]
-        constraint.residual = numdata.residuals[vertex]
-        constraint.update(damping=damping)
-        numdata.xyz[vertex] = constraint.location
-    numdata.tangent_residuals = np.asarray([c.tangent for c in constraints if c])
+    Replace the updated coordinates of the constrained vertices by the accelerated iterate,
+    projected onto the constraint geometry.
+    If a dict of timings is provided, the time spent on the acceleration is stored in it.
+    """
+    if timings is not None:
+        start = perf_counter()
+
+    numdata.xyz[constrained] = accelerate(xyz_prev[constrained], numdata.xyz[constrained])
+    for group in groups:
+        group.project_vertices(numdata.xyz)
+
+    if timings is not None:
+        timings["acceleration"] = perf_counter() - start
+
+
+def _iteration_info(
+    iteration: int,
+    numdata: FDNumericalData,
+    xyz_prev: FloatNx3,
+    dxyz: FloatNx3,
+    timings: dict,
+) -> IterationInfo:
+    """
+    Collect the convergence information of an iteration.
+    """
+    return IterationInfo(
+        iteration,
+        _max_norm(numdata.residuals.take(numdata.free, axis=0)),
+        _max_norm(numdata.tangent_residuals),
+        _max_norm(np.subtract(numdata.xyz, xyz_prev, out=dxyz)),
+        timings,
+    )
 
 
 def _is_converged_residuals(residuals: FloatNx3, tol_res: float) -> bool:
     """
     Verify whether the maximum constraint residual is within tolerance.
     """
-    if residuals is None or not residuals.any():
+    if residuals is None:
         return True
-    max_res = max(norm(residuals, axis=1))
-    return max_res < tol_res
+    return _max_norm(residuals) < tol_res
 
 
 def _is_converged_disp(
     old_xyz: FloatNx3,
     new_xyz: FloatNx3,
     tol_disp: float,
+    out: Optional[FloatNx3] = None,
 ) -> bool:
     """
     Verify whether the maximum coordinate displacement
     between consecutive iterations is within tolerance.
+    The displacements are computed in the optional scratch array.
+    """
+    return _max_norm(np.subtract(new_xyz, old_xyz, out=out)) < tol_disp
+
+
+def _max_norm(vectors: FloatNx3) -> float:
+    """
+    Compute the maximum length of a set of vectors.
     """
-    max_dxyz = max(norm(new_xyz - old_xyz, axis=1))
-    return max_dxyz < tol_disp
+    if not len(vectors):
+        return 0.0
+    return np.sqrt(np.einsum("ij,ij->i", vectors, vectors).max())
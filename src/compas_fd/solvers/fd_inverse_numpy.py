@@ -0,0 +1,163 @@
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from warnings import warn
+
+import numpy as np
+from scipy.optimize import minimize
+
+from compas_fd.types import FloatNx3
+
+from .fd_constrained_numpy import _post_process_fd
+from .fd_numerical_data import FDNumericalData
+from .objectives import Objective
+from .result import Result
+
+
+def fd_inverse_numpy(
+    *,
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: List[float],
+    loads: Optional[FloatNx3] = None,
+    objective: Objective,
+    bounds: Tuple[Optional[float], Optional[float]] = (1e-3, None),
+    maxiter: int = 200,
+    tol: float = 1e-9,
+    solver: str = "lu",
+    solver_options: Optional[dict] = None,
+    max_rank: int = 32,
+    callback: Optional[Callable] = None,
+) -> Result:
+    """Find the force densities of which the equilibrium minimizes an objective.
+
+    The force densities are optimized with the bounded quasi-Newton method L-BFGS-B.
+    Every evaluation of the objective solves the equilibrium of the current force densities,
+    and the gradient is computed with an adjoint solve that reuses the factorization of that solve.
+    If only a few force densities change between evaluations, the factorization is corrected with a low-rank update,
+    otherwise the matrices are refilled from their cached sparsity patterns and factorized again.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        The XYZ coordinates of the vertices.
+        The coordinates of the fixed vertices are not changed.
+    fixed : list[int]
+        The fixed vertices.
+    edges : list[tuple[int, int]]
+        The edges between the vertices.
+    forcedensities : list[float]
+        The initial force densities of the edges.
+    loads : FloatNx3, optional
+        The loads on the vertices.
+    objective : :class:`~compas_fd.solvers.Objective`
+        The objective, for example a sum of target and regularization objectives.
+    bounds : tuple[float | None, float | None] | list[tuple[float | None, float | None]], optional
+        The lower and upper bound of all force densities, or a pair of bounds per edge.
+        None means that there is no bound.
+        The default lower bound keeps all edges in tension.
+    maxiter : int, optional
+        The maximum number of iterations of the optimizer.
+    tol : float, optional
+        The tolerance of the optimizer, for the relative reduction of the objective,
+        and for the largest component of the projected gradient.
+    solver : str, optional
+        The name of the linear solver.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+    max_rank : int, optional
+        The maximum number of changed force densities for which the factorization is updated instead of recomputed.
+    callback : callable, optional
+        A function that is called after every iteration of the optimizer, with the current force densities as argument.
+
+    Returns
+    -------
+    :class:`~compas_fd.solvers.result.Result`
+        The equilibrium of the optimized force densities,
+        which are stored in the ``forcedensities`` of the result.
+
+    Raises
+    ------
+    ValueError
+        If the solver is not registered.
+
+    Warns
+    -----
+    RuntimeWarning
+        If the optimizer did not converge, with the message of the optimizer.
+        The result is the equilibrium of the last force densities.
+
+    See Also
+    --------
+    :class:`compas_fd.solvers.TargetPointsObjective`
+    :class:`compas_fd.solvers.TargetLengthsObjective`
+    :class:`compas_fd.solvers.TargetForcesObjective`
+    :class:`compas_fd.solvers.RegularizationObjective`
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import TargetLengthsObjective
+    >>> from compas_fd.solvers import fd_numpy
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=4)
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> loads = [[0, 0, -1] for _ in range(len(vertices))]
+
+    >>> target = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[2.0] * len(edges), loads=loads)
+    >>> objective = TargetLengthsObjective(target.lengths.ravel())
+    >>> result = fd_inverse_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[1.0] * len(edges), loads=loads, objective=objective)
+    >>> bool(abs(result.lengths - target.lengths).max() < 1e-3)
+    True
+
+    """
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+    numdata.set_solver(solver, **(solver_options or {}))
+
+    xyz = numdata.xyz
+    free = numdata.free
+    fixed = numdata.fixed
+    m = len(numdata.q)
+    if len(bounds) == 2 and not np.iterable(bounds[0]):
+        bounds = [tuple(bounds)] * m
+
+    def equilibrium(q):
+        changed = np.nonzero(q != numdata.q[:, 0])[0]
+        if len(changed) == 0:
+            return
+        if len(changed) <= max_rank:
+            numdata.update_forcedensities(changed, q[changed], max_rank=max_rank)
+        else:
+            numdata.q[:, 0] = q
+            numdata.Q.data[0] = q
+            numdata.assemble()
+        xyz[free] = numdata.solve(numdata.p[free] - numdata.Af.dot(xyz[fixed]))
+
+    def fun(q):
+        equilibrium(q)
+        return objective.value(numdata), objective.gradient(numdata)
+
+    xyz[free] = numdata.solve(numdata.p[free] - numdata.Af.dot(xyz[fixed]))
+    q0 = np.clip(numdata.q[:, 0], *_bounds_arrays(bounds))
+    options = {"maxiter": maxiter, "ftol": tol, "gtol": tol}
+    res = minimize(fun, q0, jac=True, method="L-BFGS-B", bounds=bounds, options=options, callback=callback)
+    if not res.success:
+        warn("The optimization of the force densities did not converge: {}".format(res.message), RuntimeWarning)
+    equilibrium(res.x)
+
+    numdata.residuals = numdata.p - numdata.A.dot(xyz)
+    _post_process_fd(numdata)
+    return numdata.to_result()._replace(forcedensities=numdata.q[:, 0].tolist())
+
+
+def _bounds_arrays(bounds: List[Tuple[Optional[float], Optional[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert pairs of optional bounds into arrays of lower and upper bounds.
+    """
+    lower = np.array([-np.inf if low is None else low for low, _ in bounds], dtype=float)
+    upper = np.array([np.inf if high is None else high for _, high in bounds], dtype=float)
+    return lower, upper
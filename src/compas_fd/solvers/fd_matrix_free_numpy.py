@@ -0,0 +1,120 @@
+from typing import List
+from typing import Optional
+from typing import Tuple
+from warnings import warn
+
+import numpy as np
+
+from compas_fd.types import FloatNx3
+
+from .fd_operator import FDOperator
+from .linear_solvers import CGSolver
+from .result import Result
+
+
+def fd_matrix_free_numpy(
+    *,
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: List[float],
+    loads: Optional[FloatNx3] = None,
+    preconditioner: Optional[str] = "jacobi",
+    tol: float = 1e-10,
+    maxiter: Optional[int] = None,
+) -> Result:
+    """Compute the equilibrium coordinates of a system of vertices connected by edges,
+    without assembling the stiffness matrix.
+
+    The free block of the stiffness matrix is applied as a :class:`~compas_fd.solvers.FDOperator`,
+    directly from the edge index arrays and the force densities,
+    and the system is solved with the preconditioned conjugate gradient method.
+    The memory is proportional to the number of edges,
+    such that very large networks can be solved, at the cost of more time per solve than with assembled matrices.
+    The force densities have to be positive.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        The XYZ coordinates of the vertices.
+    fixed : list[int]
+        The fixed vertices.
+    edges : list[tuple[int, int]]
+        The edges between the vertices.
+    forcedensities : list[float]
+        The force densities of the edges.
+    loads : FloatNx3, optional
+        The loads on the vertices.
+    preconditioner : {"jacobi"} | None, optional
+        The preconditioner of the conjugate gradient method.
+    tol : float, optional
+        The tolerance for the norm of the residual of every coordinate direction,
+        relative to the larger of the norms of the corresponding right-hand side and of the product of the matrix with the initial guess.
+        See :class:`~compas_fd.solvers.linear_solvers.CGSolver`.
+    maxiter : int, optional
+        The maximum number of iterations.
+        Defaults to the number of free vertices.
+
+    Returns
+    -------
+    Result
+
+    Raises
+    ------
+    ValueError
+        If the preconditioner requires an assembled matrix.
+
+    Warns
+    -----
+    RuntimeWarning
+        If the conjugate gradient method did not converge within the maximum number of iterations.
+
+    See Also
+    --------
+    :func:`compas_fd.solvers.fd_numpy`
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import fd_matrix_free_numpy
+    >>> from compas_fd.solvers import fd_numpy
+
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=10)
+
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> loads = [[0, 0, -1] for _ in range(len(vertices))]
+    >>> q = [1.0] * len(edges)
+
+    >>> result = fd_matrix_free_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
+
+    >>> expected = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
+    >>> bool(abs(result.vertices - expected.vertices).max() < 1e-6)
+    True
+
+    """
+    xyz = np.array(vertices, dtype=np.float64).reshape((-1, 3))
+    p = np.zeros_like(xyz) if loads is None else np.asarray(loads, dtype=np.float64).reshape((-1, 3))
+    n = len(xyz)
+    is_fixed = np.zeros(n, dtype=bool)
+    is_fixed[np.asarray(fixed, dtype=np.intp)] = True
+    free = np.nonzero(~is_fixed)[0]
+
+    A = FDOperator(edges, forcedensities, n)
+    Ai = FDOperator(edges, forcedensities, n, free)
+
+    # the coupling with the fixed vertices is the product of A with the coordinates of only the fixed vertices
+    xyz_fixed = np.where(is_fixed[:, None], xyz, 0.0)
+    b = p[free] - A.apply(xyz_fixed)[free]
+    solver = CGSolver(Ai, preconditioner=preconditioner, tol=tol, maxiter=maxiter)
+    xyz[free] = solver.solve(b, xyz[free])
+    if not solver.converged:
+        warn("The conjugate gradient method did not converge in {} iterations.".format(solver.iterations), RuntimeWarning)
+
+    vectors = xyz[A.u] - xyz[A.v]
+    lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors)).reshape((-1, 1))
+    forces = A.q.reshape((-1, 1)) * lengths
+    residuals = p - A.apply(xyz)
+
+    return Result(xyz, residuals, forces, lengths)
@@ -0,0 +1,245 @@
+from time import perf_counter
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse import identity
+from scipy.sparse import kron
+
+from compas_fd.constraints import Constraint
+from compas_fd.types import FloatNx3
+
+from .constraint_groups import ConstraintGroup
+from .constraint_groups import group_constraints
+from .fd_constrained_numpy import _max_norm
+from .fd_constrained_numpy import _post_process_fd
+from .fd_nullspace_numpy import _check_tangent_spaces
+from .fd_nullspace_numpy import _reduction
+from .fd_nullspace_numpy import _unconstrained_free
+from .fd_nullspace_numpy import _update_residuals
+from .fd_numerical_data import FDNumericalData
+from .linear_solvers import LinearSolver
+from .result import IterationInfo
+from .result import Result
+
+
+def fd_constrained_newton_numpy(
+    *,
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: List[float],
+    loads: Optional[FloatNx3] = None,
+    constraints: Sequence[Constraint],
+    kmax: int = 50,
+    tol_res: float = 1e-8,
+    tol_disp: float = 1e-12,
+    solver: str = "lu",
+    solver_options: Optional[dict] = None,
+    max_turn: float = 0.5,
+    history: bool = False,
+) -> Result:
+    """
+    Compute the equilibrium coordinates of a system of vertices connected by edges,
+    with Newton iterations in the local coordinates of the vertex constraints.
+
+    The equilibrium of a system with positive force densities and constant loads minimizes the energy
+    ``E(x) = 1/2 x^T K x - p^T x`` over the coordinates that satisfy the constraints.
+    Every iteration expresses the constrained vertices in the coordinates ``u`` of the tangent spaces of their constraints,
+    and solves the Newton system ``(T^T K T - G) du = T^T r`` of the energy for all vertices together.
+    The curvature term ``G`` contains the components of the residual forces ``r``
+    along the second derivatives of the constraint geometry.
+    The updated coordinates are projected back onto the constraint geometry.
+
+    If the curvature term makes the Newton step uphill, the Gauss-Newton step without ``G`` is used instead,
+    and the steps are shortened until the energy decreases.
+    Steps are also shortened such that no vertex moves further than a fraction of the radius of curvature of its constraint.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        Vertex coordinates.
+    fixed : list[int]
+        Indices of fixed vertices.
+        Fixed vertices with a constraint move on their constraint.
+    edges : list[tuple[int, int]]
+        Edges as pairs of vertex indices.
+    forcedensities : list[float]
+        Forcedensities of the edges.
+    loads : FloatNx3, optional
+        Loads on the vertices.
+    constraints : list[:class:`~compas_fd.constraints.Constraint`]
+        Vertex constraints.
+        Only constraints with a vectorized constraint group are supported.
+    kmax : int, optional
+        Maximum number of iterations.
+    tol_res : float, optional
+        Tolerance for the maximum residual force at the unconstrained free vertices,
+        and for the maximum component of the residual forces at the constrained vertices in the directions of their constraints.
+    tol_disp : float, optional
+        Tolerance for the maximum displacement of the vertices between two iterations,
+        below which the iterations are stopped even if the residuals are not within tolerance.
+    solver : str, optional
+        The name of the solver of the Newton system.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+        The curvature term can make the system indefinite,
+        such that only the LU solver is guaranteed to work.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+    max_turn : float, optional
+        The maximum step of a constrained vertex, relative to the radius of curvature of its constraint.
+        Longer steps are shortened, since the linearization of the constraint is not meaningful for them.
+    history : bool, optional
+        If True, the information of all iterations is stored in the ``history`` of the result.
+
+    Returns
+    -------
+    :class:`~compas_fd.solvers.result.Result`
+        Result of the solver.
+
+    Raises
+    ------
+    ValueError
+        If a constraint has no vectorized constraint group.
+
+    See Also
+    --------
+    :func:`compas_fd.solvers.fd_constrained_numpy`
+    :func:`compas_fd.solvers.fd_constrained_nullspace_numpy`
+
+    """
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+    groups = group_constraints(constraints)
+    _check_tangent_spaces(groups)
+    solver_cls = LinearSolver.get_solver_cls(solver)
+    solver_options = solver_options or {}
+
+    xyz = numdata.xyz
+    p = numdata.p
+    A = numdata.A
+    unknown = _unconstrained_free(numdata, groups)
+    K = kron(A, identity(3), format="csr")
+
+    for group in groups:
+        group.project_vertices(xyz)
+    residuals = p - A.dot(xyz)
+    tangent = _update_residuals(residuals, groups)
+    energy = _energy(A, p, xyz)
+    xyz_prev = np.empty_like(xyz)
+    iterations = [] if history else None
+
+    for k in range(kmax):
+        if _max_norm(residuals[unknown]) < tol_res and tangent < tol_res:
+            break
+
+        start = perf_counter()
+        T, _, columns = _reduction(xyz, residuals, unknown, groups)
+        KT = T.T.dot(K).dot(T)
+        G, curvature = _curvature_matrix(residuals, groups, columns, KT.shape[0])
+        b = T.T.dot(residuals.ravel())
+        assembly = perf_counter() - start
+
+        start = perf_counter()
+        du = solver_cls((KT - G).tocsc(), **solver_options).solve(b.reshape((-1, 1))).ravel()
+        if not b.dot(du) > 0:
+            du = solver_cls(KT.tocsc(), **solver_options).solve(b.reshape((-1, 1))).ravel()
+        dxyz = T.dot(du).reshape((-1, 3))
+        solve = perf_counter() - start
+
+        start = perf_counter()
+        np.copyto(xyz_prev, xyz)
+        alpha = min(1.0, max_turn / max(np.max(np.abs(du) * curvature, initial=0.0), 1e-300))
+        energy = _line_search(xyz, xyz_prev, dxyz, b.dot(du), energy, A, p, groups, alpha)
+        np.subtract(p, A.dot(xyz), out=residuals)
+        tangent = _update_residuals(residuals, groups)
+        projection = perf_counter() - start
+
+        displacement = _max_norm(xyz - xyz_prev)
+        if iterations is not None:
+            timings = {"assembly": assembly, "solve": solve, "projection": projection}
+            iterations.append(IterationInfo(k + 1, _max_norm(residuals[unknown]), tangent, displacement, timings))
+        if displacement < tol_disp:
+            break
+
+    for group in groups:
+        group.sync()
+
+    numdata.residuals = residuals
+    _post_process_fd(numdata)
+    return numdata.to_result()._replace(history=iterations)
+
+
+def _curvature_matrix(
+    residuals: FloatNx3,
+    groups: Sequence[ConstraintGroup],
+    columns: List[np.ndarray],
+    m: int,
+):
+    """
+    Assemble the components of the residual forces along the second derivatives of the constraint geometry,
+    in the local coordinates of the constrained vertices.
+    The norms of the second derivatives are returned per local coordinate as well,
+    as a bound of the curvature of the constraint in that direction.
+    """
+    rows = []
+    cols = []
+    vals = []
+    curvature = np.zeros(m)
+    for group, index in zip(groups, columns):
+        if group.is_affine:
+            continue
+        second = group.curvature()
+        G = np.einsum("kc,kcij->kij", residuals[group.vertices], second)
+        norms = np.linalg.norm(second, axis=1)
+        for i in range(2):
+            curvature[index[index[:, i] >= 0, i]] = norms[index[:, i] >= 0, i, i]
+            for j in range(2):
+                used = (index[:, i] >= 0) & (index[:, j] >= 0)
+                rows.append(index[used, i])
+                cols.append(index[used, j])
+                vals.append(G[used, i, j])
+    if not rows:
+        return coo_matrix((m, m)).tocsr(), curvature
+    return coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(m, m)).tocsr(), curvature
+
+
+def _line_search(
+    xyz: FloatNx3,
+    xyz_prev: FloatNx3,
+    dxyz: FloatNx3,
+    decrease: float,
+    energy: float,
+    A,
+    p: FloatNx3,
+    groups: Sequence[ConstraintGroup],
+    alpha: float = 1.0,
+    maxiter: int = 20,
+) -> float:
+    """
+    Update the coordinates by the largest step of the halving sequence, starting from the given fraction of the full step,
+    for which the energy decreases sufficiently,
+    after projection onto the constraint geometry.
+    The energy differences below the precision of the energy are ignored.
+    The energy of the updated coordinates is returned.
+    """
+    tolerance = 1e-12 * (1.0 + abs(energy))
+    for _ in range(maxiter):
+        np.multiply(dxyz, alpha, out=xyz)
+        xyz += xyz_prev
+        for group in groups:
+            group.project_vertices(xyz)
+        trial = _energy(A, p, xyz)
+        if trial <= energy - 1e-4 * alpha * decrease + tolerance:
+            break
+        alpha *= 0.5
+    return trial
+
+
+def _energy(A, p: FloatNx3, xyz: FloatNx3) -> float:
+    """
+    Compute the energy of the force density system, of which the equilibrium is the minimum.
+    """
+    return 0.5 * np.einsum("ij,ij->", xyz, A.dot(xyz)) - np.einsum("ij,ij->", p, xyz)
@@ -0,0 +1,227 @@
+from time import perf_counter
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse import identity
+from scipy.sparse import kron
+
+from compas_fd.constraints import Constraint
+from compas_fd.types import FloatNx3
+
+from .constraint_groups import ConstraintGroup
+from .constraint_groups import group_constraints
+from .fd_constrained_numpy import _max_norm
+from .fd_constrained_numpy import _post_process_fd
+from .fd_numerical_data import FDNumericalData
+from .linear_solvers import LinearSolver
+from .result import IterationInfo
+from .result import Result
+
+
+def fd_constrained_nullspace_numpy(
+    *,
+    vertices: FloatNx3,
+    fixed: List[int],
+    edges: List[Tuple[int, int]],
+    forcedensities: List[float],
+    loads: Optional[FloatNx3] = None,
+    constraints: Sequence[Constraint],
+    kmax: int = 100,
+    tol_disp: float = 1e-6,
+    solver: str = "lu",
+    solver_options: Optional[dict] = None,
+    history: bool = False,
+) -> Result:
+    """
+    Compute the equilibrium coordinates of a system of vertices connected by edges,
+    by eliminating the vertex constraints from the linear system.
+
+    The coordinates of a constrained vertex are expressed in the local coordinates of its constraint,
+    ``x = o + B u``, with ``o`` a point on the constraint geometry and ``B`` the orthonormal basis of its tangent space.
+    The equilibrium in the directions of the constraint is then the reduced system ``T^T K T u = T^T (p - K o)``,
+    with ``K`` the stiffness matrix of all coordinates, and ``T`` the basis of all free and constrained coordinates.
+
+    The constraints on planes, lines, vectors and frames are affine,
+    such that a problem with only these constraints is solved exactly by a single solve.
+    Curve, circle and surface constraints are linearized at the closest points to the current coordinates,
+    and the linearization is repeated until the coordinates no longer change.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        Vertex coordinates.
+    fixed : list[int]
+        Indices of fixed vertices.
+        Fixed vertices with a constraint move on their constraint.
+    edges : list[tuple[int, int]]
+        Edges as pairs of vertex indices.
+    forcedensities : list[float]
+        Forcedensities of the edges.
+    loads : FloatNx3, optional
+        Loads on the vertices.
+    constraints : list[:class:`~compas_fd.constraints.Constraint`]
+        Vertex constraints.
+        Only constraints with a vectorized constraint group are supported.
+    kmax : int, optional
+        Maximum number of linearizations.
+    tol_disp : float, optional
+        Tolerance for the maximum distance of the solution of the linearized system to the constraint geometry,
+        and for the maximum displacement of the vertices between two linearizations.
+    solver : str, optional
+        The name of the solver of the reduced linear system.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+    history : bool, optional
+        If True, the information of all linearizations is stored in the ``history`` of the result.
+
+    Returns
+    -------
+    :class:`~compas_fd.solvers.result.Result`
+        Result of the solver.
+
+    Raises
+    ------
+    ValueError
+        If a constraint has no vectorized constraint group.
+
+    See Also
+    --------
+    :func:`compas_fd.solvers.fd_constrained_numpy`
+
+    """
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+    groups = group_constraints(constraints)
+    _check_tangent_spaces(groups)
+    solver_cls = LinearSolver.get_solver_cls(solver)
+    solver_options = solver_options or {}
+
+    xyz = numdata.xyz
+    p = numdata.p
+    A = numdata.A
+
+    unknown = _unconstrained_free(numdata, groups)
+    K = kron(A, identity(3), format="csr")
+    affine = all(group.is_affine for group in groups)
+
+    for group in groups:
+        group.project_vertices(xyz)
+    residuals = p - A.dot(xyz)
+    xyz_prev = np.empty_like(xyz)
+    iterations = [] if history else None
+
+    for k in range(kmax):
+        start = perf_counter()
+        T, c, _ = _reduction(xyz, residuals, unknown, groups)
+        Kr = T.T.dot(K).dot(T).tocsc()
+        b = T.T.dot(p.ravel() - K.dot(c))
+        reduction = perf_counter() - start
+
+        start = perf_counter()
+        u = solver_cls(Kr, **solver_options).solve(b.reshape((-1, 1)))
+        linear = T.dot(u.ravel()).reshape((-1, 3)) + c.reshape((-1, 3))
+        solve = perf_counter() - start
+
+        start = perf_counter()
+        np.copyto(xyz_prev, xyz)
+        np.copyto(xyz, linear)
+        for group in groups:
+            group.project_vertices(xyz)
+        np.subtract(p, A.dot(xyz), out=residuals)
+        tangent = _update_residuals(residuals, groups)
+        projection = perf_counter() - start
+
+        gap = _max_norm(xyz - linear)
+        displacement = _max_norm(xyz - xyz_prev)
+        if iterations is not None:
+            timings = {"reduction": reduction, "solve": solve, "projection": projection}
+            iterations.append(IterationInfo(k + 1, _max_norm(residuals[unknown]), tangent, displacement, timings))
+        if gap < tol_disp and (affine or displacement < tol_disp):
+            break
+
+    for group in groups:
+        group.sync()
+
+    numdata.residuals = residuals
+    _post_process_fd(numdata)
+    return numdata.to_result()._replace(history=iterations)
+
+
+def _check_tangent_spaces(groups: Sequence[ConstraintGroup]) -> None:
+    """
+    Verify that the tangent spaces of all constraint groups are available,
+    such that unsupported constraints are reported before the iterations start.
+    """
+    unsupported = set()
+    for group in groups:
+        if type(group).tangent_space is ConstraintGroup.tangent_space:
+            unsupported.update(type(constraint).__name__ for constraint in group.constraints)
+    if unsupported:
+        raise ValueError("These types of constraints have no vectorized constraint group: {}".format(", ".join(sorted(unsupported))))
+
+
+def _unconstrained_free(numdata: FDNumericalData, groups: Sequence[ConstraintGroup]) -> np.ndarray:
+    """
+    Compute the indices of the vertices that are neither constrained nor supported.
+    The fixed vertices without constraint are the supports.
+    """
+    unknown = np.ones(len(numdata.xyz), dtype=bool)
+    unknown[numdata.fixed] = False
+    for group in groups:
+        unknown[group.vertices] = False
+    return np.nonzero(unknown)[0]
+
+
+def _reduction(
+    xyz: FloatNx3,
+    residuals: FloatNx3,
+    unknown: np.ndarray,
+    groups: Sequence[ConstraintGroup],
+):
+    """
+    Compute the basis ``T`` of the free coordinates of the unconstrained vertices and of the local coordinates of the constrained vertices,
+    and the offset ``c`` of all coordinates, such that the coordinates of the vertices are ``T u + c``.
+    Basis vectors of vertices that are held in place by their constraint are not included.
+    The columns of the local coordinates of every group are returned as arrays with shape ``(len(vertices), 2)``,
+    with -1 for the basis vectors that are not included.
+    """
+    n = len(xyz)
+    m = 3 * len(unknown)
+    rows = [(3 * unknown[:, None] + np.arange(3)).ravel()]
+    cols = [np.arange(m)]
+    vals = [np.ones(m)]
+    c = xyz.copy()
+    c[unknown] = 0.0
+    columns = []
+
+    for group in groups:
+        origin, basis = group.tangent_space(xyz[group.vertices], residuals[group.vertices])
+        c[group.vertices] = origin
+        vertex, axis = np.nonzero(np.any(basis != 0, axis=1))
+        rows.append((3 * group.vertices[vertex][:, None] + np.arange(3)).ravel())
+        cols.append(np.repeat(np.arange(m, m + len(vertex)), 3))
+        vals.append(basis[vertex, :, axis].ravel())
+        index = np.full((len(group.vertices), 2), -1)
+        index[vertex, axis] = np.arange(m, m + len(vertex))
+        columns.append(index)
+        m += len(vertex)
+
+    T = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(3 * n, m)).tocsr()
+    return T, c.ravel(), columns
+
+
+def _update_residuals(residuals: FloatNx3, groups: Sequence[ConstraintGroup]) -> float:
+    """
+    Store the residual forces at the projected vertices in the constraint groups,
+    and compute the maximum length of their components in the directions of the constraints.
+    """
+    tangent = 0.0
+    for group in groups:
+        group.residual = residuals[group.vertices]
+        group.tangent = group.compute_tangent(group.location, group.residual)
+        tangent = max(tangent, _max_norm(group.tangent))
+    return tangent
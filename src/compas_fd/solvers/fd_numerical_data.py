@@ -3,29 +3,66 @@ from dataclasses import dataclass
 from typing import List
 from typing import Optional
 from typing import Tuple
+from warnings import warn
 
 from compas.datastructures import Mesh
-from compas.matrices import connectivity_matrix
+from numpy import add
+from numpy import arange
+from numpy import argsort
 from numpy import asarray
+from numpy import bincount
+from numpy import concatenate
+from numpy import cumsum
+from numpy import diff
+from numpy import einsum
+from numpy import equal
 from numpy import float64
+from numpy import full
+from numpy import hstack
+from numpy import intp
+from numpy import nonzero
+from numpy import ones
+from numpy import repeat
+from numpy import searchsorted
+from numpy import unique
+from numpy import zeros
 from numpy import zeros_like
+from scipy.linalg import lu_factor
+from scipy.linalg import lu_solve
+from scipy.sparse import coo_matrix
+from scipy.sparse import csr_matrix
 from scipy.sparse import diags
 
 from compas_fd.types import FloatNx1
 from compas_fd.types import FloatNx3
 from compas_fd.types import FloatNxM
+from compas_fd.types import IntN
 from compas_fd.types import IntNx2
 from compas_fd.types import IntNxM
 
+from .linear_solvers import LinearSolver
 from .result import Result
 
+# the attribute names of the input and the results of the force density method on a mesh,
+# as in the default attributes of the cable mesh of compas_fd
+VERTEX_INPUT_ATTRIBUTES = ["x", "y", "z", "px", "py", "pz", "is_anchor"]
+VERTEX_RESULT_ATTRIBUTES = ["_rx", "_ry", "_rz"]
+EDGE_INPUT_ATTRIBUTE = "q"
+EDGE_FORCE_ATTRIBUTE = "_f"
+EDGE_LENGTH_ATTRIBUTE = "_l"
+
 
 @dataclass
 class FDNumericalData:
-    """Data Class for for storing numerical data used by the force density algorithms."""
+    """Data Class for for storing numerical data used by the force density algorithms.
+
+    The free and fixed vertices are stored as integer arrays.
+    The attribute ``permutation`` contains the free vertices followed by the fixed vertices,
+    such that taking the rows of a vertex array in this order makes the free and fixed blocks contiguous.
+    """
 
-    free: int
-    fixed: int
+    free: IntN
+    fixed: IntN
     xyz: FloatNx3
     edges: IntNx2
     C: IntNxM
@@ -41,6 +78,25 @@ class FDNumericalData:
     tangent_residuals: Optional[FloatNx3] = None
     normal_residuals: Optional[FloatNx3] = None
 
+    def __post_init__(self):
+        self.free = asarray(self.free, dtype=intp).reshape(-1)
+        self.fixed = asarray(self.fixed, dtype=intp).reshape(-1)
+        self.permutation = concatenate((self.free, self.fixed))
+        self._factor = None
+        self._factor_q = None
+        self._lowrank = None
+        self._solver_cls = LinearSolver.get_solver_cls("lu")
+        self._solver_options = {}
+        self._keys = {}
+        self._patterns = {}
+        self._uv = asarray(self.edges, dtype=int).reshape((-1, 2))
+        self._free_index = full(len(self.xyz), -1, dtype=int)
+        self._free_index[self.free] = arange(len(self.free))
+        self._fixed_index = full(len(self.xyz), -1, dtype=int)
+        self._fixed_index[self.fixed] = arange(len(self.fixed))
+        self.vertex_keys = None
+        self.edge_keys = None
+
     def __iter__(self):
         return iter(astuple(self))
 
@@ -68,23 +124,32 @@ class FDNumericalData:
         FDNumericalData
 
         """
-        free = list(set(range(len(vertices))) - set(fixed))
         xyz = asarray(vertices, dtype=float64).reshape((-1, 3))
-        C = connectivity_matrix(edges, "csr")
-        Ci = C[:, free]
-        Cf = C[:, fixed]
+        fixed = unique(asarray(fixed, dtype=intp).reshape(-1))
+        is_free = ones(len(xyz), dtype=bool)
+        is_free[fixed] = False
+        free = nonzero(is_free)[0]
         q = asarray(forcedensities, dtype=float64).reshape((-1, 1))
         Q = diags([q.flatten()], [0])
         p = zeros_like(xyz) if loads is None else asarray(loads, dtype=float64).reshape((-1, 3))
-        A = C.T.dot(Q).dot(C)
-        Ai = Ci.T.dot(Q).dot(Ci)
-        Af = Ci.T.dot(Q).dot(Cf)
-        return cls(free, fixed, xyz, edges, C, q, Q, p, A, Ai, Af)
+        numdata = cls(free, fixed, xyz, edges, None, q, Q, p, None, None, None)
+        numdata.C = _connectivity_matrix(numdata._uv, len(xyz))
+        numdata.assemble()
+        return numdata
 
     @classmethod
     def from_mesh(cls, mesh: Mesh) -> "FDNumericalData":
         """Construct numerical arrays from input mesh.
 
+        The coordinates, supports and loads are read from the vertex attributes
+        ``x``, ``y``, ``z``, ``is_anchor``, ``px``, ``py`` and ``pz``,
+        and the force densities from the edge attribute ``q``.
+        Vertices without ``is_anchor`` or load attributes are free and unloaded.
+        The attributes are read with the attribute accessors of the mesh, such that default attributes apply.
+
+        The keys of the vertices and edges are stored in :attr:`vertex_keys` and :attr:`edge_keys`,
+        in the order of the corresponding rows of the numerical arrays.
+
         Parameters
         ----------
         mesh : :class:`compas.datastructures.Mesh`
@@ -93,33 +158,437 @@ class FDNumericalData:
         -------
         FDNumericalData
 
+        Raises
+        ------
+        ValueError
+            If not all edges have a force density.
+
         """
-        raise NotImplementedError
+        vertex_index = mesh.vertex_index()
+        vertex_keys = list(vertex_index)
+        edge_keys = list(mesh.edges())
+
+        data = asarray(mesh.vertices_attributes(VERTEX_INPUT_ATTRIBUTES, keys=vertex_keys), dtype=object)
+        data[equal(data, None)] = 0.0
+        data = data.astype(float64)
+
+        q = mesh.edges_attribute(EDGE_INPUT_ATTRIBUTE, keys=edge_keys)
+        if None in q:
+            raise ValueError("Not all edges have a force density.")
+
+        fixed = nonzero(data[:, 6])[0]
+        edges = [(vertex_index[u], vertex_index[v]) for u, v in edge_keys]
+        numdata = cls.from_params(data[:, :3], fixed, edges, q, data[:, 3:6])
+        numdata.vertex_keys = vertex_keys
+        numdata.edge_keys = edge_keys
+        return numdata
 
     def to_result(self) -> Result:
-        """Parse relevant numerical data into a Result object."""
-        return Result(self.xyz, self.residuals, self.forces, self.lengths)
+        """Parse relevant numerical data into a Result object.
+
+        The coordinates and residuals are copied,
+        since the numerical data can be reused and updated in place by subsequent solves.
+        """
+        residuals = None if self.residuals is None else self.residuals.copy()
+        return Result(self.xyz.copy(), residuals, self.forces, self.lengths)
+
+    def to_mesh(self, mesh: Mesh) -> None:
+        """Store the numerical results in the attributes of a mesh.
+
+        The coordinates are stored in the vertex attributes ``x``, ``y`` and ``z``,
+        the residuals in ``_rx``, ``_ry`` and ``_rz``,
+        and the forces and lengths in the edge attributes ``_f`` and ``_l``,
+        which are the names of the corresponding default attributes of a cable mesh.
+        Results that have not been computed are skipped.
+
+        Parameters
+        ----------
+        mesh : :class:`compas.datastructures.Mesh`
+            The mesh from which the numerical data was constructed,
+            or a mesh with the same vertices and edges in the same order.
+
+        Returns
+        -------
+        None
+
+        """
+        vertex_keys = self.vertex_keys or list(mesh.vertices())
+        edge_keys = self.edge_keys or list(mesh.edges())
+
+        names = ["x", "y", "z"]
+        values = [self.xyz]
+        if self.residuals is not None:
+            names += VERTEX_RESULT_ATTRIBUTES
+            values.append(self.residuals)
+        values = hstack(values).tolist()
+        for key, row in zip(vertex_keys, values):
+            mesh.vertex_attributes(key, names, row)
+
+        names = []
+        values = []
+        if self.forces is not None:
+            names.append(EDGE_FORCE_ATTRIBUTE)
+            values.append(asarray(self.forces).reshape((-1, 1)))
+        if self.lengths is not None:
+            names.append(EDGE_LENGTH_ATTRIBUTE)
+            values.append(asarray(self.lengths).reshape((-1, 1)))
+        if not names:
+            return
+        values = hstack(values).tolist()
+        for key, row in zip(edge_keys, values):
+            mesh.edge_attributes(key, names, row)
+
+    def set_solver(self, solver="lu", **options) -> None:
+        """Select the solver of the linear systems with the free block of the stiffness matrix.
+
+        Parameters
+        ----------
+        solver : str | type[:class:`~compas_fd.solvers.LinearSolver`], optional
+            The name of a registered solver, or a solver class.
+            The registered solvers are ``"lu"``, ``"cholesky"`` and ``"cg"``.
+        **options : dict, optional
+            Options passed to the constructor of the solver.
 
-    def update_forcedensities(self, edges, newqs):
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Selecting the current solver with the same options keeps the existing factorization.
+
+        """
+        cls = LinearSolver.get_solver_cls(solver)
+        if cls is self._solver_cls and options == self._solver_options:
+            return
+        self._solver_cls = cls
+        self._solver_options = options
+        self._factor = None
+        self._factor_q = None
+        self._lowrank = None
+
+    def factorize(self):
+        """Prepare the solver of the free block of the stiffness matrix.
+
+        For direct solvers, this computes the factorization of ``Ai``.
+        The solver is constructed only once, and reused in subsequent calls,
+        until it is invalidated by a change of the force densities.
+
+        Returns
+        -------
+        :class:`~compas_fd.solvers.LinearSolver`
+
+        """
+        if self._factor is None:
+            self._factor = self._solver_cls(self.Ai, **self._solver_options)
+            self._factor_q = self.q.copy()
+            self._lowrank = None
+        return self._factor
+
+    def solve(self, b: FloatNx3, x0: Optional[FloatNx3] = None) -> FloatNx3:
+        """Solve the linear system ``Ai x = b`` using the cached solver of ``Ai``.
+
+        If the force densities were changed in only a few edges since the factorization was computed,
+        the solution is corrected with the Sherman-Morrison-Woodbury formula instead of refactoring ``Ai``.
+
+        Parameters
+        ----------
+        b : FloatNx3
+            The right-hand side(s) of the system.
+        x0 : FloatNx3, optional
+            An initial guess of the solution, for example the current coordinates of the free vertices.
+            Only used by iterative solvers.
+
+        Returns
+        -------
+        FloatNx3
+
+        Warns
+        -----
+        RuntimeWarning
+            If an iterative solver did not converge within its maximum number of iterations.
+
+        """
+        factor = self.factorize()
+        x = factor.solve(b, x0)
+        if not getattr(factor, "converged", True):
+            warn("The linear solver did not converge in {} iterations.".format(factor.iterations), RuntimeWarning)
+        if self._lowrank is not None:
+            U, Z, S = self._lowrank
+            x = x - Z.dot(lu_solve(S, U.T.dot(x)))
+        return x
+
+    def adjoint_gradient(self, dxyz: FloatNx3, dq: Optional[FloatNxM] = None) -> FloatNxM:
+        """Compute the gradient of an objective with respect to the force densities,
+        through the equilibrium of the current coordinates.
+
+        The equilibrium ``Ai xyz[free] = p[free] - Af xyz[fixed]`` makes the free coordinates a function of the force densities.
+        The gradient of an objective ``J(xyz, q)`` is then ``dJ/dq = ∂J/∂q - (C λ) · (C xyz)`` per edge,
+        with the adjoint coordinates ``λ`` the solution of ``Ai λ[free] = ∂J/∂xyz[free]``, and zero at the fixed vertices.
+        The adjoint system is solved with the cached solver of ``Ai``, such that a gradient costs one additional solve.
+        The loads are assumed to be independent of the force densities and of the coordinates.
+
+        Parameters
+        ----------
+        dxyz : FloatNx3
+            The partial derivatives of the objective with respect to the coordinates of all vertices,
+            at the equilibrium coordinates stored in ``xyz``.
+        dq : FloatNxM, optional
+            The partial derivatives of the objective with respect to the force densities.
+
+        Returns
+        -------
+        FloatNxM
+            The gradient of the objective with respect to the force densities, as an array with shape ``(len(q),)``.
+
+        """
+        dxyz = asarray(dxyz, dtype=float64).reshape((-1, 3))
+        adjoint = zeros_like(self.xyz)
+        adjoint[self.free] = self.solve(dxyz.take(self.free, axis=0))
+        gradient = -einsum("ij,ij->i", self.C.dot(adjoint), self.C.dot(self.xyz))
+        if dq is not None:
+            gradient += asarray(dq, dtype=float64).reshape(-1)
+        return gradient
+
+    def forcedensity_jacobian(self) -> FloatNxM:
+        """Compute the derivatives of the equilibrium coordinates with respect to the force densities.
+
+        Every force density requires a solve with the cached solver of ``Ai``.
+        For the gradients of scalar objectives, :meth:`adjoint_gradient` is much cheaper.
+
+        Returns
+        -------
+        FloatNxM
+            The derivatives, as an array with shape ``(len(xyz), 3, len(q))``.
+            The derivatives of the fixed vertices are zero.
+
+        """
+        vectors = self.C.dot(self.xyz)
+        Cf = self.C[:, self.free].T.tocsr()
+        jacobian = zeros((len(self.xyz), 3, len(self.q)))
+        for axis in range(3):
+            jacobian[self.free, axis] = self.solve(-Cf.multiply(vectors[:, axis]).toarray())
+        return jacobian
+
+    def update_forcedensities(self, edges, newqs, max_rank=32):
         """Update the force densities and update the associated matrices.
 
+        Only the nonzero entries of ``A``, ``Ai`` and ``Af`` affected by the modified edges are updated.
+        An existing factorization of ``Ai`` by a direct solver is kept, and corrected with a low-rank update during :meth:`solve`,
+        as long as the number of edges with a modified force density since the factorization does not exceed ``max_rank``.
+
         Parameters
         ----------
         edges : list[int]
             A list of indices in the force density array.
         newqs : list[float]
             The new force densities corresponding to the edge indices.
+        max_rank : int, optional
+            The maximum rank of the low-rank correction of the factorization.
+            If the rank is exceeded, the factorization is recomputed at the next solve.
+
+        Returns
+        -------
+        None
+
+        """
+        edges = asarray(edges, dtype=int).reshape(-1)
+        newqs = asarray(newqs, dtype=float64).reshape(-1)
+        # keep the last occurrence of duplicate edge indices, like regular array assignment
+        edges, index = unique(edges[::-1], return_index=True)
+        newqs = newqs[::-1][index]
+
+        dq = newqs - self.q[edges, 0]
+        self.q[edges, 0] = newqs
+        self.Q.data[0, edges] = newqs
+        self._update_matrices(edges, dq)
+
+        if self._factor is not None:
+            self._update_factor(max_rank)
+
+    def assemble(self) -> None:
+        """Assemble the stiffness matrices ``A``, ``Ai`` and ``Af`` from the current force densities.
+
+        The force densities are scattered directly into the stored entries of the matrices, using the edge index arrays.
+        The sparsity patterns of the matrices, and the maps from the force densities to their stored entries,
+        are computed only at the first assembly, such that reassembly only fills the data arrays.
 
         Returns
         -------
         None
 
         """
-        C = self.C
-        Ci = C[:, self.free]
-        Cf = C[:, self.fixed]
-        self.q[edges] = newqs
-        self.Q = diags([self.q.flatten()], [0])
-        self.A = C.T.dot(self.Q).dot(C)
-        self.Ai = Ci.T.dot(self.Q).dot(Ci)
-        self.Af = Ci.T.dot(self.Q).dot(Cf)
+        q = self.q[:, 0]
+        for name in ("A", "Ai", "Af"):
+            P, indices, indptr, shape = self._pattern(name)
+            setattr(self, name, csr_matrix((P.dot(q), indices, indptr), shape=shape))
+        self._factor = None
+        self._factor_q = None
+        self._lowrank = None
+
+    def forcedensity_map(self, name: str) -> csr_matrix:
+        """Compute the linear map from the force densities to the stored entries of one of the stiffness matrices.
+
+        If the matrix does not have the assembled sparsity structure,
+        for example because it was replaced after the assembly,
+        it is first reassembled.
+
+        Parameters
+        ----------
+        name : {"A", "Ai", "Af"}
+            The name of the matrix.
+
+        Returns
+        -------
+        :class:`scipy.sparse.csr_matrix`
+            A matrix ``P`` with one row per stored entry of the stiffness matrix ``M``,
+            and one column per edge, such that ``M.data = P.dot(q)``.
+
+        """
+        P, indices, indptr, shape = self._pattern(name)
+        M = getattr(self, name)
+        if not _has_pattern(M, indices, indptr, shape):
+            setattr(self, name, csr_matrix((P.dot(self.q[:, 0]), indices, indptr), shape=shape))
+            self._keys.pop(name, None)
+        return P
+
+    def _pattern(self, name):
+        """Compute the sparsity pattern of a stiffness matrix, and the map from the force densities to its stored entries.
+
+        Returns the map, the column indices and the index pointers of the matrix in canonical CSR format, and its shape.
+        The pattern of ``A`` is computed from the edges, and the patterns of ``Ai`` and ``Af`` are extracted from it.
+        The patterns are computed only once.
+        """
+        if name not in self._patterns:
+            n = len(self.xyz)
+            if name == "A":
+                shape = n, n
+                rows, cols, index, signs = self._edge_entries(name, arange(len(self._uv)))
+                keys, pos = unique(rows * n + cols, return_inverse=True)
+                P = coo_matrix((signs, (pos, index)), shape=(len(keys), len(self._uv))).tocsr()
+            else:
+                P, indices, indptr, _ = self._pattern("A")
+                rows = self._free_index[repeat(arange(n), diff(indptr))]
+                if name == "Ai":
+                    shape = len(self.free), len(self.free)
+                    cols = self._free_index[indices]
+                else:
+                    shape = len(self.free), len(self.fixed)
+                    cols = self._fixed_index[indices]
+                entries = nonzero((rows > -1) & (cols > -1))[0]
+                keys = rows[entries] * shape[1] + cols[entries]
+                # the entries of A are ordered by vertex index,
+                # which is not necessarily the order of the free and fixed vertices
+                if len(keys) and not (diff(keys) > 0).all():
+                    order = argsort(keys)
+                    keys, entries = keys[order], entries[order]
+                P = P[entries]
+            indices = keys % max(shape[1], 1)
+            indptr = concatenate(([0], cumsum(bincount(keys // max(shape[1], 1), minlength=shape[0]))))
+            self._patterns[name] = P, indices, indptr, shape
+            self._keys[name] = keys
+        return self._patterns[name]
+
+    def _edge_entries(self, name, edges):
+        """Compute the row and column indices of the entries of a stiffness matrix to which the given edges contribute.
+
+        Returns the rows, the columns, the local index of the contributing edge in ``edges``,
+        and the sign of the contribution of its force density.
+        """
+        u, v = self._uv[edges].T
+        k = arange(len(u))
+        rows = concatenate((u, v, u, v))
+        cols = concatenate((u, v, v, u))
+        index = concatenate((k, k, k, k))
+        signs = concatenate((full(len(k), 1.0), full(len(k), 1.0), full(len(k), -1.0), full(len(k), -1.0)))
+        if name == "A":
+            return rows, cols, index, signs
+        rows = self._free_index[rows]
+        cols = self._free_index[cols] if name == "Ai" else self._fixed_index[cols]
+        keep = (rows > -1) & (cols > -1)
+        return rows[keep], cols[keep], index[keep], signs[keep]
+
+    def _entry_positions(self, name, M, rows, cols):
+        """Find the positions of entries in the data array of a canonical CSR matrix.
+
+        Returns None if not all entries are part of the sparsity structure of the matrix.
+        """
+        if name not in self._keys:
+            self._keys[name] = _entry_keys(M)
+        keys = self._keys[name]
+        ekeys = rows * M.shape[1] + cols
+        pos = searchsorted(keys, ekeys)
+        pos[pos == len(keys)] = 0
+        if len(ekeys) and not (len(keys) and (keys[pos] == ekeys).all()):
+            del self._keys[name]
+            return None
+        return pos
+
+    def _update_matrices(self, edges, dq):
+        """Add the contributions of the force density increments of the given edges to ``A``, ``Ai`` and ``Af``."""
+        for name in ("A", "Ai", "Af"):
+            rows, cols, index, signs = self._edge_entries(name, edges)
+            vals = signs * dq[index]
+            M = getattr(self, name)
+            pos = self._entry_positions(name, M, rows, cols)
+            if pos is None:
+                setattr(self, name, _canonical(M + coo_matrix((vals, (rows, cols)), shape=M.shape)))
+            else:
+                add.at(M.data, pos, vals)
+
+    def _update_factor(self, max_rank):
+        """Update the low-rank correction of the factorization of ``Ai`` to the current force densities."""
+        dq = self.q[:, 0] - self._factor_q[:, 0]
+        edges = nonzero(dq)[0]
+        u, v = self._uv[edges].T
+        fu = self._free_index[u]
+        fv = self._free_index[v]
+        active = (fu > -1) | (fv > -1)
+        edges, fu, fv, dq = edges[active], fu[active], fv[active], dq[edges[active]]
+
+        if not len(edges):
+            self._lowrank = None
+            return
+        if len(edges) > max_rank or not self._factor.is_direct:
+            self._factor = None
+            self._factor_q = None
+            self._lowrank = None
+            return
+
+        k = arange(len(edges))
+        rows = concatenate((fu, fv))
+        cols = concatenate((k, k))
+        vals = concatenate((full(len(k), 1.0), full(len(k), -1.0)))
+        keep = rows > -1
+        U = coo_matrix((vals[keep], (rows[keep], cols[keep])), shape=(len(self.free), len(k))).tocsc()
+        Z = self._factor.solve(U.toarray())
+        S = diags(1.0 / dq).toarray() + U.T.dot(Z)
+        self._lowrank = U, Z, lu_factor(S)
+
+
+def _connectivity_matrix(edges, n):
+    """Construct the connectivity matrix of edges between ``n`` vertices directly from the edge index arrays."""
+    u, v = edges.T
+    k = arange(len(u))
+    data = concatenate((full(len(k), -1.0), full(len(k), 1.0)))
+    return coo_matrix((data, (concatenate((k, k)), concatenate((u, v)))), shape=(len(k), n)).tocsr()
+
+
+def _has_pattern(M, indices, indptr, shape):
+    """Verify whether a matrix is in CSR format with the given sparsity pattern."""
+    if M is None or M.format != "csr" or M.shape != shape or M.nnz != len(indices):
+        return False
+    return (M.indptr == indptr).all() and (M.indices == indices).all()
+
+
+def _canonical(M):
+    """Convert a sparse matrix to CSR format with sorted indices and without duplicates."""
+    M = M.tocsr()
+    M.sum_duplicates()
+    return M
+
+
+def _entry_keys(M):
+    """Compute the sorted, linear row-major keys of the stored entries of a canonical CSR matrix."""
+    rows = repeat(arange(M.shape[0]), diff(M.indptr))
+    return rows * M.shape[1] + M.indices
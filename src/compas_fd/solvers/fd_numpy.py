@@ -1,9 +1,9 @@
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Tuple
 
-from compas.linalg import normrow
-from scipy.sparse.linalg import spsolve
+import numpy as np
 
 from compas_fd.types import FloatNx3
 
@@ -18,6 +18,11 @@ def fd_numpy(
     edges: List[Tuple[int, int]],
     forcedensities: List[float],
     loads: Optional[FloatNx3] = None,
+    solver: str = "lu",
+    solver_options: Optional[dict] = None,
+    selfweight: Optional[Callable] = None,
+    kmax: int = 100,
+    tol_load: float = 1e-6,
 ) -> Result:
     """Compute the equilibrium coordinates of a system of vertices connected by edges.
 
@@ -31,16 +36,37 @@ def fd_numpy(
         The edges between the vertices.
     forcedensities : list[float]
         The force densities of the edges.
-    loads : FloatNx3, optional
+    loads : FloatNx3 | FloatLxNx3, optional
         The loads on the vertices.
+        A stack of loads with shape ``(L, N, 3)`` defines ``L`` load cases,
+        which are solved together with a single factorization of the stiffness matrix.
+    solver : str, optional
+        The name of the solver of the linear system with the free block of the stiffness matrix.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+    selfweight : callable, optional
+        Function that computes the selfweight of the vertices from their coordinates,
+        for example a :class:`~compas_fd.loads.SelfweightCalculator`.
+        The selfweight is applied in the negative Z direction, in addition to the loads.
+        Since the selfweight depends on the geometry, the equilibrium is solved repeatedly,
+        with the selfweight of the previous solution, and the factorization of the first solve.
+        With multiple load cases, the selfweight is computed per load case.
+    kmax : int, optional
+        Maximum number of solves with an updated selfweight.
+    tol_load : float, optional
+        Tolerance for the maximum change of the selfweight between two solves,
+        relative to the maximum selfweight.
 
     Returns
     -------
     Result
+        With multiple load cases, the stacked results, with the results of each load case along the first axis.
 
     See Also
     --------
     :func:`compas_fd.solvers.fd_constrained_numpy`
+    :func:`compas_fd.solvers.fd_batch_numpy`
 
     Examples
     --------
@@ -57,28 +83,79 @@ def fd_numpy(
 
     >>> result = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
 
-    >>> all(result.residuals < 1e-6)
+    >>> free = [vertex for vertex in range(len(vertices)) if vertex not in fixed]
+    >>> bool((abs(result.residuals[free]) < 1e-6).all())
     True
-    >>> all(result.forces > 0)
+    >>> bool((result.forces > 0).all())
+    True
+
+    >>> cases = [[[0, 0, -1]] * len(vertices), [[0.2, 0, -1]] * len(vertices)]
+    >>> result = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=cases)
+    >>> result.vertices.shape == (2, len(vertices), 3)
+    True
+    >>> bool((abs(result.residuals[:, free]) < 1e-6).all())
     True
 
     """
-    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, loads)
+    stacked = loads is not None and np.ndim(loads) == 3
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, forcedensities, None if stacked else loads)
+    numdata.set_solver(solver, **(solver_options or {}))
 
-    xyz = numdata.xyz
     free = numdata.free
     fixed = numdata.fixed
     q = numdata.q
-    p = numdata.p
     C = numdata.C
     A = numdata.A
-    Ai = numdata.Ai
     Af = numdata.Af
 
-    b = p[free] - Af.dot(xyz[fixed])
-    xyz[free] = spsolve(Ai, b)
-    lengths = normrow(C.dot(xyz))
+    # the load cases are stored side by side, as the columns of a single array of right-hand sides,
+    # such that all cases are solved with one factorization, and processed with one sparse product per matrix
+    if stacked:
+        loads = np.asarray(loads, dtype=float).reshape((-1, len(numdata.xyz), 3))
+        cases = len(loads)
+        p = loads.transpose(1, 0, 2).reshape((len(numdata.xyz), 3 * cases))
+        xyz = np.tile(numdata.xyz, (1, cases))
+    else:
+        cases = 1
+        p = numdata.p
+        xyz = numdata.xyz
+
+    b = p.take(free, axis=0) - Af.dot(xyz.take(fixed, axis=0))
+    if selfweight is None:
+        xyz[free] = numdata.solve(b, xyz.take(free, axis=0))
+    else:
+        p = p.copy()
+        rhs = np.empty_like(b)
+        weights = None
+        for k in range(kmax):
+            previous = weights
+            weights = np.column_stack([selfweight(xyz[:, 3 * i : 3 * i + 3])[:, 0] for i in range(cases)])
+            if previous is not None and _relative_change(weights, previous) < tol_load:
+                break
+            np.copyto(rhs, b)
+            rhs[:, 2::3] -= weights.take(free, axis=0)
+            xyz[free] = numdata.solve(rhs, xyz.take(free, axis=0))
+        p[:, 2::3] -= weights
+
+    vectors = C.dot(xyz).reshape((-1, cases, 3))
+    lengths = np.sqrt(np.einsum("ijk,ijk->ij", vectors, vectors))
     forces = q * lengths
     residuals = p - A.dot(xyz)
 
-    return Result(xyz, residuals, forces, lengths)
+    if not stacked:
+        return Result(xyz, residuals, forces, lengths)
+
+    return Result(
+        xyz.reshape((-1, cases, 3)).transpose(1, 0, 2),
+        residuals.reshape((-1, cases, 3)).transpose(1, 0, 2),
+        forces.T[:, :, None],
+        lengths.T[:, :, None],
+    )
+
+
+def _relative_change(new, old) -> float:
+    """Compute the maximum change of a set of values, relative to their maximum absolute value."""
+    scale = np.abs(new).max(initial=0.0)
+    if scale == 0:
+        return 0.0
+    return np.abs(new - old).max() / scale
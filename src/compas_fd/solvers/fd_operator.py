@@ -0,0 +1,122 @@
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator
+
+from compas_fd.types import FloatNxM
+from compas_fd.types import IntN
+
+
+class FDOperator(LinearOperator):
+    """Matrix-free stiffness matrix ``A = C^T Q C`` of a force density system, or one of its diagonal blocks.
+
+    The product with a block of vectors is computed directly from the edge index arrays and the force densities,
+    with scatter-adds over the edges, such that no sparse matrix is assembled.
+    The memory of the operator is proportional to the number of edges.
+
+    Parameters
+    ----------
+    edges : list[tuple[int, int]]
+        The edges between the vertices.
+    forcedensities : list[float]
+        The force densities of the edges.
+    n : int
+        The number of vertices.
+    vertices : list[int], optional
+        The vertices of the rows and columns of the block of the stiffness matrix.
+        For example, the free vertices for the free block ``Ai``.
+        Defaults to all vertices.
+
+    Examples
+    --------
+    >>> from compas_fd.solvers import FDOperator
+    >>> A = FDOperator([(0, 1), (1, 2)], [1.0, 2.0], 3)
+    >>> A.dot([1.0, 0.0, 0.0]).tolist()
+    [1.0, -1.0, 0.0]
+    >>> A.diagonal().tolist()
+    [1.0, 3.0, 2.0]
+
+    """
+
+    def __init__(self, edges: List[Tuple[int, int]], forcedensities: List[float], n: int, vertices: Optional[IntN] = None):
+        edges = np.asarray(edges, dtype=np.intp).reshape((-1, 2))
+        self.u = edges[:, 0]
+        self.v = edges[:, 1]
+        self.n = n
+        self.vertices = None if vertices is None else np.asarray(vertices, dtype=np.intp).reshape(-1)
+        if self.vertices is None:
+            self._i, self._j, self._edges = self.u, self.v, None
+        else:
+            # only the edges between two vertices of the block contribute outside the diagonal
+            index = np.full(n, -1, dtype=np.intp)
+            index[self.vertices] = np.arange(len(self.vertices))
+            i = index[self.u]
+            j = index[self.v]
+            self._edges = np.nonzero((i >= 0) & (j >= 0))[0]
+            self._i, self._j = i[self._edges], j[self._edges]
+        size = n if self.vertices is None else len(self.vertices)
+        super(FDOperator, self).__init__(np.float64, (size, size))
+        self.q = np.asarray(forcedensities, dtype=np.float64).reshape(-1)
+
+    @property
+    def q(self):
+        """The force densities of the edges."""
+        return self._q
+
+    @q.setter
+    def q(self, q):
+        self._q = q
+        d = np.bincount(self.u, q, self.n) + np.bincount(self.v, q, self.n)
+        self._d = d if self.vertices is None else d[self.vertices]
+        self._qij = q if self._edges is None else q[self._edges]
+
+    def diagonal(self) -> FloatNxM:
+        """Compute the diagonal of the operator, for example for a Jacobi preconditioner.
+
+        Returns
+        -------
+        FloatNxM
+
+        """
+        return self._d
+
+    def apply(self, X: FloatNxM) -> FloatNxM:
+        """Compute the product of the complete stiffness matrix ``A`` with a block of vectors with one row per vertex.
+
+        Parameters
+        ----------
+        X : FloatNxM
+            The vectors, with shape ``(n, k)``.
+
+        Returns
+        -------
+        FloatNxM
+            The product, with shape ``(n, k)``.
+
+        """
+        X = np.asarray(X, dtype=np.float64).reshape((self.n, -1))
+        Y = np.empty((X.shape[1], self.n))
+        for x, y in zip(X.T, Y):
+            x = np.ascontiguousarray(x)
+            forces = self._q * (x[self.u] - x[self.v])
+            np.subtract(np.bincount(self.u, forces, self.n), np.bincount(self.v, forces, self.n), out=y)
+        return Y.T
+
+    def _matmat(self, X):
+        # the columns are processed separately, since the gathers and bincounts are much faster on contiguous vectors
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.empty((X.shape[1], len(X)))
+        for x, y in zip(X.T, Y):
+            x = np.ascontiguousarray(x)
+            np.multiply(self._d, x, out=y)
+            y -= np.bincount(self._i, self._qij * x[self._j], len(x))
+            y -= np.bincount(self._j, self._qij * x[self._i], len(x))
+        return Y.T
+
+    def _matvec(self, x):
+        return self._matmat(np.reshape(x, (-1, 1))).ravel()
+
+    def _adjoint(self):
+        return self
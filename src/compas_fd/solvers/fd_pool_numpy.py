@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from traceback import format_exc
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from .fd_constrained_numpy import fd_constrained_numpy
+from .result import Result
+
+
+class JobResult(NamedTuple):
+    """Outcome of a single form finding job of a batch.
+
+    Attributes
+    ----------
+    index : int
+        The index of the job in the batch.
+    result : :class:`~compas_fd.solvers.result.Result` | None
+        The result of the job, or None if the job failed.
+    error : str | None
+        The representation of the error raised by the job, or None if the job succeeded.
+    traceback : str | None
+        The formatted traceback of the error, or None if the job succeeded.
+
+    """
+
+    index: int
+    result: Optional[Result]
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+
+
+def fd_constrained_pool_numpy(
+    jobs: Iterable[Dict[str, Any]],
+    *,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> Iterator[JobResult]:
+    """Solve a batch of independent constrained form finding problems in a pool of processes.
+
+    Every job is a dict with the keyword arguments of :func:`~compas_fd.solvers.fd_constrained_numpy`.
+    The constraints of the jobs are sent to the worker processes in their serialized data format,
+    and reconstructed there, instead of pickling the constraint geometry.
+    Errors are returned as strings, such that errors that cannot be pickled do not affect the other jobs.
+
+    Parameters
+    ----------
+    jobs : iterable[dict]
+        The keyword arguments of the jobs.
+    max_workers : int, optional
+        The maximum number of worker processes.
+        Defaults to the number of processors of the machine.
+    chunksize : int, optional
+        The number of jobs sent to a worker process at once.
+
+    Yields
+    ------
+    :class:`JobResult`
+        The outcome of every job, in order of completion.
+        A failing job is reported with its error, without interrupting the other jobs.
+
+    See Also
+    --------
+    :func:`compas_fd.solvers.fd_constrained_numpy`
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import fd_constrained_pool_numpy
+
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=10)
+
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> loads = [[0, 0, -1] for _ in range(len(vertices))]
+    >>> jobs = [dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[q] * len(edges), loads=loads, constraints=[None] * len(vertices)) for q in (1.0, 2.0, 3.0)]
+
+    >>> outcomes = sorted(fd_constrained_pool_numpy(jobs, max_workers=2))
+    >>> [outcome.index for outcome in outcomes]
+    [0, 1, 2]
+
+    """
+    chunks = _chunks(enumerate(_serialize_job(job) for job in jobs), chunksize)
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(_solve_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                outcomes = future.result()
+            except Exception as e:
+                # the worker process itself failed
+                outcomes = [JobResult(index, None, repr(e), format_exc()) for index, _ in futures[future]]
+            for outcome in outcomes:
+                yield outcome
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the constraint objects of a job by their class and data."""
+    job = dict(job)
+    job["constraints"] = [None if not constraint else (type(constraint), constraint.__data__) for constraint in job.get("constraints") or []]
+    return job
+
+
+def _deserialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstruct the constraint objects of a job from their class and data."""
+    job = dict(job)
+    job["constraints"] = [None if not item else item[0].__from_data__(item[1]) for item in job["constraints"]]
+    return job
+
+
+def _solve_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[JobResult]:
+    outcomes = []
+    for index, job in chunk:
+        try:
+            result = fd_constrained_numpy(**_deserialize_job(job))
+        except Exception as e:
+            outcomes.append(JobResult(index, None, repr(e), format_exc()))
+        else:
+            outcomes.append(JobResult(index, result))
+    return outcomes
@@ -0,0 +1,259 @@
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+
+from compas_fd.constraints import Constraint
+from compas_fd.types import FloatNx3
+
+from .fd_constrained_numpy import _post_process_fd
+from .fd_constrained_numpy import _solve_fd
+from .fd_constrained_numpy import fd_constrained_numpy
+from .fd_numerical_data import FDNumericalData
+from .result import Result
+
+
+class FDSession:
+    """Persistent force density system, for a sequence of small edits with a solve after every edit.
+
+    The session keeps the numerical data of the system in memory, with its assembled matrices,
+    the factorization of the free block of the stiffness matrix, the constraints and the last equilibrium.
+    Every edit invalidates only what it affects.
+    Changes of the loads and of the positions of the supports only change the right-hand side.
+    Changes of a few force densities correct the factorization with a low-rank update.
+    Only changes of the fixed vertices require new numerical data.
+    Solves with constraints start from the last equilibrium.
+
+    Parameters
+    ----------
+    vertices : FloatNx3
+        The XYZ coordinates of the vertices.
+    fixed : list[int]
+        The fixed vertices.
+        Fixed vertices with a constraint move on their constraint.
+    edges : list[tuple[int, int]]
+        The edges between the vertices.
+    forcedensities : list[float]
+        The force densities of the edges.
+    loads : FloatNx3, optional
+        The loads on the vertices.
+    constraints : list[:class:`~compas_fd.constraints.Constraint` | None], optional
+        The constraints of the vertices, with None for vertices without constraint.
+    solver : str, optional
+        The name of the solver of the linear system with the free block of the stiffness matrix.
+        See :class:`~compas_fd.solvers.LinearSolver`.
+        Low-rank updates of the factorization require a direct solver.
+    solver_options : dict, optional
+        Options passed to the constructor of the solver.
+
+    Attributes
+    ----------
+    numdata : :class:`~compas_fd.solvers.fd_numerical_data.FDNumericalData`
+        The numerical data of the system, with the coordinates of the last solve.
+    result : :class:`~compas_fd.solvers.result.Result` | None
+        The result of the last solve.
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import FDSession
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> session = FDSession(vertices, fixed, edges, [1.0] * len(edges), [[0, 0, -1]] * len(vertices))
+    >>> result = session.solve()
+    >>> session.set_forcedensities([0, 1], [2.0, 2.0])
+    >>> session.move_vertices([fixed[0]], [[0, 0, 1]])
+    >>> result = session.solve()
+    >>> result.vertices[fixed[0]].tolist()
+    [0.0, 0.0, 1.0]
+
+    """
+
+    def __init__(
+        self,
+        vertices: FloatNx3,
+        fixed: List[int],
+        edges: List[Tuple[int, int]],
+        forcedensities: List[float],
+        loads: Optional[FloatNx3] = None,
+        constraints: Optional[Sequence[Optional[Constraint]]] = None,
+        solver: str = "lu",
+        solver_options: Optional[dict] = None,
+    ):
+        self.vertices = np.array(vertices, dtype=float).reshape((-1, 3))
+        self.edges = edges
+        self.constraints = [None] * len(self.vertices) if constraints is None else list(constraints)
+        self.solver = solver
+        self.solver_options = solver_options or {}
+        # the numerical data does not copy its input arrays, and is updated in place
+        loads = None if loads is None else np.array(loads, dtype=float)
+        self.numdata = FDNumericalData.from_params(self.vertices.copy(), fixed, edges, np.array(forcedensities, dtype=float), loads)
+        self.numdata.set_solver(solver, **self.solver_options)
+        self.result = None
+
+    @property
+    def fixed(self) -> List[int]:
+        return self.numdata.fixed.tolist()
+
+    @property
+    def forcedensities(self) -> List[float]:
+        return self.numdata.q[:, 0].tolist()
+
+    # =============================================================================
+    # Edits
+    # =============================================================================
+
+    def set_forcedensities(self, edges: List[int], forcedensities: List[float]) -> None:
+        """Change the force densities of a number of edges.
+
+        Only the affected entries of the matrices are updated,
+        and the factorization is corrected with a low-rank update, up to the maximum rank of the numerical data.
+
+        Parameters
+        ----------
+        edges : list[int]
+            The indices of the edges.
+        forcedensities : list[float]
+            The new force densities of the edges.
+
+        Returns
+        -------
+        None
+
+        """
+        self.numdata.update_forcedensities(edges, forcedensities)
+
+    def set_loads(self, vertices: List[int], loads: FloatNx3) -> None:
+        """Change the loads on a number of vertices.
+
+        The matrices and the factorization are not affected.
+
+        Parameters
+        ----------
+        vertices : list[int]
+            The indices of the vertices.
+        loads : FloatNx3
+            The new loads on the vertices.
+
+        Returns
+        -------
+        None
+
+        """
+        self.numdata.p[vertices] = np.asarray(loads, dtype=float).reshape((-1, 3))
+
+    def move_vertices(self, vertices: List[int], xyz: FloatNx3) -> None:
+        """Move a number of vertices.
+
+        Moving a fixed vertex changes the position of the support, or the starting point on its constraint.
+        Moving a free vertex only changes the starting point of the next solve.
+        The matrices and the factorization are not affected.
+
+        Parameters
+        ----------
+        vertices : list[int]
+            The indices of the vertices.
+        xyz : FloatNx3
+            The new coordinates of the vertices.
+
+        Returns
+        -------
+        None
+
+        """
+        xyz = np.asarray(xyz, dtype=float).reshape((-1, 3))
+        self.vertices[vertices] = xyz
+        self.numdata.xyz[vertices] = xyz
+
+    def set_constraint(self, vertex: int, constraint: Optional[Constraint]) -> None:
+        """Add, replace or remove the constraint of a vertex.
+
+        A constrained vertex has to be fixed, such that constraining a free vertex also fixes it.
+        A vertex of which the constraint is removed remains fixed, as a support at its current position.
+
+        Parameters
+        ----------
+        vertex : int
+            The index of the vertex.
+        constraint : :class:`~compas_fd.constraints.Constraint` | None
+            The new constraint, or None to remove the constraint.
+
+        Returns
+        -------
+        None
+
+        """
+        if constraint is None and self.constraints[vertex] is not None:
+            self.vertices[vertex] = self.numdata.xyz[vertex]
+        self.constraints[vertex] = constraint
+        if constraint is not None and vertex not in self.numdata.fixed:
+            self.set_fixed(self.fixed + [vertex])
+
+    def set_fixed(self, fixed: List[int]) -> None:
+        """Change the fixed vertices.
+
+        This changes the partition of the stiffness matrix,
+        such that the numerical data is recomputed, from the current force densities, loads and coordinates.
+
+        Parameters
+        ----------
+        fixed : list[int]
+            The new fixed vertices.
+
+        Returns
+        -------
+        None
+
+        """
+        numdata = self.numdata
+        # newly fixed vertices are supported at their current position
+        new = np.setdiff1d(np.asarray(fixed, dtype=int), numdata.fixed)
+        self.vertices[new] = numdata.xyz[new]
+        self.numdata = FDNumericalData.from_params(numdata.xyz, fixed, self.edges, numdata.q, numdata.p)
+        self.numdata.set_solver(self.solver, **self.solver_options)
+
+    # =============================================================================
+    # Solve
+    # =============================================================================
+
+    def solve(self, **kwargs) -> Result:
+        """Compute the equilibrium of the current state of the system.
+
+        Without constraints and selfweight, this is a single solve with the cached factorization.
+        Otherwise, the iterations of :func:`~compas_fd.solvers.fd_constrained_numpy` start from the last equilibrium.
+
+        Parameters
+        ----------
+        **kwargs : dict, optional
+            Additional options of :func:`~compas_fd.solvers.fd_constrained_numpy`,
+            for example ``kmax``, ``tol_res``, ``tol_disp`` or ``selfweight``.
+
+        Returns
+        -------
+        :class:`~compas_fd.solvers.result.Result`
+
+        """
+        numdata = self.numdata
+        if not any(self.constraints) and not kwargs.get("selfweight"):
+            _solve_fd(numdata)
+            _post_process_fd(numdata)
+            result = numdata.to_result()
+        else:
+            result = fd_constrained_numpy(
+                vertices=self.vertices,
+                fixed=numdata.fixed,
+                edges=self.edges,
+                forcedensities=numdata.q[:, 0],
+                loads=numdata.p,
+                constraints=self.constraints,
+                solver=self.solver,
+                solver_options=self.solver_options,
+                warmstart=numdata,
+                **kwargs,
+            )
+        self.result = result
+        return result
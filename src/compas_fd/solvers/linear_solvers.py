@@ -0,0 +1,255 @@
+from typing import Callable
+from typing import Optional
+
+from numpy import asarray
+from numpy import divide
+from numpy import einsum
+from numpy import maximum
+from numpy import sqrt
+from numpy import zeros_like
+from scipy.sparse import csc_matrix
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+from scipy.sparse.linalg import spilu
+from scipy.sparse.linalg import splu
+
+from compas_fd.types import FloatNxM
+
+
+class LinearSolver:
+    """Base class for the solvers of the linear systems with the free block of the stiffness matrix.
+
+    The solvers use a registration mechanism,
+    such that the force density functions can select a solver by its name.
+
+    Parameters
+    ----------
+    A : :class:`scipy.sparse.spmatrix`
+        The matrix of the system.
+        For the Cholesky and conjugate gradient solvers, the matrix has to be symmetric positive definite,
+        which is the case if all force densities are positive.
+
+    Attributes
+    ----------
+    is_direct : bool
+        True if the solver computes a factorization of the matrix.
+        The factorization of a direct solver is corrected with low-rank updates
+        when the force densities of only a few edges are changed.
+
+    Examples
+    --------
+    >>> from scipy.sparse import identity
+    >>> from compas_fd.solvers import LinearSolver
+    >>> solver = LinearSolver.get_solver_cls("cg")(identity(3), preconditioner="jacobi")
+    >>> solver.solve([[1.0], [2.0], [3.0]]).ravel().tolist()
+    [1.0, 2.0, 3.0]
+
+    """
+
+    SOLVERS = {}
+
+    is_direct = True
+
+    @staticmethod
+    def register(name, cls):
+        LinearSolver.SOLVERS[name] = cls
+
+    @staticmethod
+    def get_solver_cls(name):
+        if isinstance(name, type) and issubclass(name, LinearSolver):
+            return name
+        try:
+            return LinearSolver.SOLVERS[name]
+        except KeyError:
+            raise ValueError("No linear solver is registered with this name: {}".format(name))
+
+    def __init__(self, A, **kwargs):
+        self.A = A
+
+    def solve(self, b: FloatNxM, x0: Optional[FloatNxM] = None) -> FloatNxM:
+        """Solve the linear system ``A x = b``.
+
+        Parameters
+        ----------
+        b : FloatNxM
+            The right-hand side(s) of the system.
+        x0 : FloatNxM, optional
+            An initial guess of the solution.
+            Only used by iterative solvers.
+
+        Returns
+        -------
+        FloatNxM
+
+        """
+        raise NotImplementedError
+
+
+class LUSolver(LinearSolver):
+    """Direct solver based on a sparse LU factorization of the matrix.
+
+    Parameters
+    ----------
+    A : :class:`scipy.sparse.spmatrix`
+        The matrix of the system.
+    permc_spec : str, optional
+        The fill-reducing ordering of the columns of the matrix.
+    symmetric : bool, optional
+        If True, use a symmetric ordering, which reduces fill for symmetric matrices.
+        The factorization pivots on the diagonal only if the diagonal is positive and dominant,
+        which is the case for the free block of the stiffness matrix if all force densities are positive.
+        Otherwise, for example with edges in compression, partial pivoting is used for stability.
+
+    """
+
+    def __init__(self, A, permc_spec: str = "COLAMD", symmetric: bool = False):
+        super(LUSolver, self).__init__(A)
+        if symmetric and _is_diagonally_dominant(A):
+            self.factor = splu(csc_matrix(A), permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+        elif symmetric:
+            self.factor = splu(csc_matrix(A), permc_spec="MMD_AT_PLUS_A")
+        else:
+            self.factor = splu(csc_matrix(A), permc_spec=permc_spec)
+
+    def solve(self, b, x0=None):
+        return self.factor.solve(b)
+
+
+class CholeskySolver(LinearSolver):
+    """Direct solver based on a sparse Cholesky factorization of a symmetric positive definite matrix.
+
+    This solver requires ``scikit-sparse``.
+
+    Parameters
+    ----------
+    A : :class:`scipy.sparse.spmatrix`
+        The matrix of the system.
+    ordering_method : str, optional
+        The fill-reducing ordering used by CHOLMOD.
+
+    """
+
+    def __init__(self, A, ordering_method: str = "default"):
+        super(CholeskySolver, self).__init__(A)
+        try:
+            from sksparse.cholmod import cholesky
+        except ImportError:
+            raise ImportError("The Cholesky solver requires scikit-sparse.")
+        self.factor = cholesky(csc_matrix(A), ordering_method=ordering_method)
+
+    def solve(self, b, x0=None):
+        return self.factor(b)
+
+
+class CGSolver(LinearSolver):
+    """Iterative solver based on the preconditioned conjugate gradient method,
+    for symmetric positive definite matrices.
+
+    All columns of the right-hand side are solved together,
+    such that every iteration requires only one product of the matrix with a block of vectors.
+
+    Parameters
+    ----------
+    A : :class:`scipy.sparse.spmatrix` | :class:`scipy.sparse.linalg.LinearOperator`
+        The matrix of the system, or an operator computing its products,
+        such as a :class:`~compas_fd.solvers.FDOperator`.
+    preconditioner : {"jacobi", "ilu", "amg"} | None, optional
+        The preconditioner.
+        The algebraic multigrid preconditioner requires ``pyamg``.
+        The Jacobi preconditioner of an operator requires its ``diagonal``,
+        and the other preconditioners require a matrix.
+    tol : float, optional
+        The tolerance for the norm of the residual of every column,
+        relative to the larger of the norms of the corresponding columns of the right-hand side and of the product of the matrix with the initial guess.
+        The second norm makes the tolerance meaningful for right-hand sides that are zero, with a nonzero initial guess.
+    maxiter : int, optional
+        The maximum number of iterations.
+        Defaults to the number of rows of the matrix.
+
+    Attributes
+    ----------
+    iterations : int
+        The number of iterations of the last solve.
+    converged : bool
+        True if all columns of the last solve converged within the maximum number of iterations.
+
+    """
+
+    is_direct = False
+
+    def __init__(self, A, preconditioner: Optional[str] = "jacobi", tol: float = 1e-10, maxiter: Optional[int] = None):
+        super(CGSolver, self).__init__(A if isinstance(A, LinearOperator) else csr_matrix(A))
+        self.tol = tol
+        self.maxiter = maxiter or self.A.shape[0]
+        self.precondition = _preconditioner(self.A, preconditioner)
+        self.iterations = 0
+        self.converged = True
+
+    def solve(self, b, x0=None):
+        b = asarray(b, dtype=float)
+        B = b.reshape((len(b), -1))
+        X = zeros_like(B) if x0 is None else asarray(x0, dtype=float).reshape(B.shape).copy()
+        R = B - self.A.dot(X)
+        Z = self.precondition(R)
+        P = Z.copy()
+        rz = einsum("ij,ij->j", R, Z)
+        # the product of the matrix with the initial guess is B - R
+        AX = B - R
+        bound = self.tol * maximum(sqrt(einsum("ij,ij->j", B, B)), sqrt(einsum("ij,ij->j", AX, AX)))
+
+        self.converged = False
+        for k in range(self.maxiter + 1):
+            self.iterations = k
+            if (sqrt(einsum("ij,ij->j", R, R)) <= bound).all():
+                self.converged = True
+                break
+            if k == self.maxiter:
+                break
+            AP = self.A.dot(P)
+            # columns that have converged exactly have no search direction left
+            alpha = _divide(rz, einsum("ij,ij->j", P, AP))
+            X += alpha * P
+            R -= alpha * AP
+            Z = self.precondition(R)
+            rz, rz_prev = einsum("ij,ij->j", R, Z), rz
+            P = Z + _divide(rz, rz_prev) * P
+
+        return X.reshape(b.shape)
+
+
+LinearSolver.register("lu", LUSolver)
+LinearSolver.register("cholesky", CholeskySolver)
+LinearSolver.register("cg", CGSolver)
+
+
+def _preconditioner(A, name: Optional[str]) -> Callable[[FloatNxM], FloatNxM]:
+    """Construct the function applying a preconditioner to a block of residual vectors."""
+    if name is None:
+        return lambda R: R.copy()
+    if name == "jacobi":
+        d = A.diagonal().reshape((-1, 1))
+        return lambda R: R / d
+    if isinstance(A, LinearOperator):
+        raise ValueError("The preconditioner requires an assembled matrix: {}".format(name))
+    if name == "ilu":
+        return spilu(csc_matrix(A)).solve
+    if name == "amg":
+        try:
+            from pyamg import smoothed_aggregation_solver
+        except ImportError:
+            raise ImportError("The algebraic multigrid preconditioner requires pyamg.")
+        M = smoothed_aggregation_solver(A).aspreconditioner(cycle="V")
+        return M.matmat
+    raise ValueError("Unknown preconditioner: {}".format(name))
+
+
+def _is_diagonally_dominant(A) -> bool:
+    """Verify that the diagonal of a matrix is positive and dominant, such that it can be factorized without pivoting."""
+    A = csr_matrix(A)
+    d = A.diagonal()
+    offdiagonal = asarray(abs(A).sum(axis=1)).ravel() - abs(d)
+    return bool((d > 0).all() and (d >= offdiagonal * (1 - 1e-12)).all())
+
+
+def _divide(a, b):
+    return divide(a, b, out=zeros_like(a), where=b != 0)
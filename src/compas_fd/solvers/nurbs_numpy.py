@@ -0,0 +1,628 @@
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+from compas_fd.types import FloatNx1
+from compas_fd.types import FloatNx3
+from compas_fd.types import FloatNxM
+
+
+class NurbsCurveEvaluator:
+    """Vectorized evaluator of a non-periodic NURBS curve.
+
+    Parameters
+    ----------
+    points : FloatNx3
+        The control points of the curve.
+    weights : FloatNx1
+        The weights of the control points.
+    knotvector : list[float]
+        The full knot vector of the curve, with ``len(points) + degree + 1`` knots.
+    degree : int
+        The degree of the curve.
+
+    """
+
+    def __init__(self, points: FloatNx3, weights: FloatNx1, knotvector, degree: int):
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        weights = np.asarray(weights, dtype=float).reshape((-1, 1))
+        self.degree = degree
+        self.knotvector = _full_knotvector(knotvector, len(points), degree)
+        self.homogeneous = np.hstack((points * weights, weights))
+        self.is_closed = np.allclose(points[0], points[-1])
+        self.samples = _span_samples(self.knotvector, degree, 4 * (degree + 1))
+        self.sample_points = self.point_at(self.samples)
+
+    @classmethod
+    def from_geometry(cls, curve) -> "NurbsCurveEvaluator":
+        """Construct an evaluator for a COMPAS NURBS curve.
+
+        Parameters
+        ----------
+        curve : :class:`compas.geometry.NurbsCurve`
+
+        Returns
+        -------
+        :class:`NurbsCurveEvaluator`
+
+        """
+        if curve.is_periodic:
+            raise ValueError("Periodic curves are not supported.")
+        knotvector = np.repeat(curve.knots, curve.multiplicities)
+        return cls(curve.points, curve.weights, knotvector, curve.degree)
+
+    @property
+    def domain(self) -> Tuple[float, float]:
+        return self.knotvector[self.degree], self.knotvector[-self.degree - 1]
+
+    def derivatives_at(self, params: FloatNx1, order: int = 2) -> FloatNxM:
+        """Compute the point and the derivatives of the curve at the given parameters.
+
+        Parameters
+        ----------
+        params : FloatNx1
+            The curve parameters.
+        order : int, optional
+            The highest order of derivatives.
+
+        Returns
+        -------
+        FloatNxM
+            An array with shape ``(order + 1, len(params), 3)``.
+            The first item contains the points, the second the first derivatives, etc.
+
+        """
+        params = np.asarray(params, dtype=float).reshape(-1)
+        span = _find_spans(self.knotvector, self.degree, len(self.homogeneous), params)
+        ders = _basis_derivatives(self.knotvector, self.degree, span, params, order)
+        index = span[:, None] - self.degree + np.arange(self.degree + 1)
+        H = np.einsum("dkj,kjc->dkc", ders, self.homogeneous[index])
+        return _rational_derivatives(H)
+
+    def point_at(self, params: FloatNx1) -> FloatNx3:
+        """Compute the points of the curve at the given parameters."""
+        return self.derivatives_at(params, order=0)[0]
+
+    def tangent_at(self, params: FloatNx1) -> FloatNx3:
+        """Compute the unit tangent vectors of the curve at the given parameters."""
+        return _unitized(self.derivatives_at(params, order=1)[1])
+
+    def closest_points(
+        self,
+        points: FloatNx3,
+        params: Optional[FloatNx1] = None,
+        maxiter: int = 20,
+        tol: float = 1e-12,
+        warmiter: int = 5,
+    ) -> Tuple[FloatNx3, FloatNx1]:
+        """Compute the closest points on the curve to a batch of points.
+
+        The parameters of the closest points are found by sampling the curve at every knot span,
+        and refining the nearest samples with Newton iterations.
+        If parameters of nearby points are provided, for example from a previous iteration,
+        a few Newton iterations are run from those parameters instead,
+        and the global search is only used for the points for which this local search
+        fails to converge or leaves the domain of the curve.
+
+        Parameters
+        ----------
+        points : FloatNx3
+            The points to project.
+        params : FloatNx1, optional
+            Initial parameters for a warm-started local search.
+        maxiter : int, optional
+            Maximum number of Newton iterations of the global search.
+        tol : float, optional
+            Tolerance for the parameter increments of the Newton iterations.
+        warmiter : int, optional
+            Maximum number of Newton iterations of the warm-started local search.
+
+        Returns
+        -------
+        tuple[FloatNx3, FloatNx1]
+            The closest points and their parameters.
+
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        if params is None:
+            params = self.samples[_nearest(points, self.sample_points)]
+            params = self._newton(points, params, maxiter, tol)[0]
+        else:
+            params, converged = self._newton(points, np.array(params, dtype=float).reshape(-1), warmiter, tol)
+            failed = ~converged
+            if failed.any():
+                params[failed] = self.closest_points(points[failed], maxiter=maxiter, tol=tol)[1]
+        return self.point_at(params), params
+
+    def _newton(self, points, params, maxiter, tol):
+        """Refine the parameters of closest points with Newton iterations on ``C'(t) . (C(t) - P) = 0``.
+
+        Returns the refined parameters, and a boolean array indicating for which points the iterations converged
+        without leaving the domain of the curve.
+        """
+        tmin, tmax = self.domain
+        tol = tol * max(1.0, tmax - tmin)
+        params = params.copy()
+        converged = np.zeros(len(points), dtype=bool)
+        inside = np.ones(len(points), dtype=bool)
+        active = np.arange(len(points))
+        for _ in range(maxiter):
+            t = params[active]
+            C, C1, C2 = self.derivatives_at(t)
+            r = C - points[active]
+            f = np.einsum("ij,ij->i", C1, r)
+            gn = np.einsum("ij,ij->i", C1, C1)
+            df = gn + np.einsum("ij,ij->i", C2, r)
+            # fall back to a Gauss-Newton step where the second order term makes the step ascend
+            df = np.where(df > 0, df, gn)
+            dt = -f / df
+            bounded = _bound(t + dt, tmin, tmax, self.is_closed)
+            clipped = bounded != t + dt
+            params[active] = bounded
+            inside[active] &= self.is_closed | ~clipped
+            # points stuck at the boundary of the domain are done as well
+            done = (np.abs(dt) <= tol) | (clipped & (bounded == t))
+            converged[active] = done
+            active = active[~done]
+            if not len(active):
+                break
+        return params, converged & inside
+
+
+class CircleEvaluator:
+    """Vectorized evaluator of a circle, with the parameters normalized to the interval ``[0, 1]``.
+
+    Parameters
+    ----------
+    center : list[float]
+        The center of the circle.
+    xaxis : list[float]
+        The unit X axis of the plane of the circle, which corresponds to parameter zero.
+    yaxis : list[float]
+        The unit Y axis of the plane of the circle.
+    radius : float
+        The radius of the circle.
+
+    """
+
+    def __init__(self, center, xaxis, yaxis, radius: float):
+        self.center = np.asarray(center, dtype=float).reshape((1, 3))
+        self.xaxis = np.asarray(xaxis, dtype=float).reshape((1, 3))
+        self.yaxis = np.asarray(yaxis, dtype=float).reshape((1, 3))
+        self.radius = radius
+
+    @classmethod
+    def from_geometry(cls, circle) -> "CircleEvaluator":
+        """Construct an evaluator for a COMPAS circle.
+
+        Parameters
+        ----------
+        circle : :class:`compas.geometry.Circle`
+
+        Returns
+        -------
+        :class:`CircleEvaluator`
+
+        """
+        frame = circle.frame
+        return cls(frame.point, frame.xaxis, frame.yaxis, circle.radius)
+
+    @property
+    def domain(self) -> Tuple[float, float]:
+        return 0.0, 1.0
+
+    def derivatives_at(self, params: FloatNx1, order: int = 2) -> FloatNxM:
+        """Compute the point and the derivatives of the circle at the given parameters.
+
+        Parameters
+        ----------
+        params : FloatNx1
+            The circle parameters.
+        order : int, optional
+            The highest order of derivatives.
+
+        Returns
+        -------
+        FloatNxM
+            An array with shape ``(order + 1, len(params), 3)``.
+            The first item contains the points, the second the first derivatives, etc.
+
+        """
+        angles = 2 * np.pi * np.asarray(params, dtype=float).reshape((-1, 1))
+        cos = np.cos(angles) * self.xaxis + np.sin(angles) * self.yaxis
+        sin = -np.sin(angles) * self.xaxis + np.cos(angles) * self.yaxis
+        ders = np.empty((order + 1, len(angles), 3))
+        ders[0] = self.center + self.radius * cos
+        for d in range(1, order + 1):
+            # every derivative rotates the radius vector by a quarter turn
+            ders[d] = self.radius * (2 * np.pi) ** d * (sin if d % 2 else cos) * (-1) ** (d // 2)
+        return ders
+
+    def point_at(self, params: FloatNx1) -> FloatNx3:
+        """Compute the points of the circle at the given parameters."""
+        angles = 2 * np.pi * np.asarray(params, dtype=float).reshape((-1, 1))
+        return self.center + self.radius * (np.cos(angles) * self.xaxis + np.sin(angles) * self.yaxis)
+
+    def tangent_at(self, params: FloatNx1) -> FloatNx3:
+        """Compute the unit tangent vectors of the circle at the given parameters."""
+        angles = 2 * np.pi * np.asarray(params, dtype=float).reshape((-1, 1))
+        return -np.sin(angles) * self.xaxis + np.cos(angles) * self.yaxis
+
+    def closest_points(self, points: FloatNx3, params: Optional[FloatNx1] = None) -> Tuple[FloatNx3, FloatNx1]:
+        """Compute the closest points on the circle to a batch of points.
+
+        Parameters
+        ----------
+        points : FloatNx3
+            The points to project.
+        params : FloatNx1, optional
+            Ignored, since the closest points on a circle are computed directly.
+
+        Returns
+        -------
+        tuple[FloatNx3, FloatNx1]
+            The closest points and their parameters.
+
+        """
+        vectors = np.asarray(points, dtype=float).reshape((-1, 3)) - self.center
+        x = vectors.dot(self.xaxis[0])
+        y = vectors.dot(self.yaxis[0])
+        params = np.mod(np.arctan2(y, x) / (2 * np.pi), 1.0)
+        return self.point_at(params), params
+
+
+class NurbsSurfaceEvaluator:
+    """Vectorized evaluator of a non-periodic NURBS surface.
+
+    Parameters
+    ----------
+    points : FloatNxM
+        The control points of the surface, as an array with shape ``(nu, nv, 3)``.
+    weights : FloatNxM
+        The weights of the control points, as an array with shape ``(nu, nv)``.
+    knotvector_u : list[float]
+        The full knot vector in the U direction.
+    knotvector_v : list[float]
+        The full knot vector in the V direction.
+    degree_u : int
+        The degree in the U direction.
+    degree_v : int
+        The degree in the V direction.
+
+    """
+
+    def __init__(self, points: FloatNxM, weights: FloatNxM, knotvector_u, knotvector_v, degree_u: int, degree_v: int):
+        points = np.asarray(points, dtype=float)
+        weights = np.asarray(weights, dtype=float).reshape(points.shape[:2] + (1,))
+        self.degree_u = degree_u
+        self.degree_v = degree_v
+        self.knotvector_u = _full_knotvector(knotvector_u, points.shape[0], degree_u)
+        self.knotvector_v = _full_knotvector(knotvector_v, points.shape[1], degree_v)
+        self.homogeneous = np.concatenate((points * weights, weights), axis=2)
+        self.is_closed_u = np.allclose(points[0], points[-1])
+        self.is_closed_v = np.allclose(points[:, 0], points[:, -1])
+        su = _span_samples(self.knotvector_u, degree_u, 2 * (degree_u + 1))
+        sv = _span_samples(self.knotvector_v, degree_v, 2 * (degree_v + 1))
+        self.samples = np.array(np.meshgrid(su, sv, indexing="ij")).reshape((2, -1)).T
+        self.sample_points = self.point_at(self.samples[:, 0], self.samples[:, 1])
+
+    @classmethod
+    def from_geometry(cls, surface) -> "NurbsSurfaceEvaluator":
+        """Construct an evaluator for a COMPAS NURBS surface.
+
+        Parameters
+        ----------
+        surface : :class:`compas.geometry.NurbsSurface`
+
+        Returns
+        -------
+        :class:`NurbsSurfaceEvaluator`
+
+        """
+        if surface.is_periodic_u or surface.is_periodic_v:
+            raise ValueError("Periodic surfaces are not supported.")
+        points = [[list(point) for point in row] for row in surface.points]
+        knotvector_u = np.repeat(surface.knots_u, surface.mults_u)
+        knotvector_v = np.repeat(surface.knots_v, surface.mults_v)
+        return cls(points, surface.weights, knotvector_u, knotvector_v, surface.degree_u, surface.degree_v)
+
+    @property
+    def domain_u(self) -> Tuple[float, float]:
+        return self.knotvector_u[self.degree_u], self.knotvector_u[-self.degree_u - 1]
+
+    @property
+    def domain_v(self) -> Tuple[float, float]:
+        return self.knotvector_v[self.degree_v], self.knotvector_v[-self.degree_v - 1]
+
+    def derivatives_at(self, u: FloatNx1, v: FloatNx1, order: int = 2) -> FloatNxM:
+        """Compute the point and the partial derivatives of the surface at the given parameters.
+
+        Parameters
+        ----------
+        u : FloatNx1
+            The parameters in the U direction.
+        v : FloatNx1
+            The parameters in the V direction.
+        order : int, optional
+            The highest order of derivatives.
+
+        Returns
+        -------
+        FloatNxM
+            An array with shape ``(order + 1, order + 1, len(u), 3)``,
+            in which the item ``[a, b]`` contains the ``a``-th derivative in U of the ``b``-th derivative in V.
+            Items with ``a + b > order`` are not computed.
+
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        v = np.asarray(v, dtype=float).reshape(-1)
+        pu, pv = self.degree_u, self.degree_v
+        nu, nv = self.homogeneous.shape[:2]
+        span_u = _find_spans(self.knotvector_u, pu, nu, u)
+        span_v = _find_spans(self.knotvector_v, pv, nv, v)
+        ders_u = _basis_derivatives(self.knotvector_u, pu, span_u, u, order)
+        ders_v = _basis_derivatives(self.knotvector_v, pv, span_v, v, order)
+        index_u = span_u[:, None] - pu + np.arange(pu + 1)
+        index_v = span_v[:, None] - pv + np.arange(pv + 1)
+        Hw = self.homogeneous[index_u[:, :, None], index_v[:, None, :]]
+        H = np.zeros((order + 1, order + 1, len(u), 4))
+        for a in range(order + 1):
+            for b in range(order + 1 - a):
+                H[a, b] = np.einsum("ki,kj,kijc->kc", ders_u[a], ders_v[b], Hw)
+        return _rational_surface_derivatives(H, order)
+
+    def point_at(self, u: FloatNx1, v: FloatNx1) -> FloatNx3:
+        """Compute the points of the surface at the given parameters."""
+        return self.derivatives_at(u, v, order=0)[0, 0]
+
+    def normal_at(self, u: FloatNx1, v: FloatNx1) -> FloatNx3:
+        """Compute the unit normal vectors of the surface at the given parameters."""
+        S = self.derivatives_at(u, v, order=1)
+        return _unitized(np.cross(S[1, 0], S[0, 1]))
+
+    def closest_points(
+        self,
+        points: FloatNx3,
+        params: Optional[FloatNxM] = None,
+        maxiter: int = 20,
+        tol: float = 1e-12,
+        warmiter: int = 5,
+    ) -> Tuple[FloatNx3, FloatNxM]:
+        """Compute the closest points on the surface to a batch of points.
+
+        The parameters of the closest points are found by sampling the surface at every pair of knot spans,
+        and refining the nearest samples with Newton iterations.
+        If parameters of nearby points are provided, for example from a previous iteration,
+        a few Newton iterations are run from those parameters instead,
+        and the global search is only used for the points for which this local search
+        fails to converge or leaves the domain of the surface.
+
+        Parameters
+        ----------
+        points : FloatNx3
+            The points to project.
+        params : FloatNxM, optional
+            Initial UV parameters for a warm-started local search.
+        maxiter : int, optional
+            Maximum number of Newton iterations of the global search.
+        tol : float, optional
+            Tolerance for the parameter increments of the Newton iterations.
+        warmiter : int, optional
+            Maximum number of Newton iterations of the warm-started local search.
+
+        Returns
+        -------
+        tuple[FloatNx3, FloatNxM]
+            The closest points and their UV parameters.
+
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        if params is None:
+            params = self.samples[_nearest(points, self.sample_points)]
+            params = self._newton(points, params, maxiter, tol)[0]
+        else:
+            params, converged = self._newton(points, np.asarray(params, dtype=float).reshape((-1, 2)), warmiter, tol)
+            failed = ~converged
+            if failed.any():
+                params[failed] = self.closest_points(points[failed], maxiter=maxiter, tol=tol)[1]
+        return self.point_at(params[:, 0], params[:, 1]), params
+
+    def _newton(self, points, params, maxiter, tol):
+        """Refine the parameters of closest points with Newton iterations on the gradient of the squared distance.
+
+        Returns the refined parameters, and a boolean array indicating for which points the iterations converged
+        without leaving the domain of the surface.
+        """
+        umin, umax = self.domain_u
+        vmin, vmax = self.domain_v
+        tol = tol * max(1.0, umax - umin, vmax - vmin)
+        params = params.copy()
+        converged = np.zeros(len(points), dtype=bool)
+        inside = np.ones(len(points), dtype=bool)
+        active = np.arange(len(points))
+        for _ in range(maxiter):
+            uv = params[active]
+            S = self.derivatives_at(uv[:, 0], uv[:, 1])
+            r = S[0, 0] - points[active]
+            Su, Sv = S[1, 0], S[0, 1]
+            fu = np.einsum("ij,ij->i", Su, r)
+            fv = np.einsum("ij,ij->i", Sv, r)
+            # Gauss-Newton part of the Hessian
+            guu = np.einsum("ij,ij->i", Su, Su)
+            guv = np.einsum("ij,ij->i", Su, Sv)
+            gvv = np.einsum("ij,ij->i", Sv, Sv)
+            # full Hessian
+            huu = guu + np.einsum("ij,ij->i", S[2, 0], r)
+            huv = guv + np.einsum("ij,ij->i", S[1, 1], r)
+            hvv = gvv + np.einsum("ij,ij->i", S[0, 2], r)
+            det = huu * hvv - huv * huv
+            # fall back to the Gauss-Newton step where the Hessian is not positive definite
+            pd = (det > 0) & (huu > 0)
+            huu = np.where(pd, huu, guu)
+            huv = np.where(pd, huv, guv)
+            hvv = np.where(pd, hvv, gvv)
+            det = np.where(pd, det, guu * gvv - guv * guv)
+            du = -(hvv * fu - huv * fv) / det
+            dv = -(huu * fv - huv * fu) / det
+            u = _bound(uv[:, 0] + du, umin, umax, self.is_closed_u)
+            v = _bound(uv[:, 1] + dv, vmin, vmax, self.is_closed_v)
+            # steps across the seam of a closed direction are wrapped, not clipped
+            clipped_u = np.zeros(len(u), dtype=bool) if self.is_closed_u else u != uv[:, 0] + du
+            clipped_v = np.zeros(len(v), dtype=bool) if self.is_closed_v else v != uv[:, 1] + dv
+            clipped = clipped_u | clipped_v
+            params[active, 0] = u
+            params[active, 1] = v
+            inside[active] &= ~clipped
+            # points stuck at the boundary of the domain are done as well
+            done = (np.maximum(np.abs(du), np.abs(dv)) <= tol) | (clipped & (u == uv[:, 0]) & (v == uv[:, 1]))
+            converged[active] = done
+            active = active[~done]
+            if not len(active):
+                break
+        return params, converged & inside
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+
+def _full_knotvector(knotvector, n: int, degree: int):
+    """Convert a knot vector to the full knot vector with ``n + degree + 1`` knots.
+
+    Knot vectors without the superfluous first and last knot (``n + degree - 1`` knots) are padded.
+    """
+    knotvector = np.asarray(knotvector, dtype=float).reshape(-1)
+    if len(knotvector) == n + degree - 1:
+        knotvector = np.concatenate((knotvector[:1], knotvector, knotvector[-1:]))
+    if len(knotvector) != n + degree + 1:
+        raise ValueError("The knot vector does not match the number of control points and the degree.")
+    return knotvector
+
+
+def _bound(params, tmin: float, tmax: float, closed: bool):
+    """Wrap parameters into the domain of a closed curve, or clip them to the domain of an open curve."""
+    if closed:
+        return tmin + np.mod(params - tmin, tmax - tmin)
+    return np.clip(params, tmin, tmax)
+
+
+def _find_spans(knotvector, degree: int, n: int, params):
+    """Find the knot span indices of the parameters, such that ``U[span] <= t < U[span + 1]``."""
+    span = np.searchsorted(knotvector, params, side="right") - 1
+    return np.clip(span, degree, n - 1)
+
+
+def _span_samples(knotvector, degree: int, count: int):
+    """Compute parameters sampling every non-empty knot span with a number of evenly spaced parameters."""
+    knots = np.unique(knotvector[degree : len(knotvector) - degree])
+    t = np.linspace(0.0, 1.0, count, endpoint=False)
+    samples = knots[:-1, None] + t[None, :] * np.diff(knots)[:, None]
+    return np.append(samples.reshape(-1), knots[-1])
+
+
+def _basis_derivatives(knotvector, p: int, span, params, n: int):
+    """Compute the nonzero basis functions and their derivatives, vectorized over the parameters.
+
+    Vectorized version of algorithm A2.3 of *The NURBS Book* (Piegl & Tiller).
+
+    Returns
+    -------
+    ndarray
+        An array with shape ``(n + 1, len(params), p + 1)``.
+
+    """
+    U = knotvector
+    k = len(params)
+    # derivatives of order higher than the degree are zero
+    m = min(n, p)
+    ndu = np.zeros((p + 1, p + 1, k))
+    ndu[0, 0] = 1.0
+    left = np.zeros((p + 1, k))
+    right = np.zeros((p + 1, k))
+    for j in range(1, p + 1):
+        left[j] = params - U[span + 1 - j]
+        right[j] = U[span + j] - params
+        saved = np.zeros(k)
+        for r in range(j):
+            ndu[j, r] = right[r + 1] + left[j - r]
+            temp = ndu[r, j - 1] / ndu[j, r]
+            ndu[r, j] = saved + right[r + 1] * temp
+            saved = left[j - r] * temp
+        ndu[j, j] = saved
+
+    ders = np.zeros((n + 1, p + 1, k))
+    ders[0] = ndu[:, p]
+    a = np.zeros((2, p + 1, k))
+    for r in range(p + 1):
+        s1, s2 = 0, 1
+        a[0, 0] = 1.0
+        for i in range(1, m + 1):
+            d = np.zeros(k)
+            rk = r - i
+            pk = p - i
+            if r >= i:
+                a[s2, 0] = a[s1, 0] / ndu[pk + 1, rk]
+                d = a[s2, 0] * ndu[rk, pk]
+            j1 = 1 if rk >= -1 else -rk
+            j2 = i - 1 if r - 1 <= pk else p - r
+            for j in range(j1, j2 + 1):
+                a[s2, j] = (a[s1, j] - a[s1, j - 1]) / ndu[pk + 1, rk + j]
+                d = d + a[s2, j] * ndu[rk + j, pk]
+            if r <= pk:
+                a[s2, i] = -a[s1, i - 1] / ndu[pk + 1, r]
+                d = d + a[s2, i] * ndu[r, pk]
+            ders[i, r] = d
+            s1, s2 = s2, s1
+
+    factor = p
+    for i in range(1, m + 1):
+        ders[i] *= factor
+        factor *= p - i
+    return ders.transpose((0, 2, 1))
+
+
+def _rational_derivatives(H):
+    """Compute the derivatives of a rational curve from the derivatives of its homogeneous representation."""
+    A = H[:, :, :3]
+    w = H[:, :, 3:]
+    C = np.zeros_like(A)
+    C[0] = A[0] / w[0]
+    if len(H) > 1:
+        C[1] = (A[1] - w[1] * C[0]) / w[0]
+    if len(H) > 2:
+        C[2] = (A[2] - 2 * w[1] * C[1] - w[2] * C[0]) / w[0]
+    return C
+
+
+def _rational_surface_derivatives(H, order: int):
+    """Compute the partial derivatives of a rational surface from the derivatives of its homogeneous representation."""
+    A = H[..., :3]
+    w = H[..., 3:]
+    S = np.zeros_like(A)
+    w0 = w[0, 0]
+    S[0, 0] = A[0, 0] / w0
+    if order > 0:
+        S[1, 0] = (A[1, 0] - w[1, 0] * S[0, 0]) / w0
+        S[0, 1] = (A[0, 1] - w[0, 1] * S[0, 0]) / w0
+    if order > 1:
+        S[2, 0] = (A[2, 0] - 2 * w[1, 0] * S[1, 0] - w[2, 0] * S[0, 0]) / w0
+        S[0, 2] = (A[0, 2] - 2 * w[0, 1] * S[0, 1] - w[0, 2] * S[0, 0]) / w0
+        S[1, 1] = (A[1, 1] - w[1, 1] * S[0, 0] - w[1, 0] * S[0, 1] - w[0, 1] * S[1, 0]) / w0
+    return S
+
+
+def _nearest(points, samples, chunksize: int = 256):
+    """Find the index of the nearest sample for every point."""
+    index = np.empty(len(points), dtype=int)
+    ss = np.einsum("ij,ij->i", samples, samples)
+    for start in range(0, len(points), chunksize):
+        chunk = points[start : start + chunksize]
+        d2 = ss[None, :] - 2 * chunk.dot(samples.T)
+        index[start : start + chunksize] = np.argmin(d2, axis=1)
+    return index
+
+
+def _unitized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1).reshape((-1, 1))
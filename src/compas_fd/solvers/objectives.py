@@ -0,0 +1,337 @@
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+from compas_fd.types import FloatNx3
+from compas_fd.types import FloatNxM
+
+from .fd_numerical_data import FDNumericalData
+
+
+class Objective:
+    """Base class for scalar objectives of the equilibrium of a force density system.
+
+    An objective is a function of the coordinates of the vertices and of the force densities of the edges.
+    Its gradient with respect to the force densities is computed through the equilibrium,
+    with an adjoint solve that reuses the factorization of the forward solve.
+    Objectives can be added together, and scaled by their ``weight``.
+
+    Parameters
+    ----------
+    weight : float, optional
+        The factor of the objective.
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> from compas_fd.solvers import LoadPathObjective
+    >>> from compas_fd.solvers.fd_numerical_data import FDNumericalData
+    >>> mesh = Mesh.from_meshgrid(dx=10, nx=4)
+    >>> vertices = mesh.vertices_attributes("xyz")
+    >>> fixed = list(mesh.vertices_where(vertex_degree=2))
+    >>> edges = list(mesh.edges())
+    >>> numdata = FDNumericalData.from_params(vertices, fixed, edges, [1.0] * len(edges), [[0, 0, -1]] * len(vertices))
+    >>> numdata.xyz[numdata.free] = numdata.solve(numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed]))
+    >>> gradient = LoadPathObjective().gradient(numdata)
+    >>> gradient.shape == (len(edges),)
+    True
+
+    """
+
+    def __init__(self, weight: float = 1.0):
+        self.weight = weight
+
+    def __add__(self, other: "Objective") -> "Objective":
+        return ObjectiveSum([self, other])
+
+    def value(self, numdata: FDNumericalData) -> float:
+        """Compute the value of the objective.
+
+        Parameters
+        ----------
+        numdata : :class:`~compas_fd.solvers.fd_numerical_data.FDNumericalData`
+            The numerical data, with the equilibrium coordinates in ``xyz``.
+
+        Returns
+        -------
+        float
+
+        """
+        raise NotImplementedError
+
+    def partials(self, numdata: FDNumericalData) -> Tuple[FloatNx3, Optional[FloatNxM]]:
+        """Compute the partial derivatives of the objective.
+
+        Parameters
+        ----------
+        numdata : :class:`~compas_fd.solvers.fd_numerical_data.FDNumericalData`
+            The numerical data, with the equilibrium coordinates in ``xyz``.
+
+        Returns
+        -------
+        tuple[FloatNx3, FloatNxM | None]
+            The partial derivatives with respect to the coordinates of all vertices,
+            and with respect to the force densities, or None if the objective does not depend on them directly.
+
+        """
+        raise NotImplementedError
+
+    def gradient(self, numdata: FDNumericalData) -> FloatNxM:
+        """Compute the gradient of the objective with respect to the force densities, through the equilibrium.
+
+        Parameters
+        ----------
+        numdata : :class:`~compas_fd.solvers.fd_numerical_data.FDNumericalData`
+            The numerical data, with the equilibrium coordinates in ``xyz``.
+
+        Returns
+        -------
+        FloatNxM
+            The gradient, as an array with shape ``(len(q),)``.
+
+        See Also
+        --------
+        :meth:`compas_fd.solvers.fd_numerical_data.FDNumericalData.adjoint_gradient`
+
+        """
+        return numdata.adjoint_gradient(*self.partials(numdata))
+
+
+class ObjectiveSum(Objective):
+    """The sum of a number of objectives.
+
+    Parameters
+    ----------
+    objectives : list[:class:`Objective`]
+        The objectives.
+
+    """
+
+    def __init__(self, objectives: List[Objective]):
+        super(ObjectiveSum, self).__init__()
+        self.objectives = []
+        for objective in objectives:
+            self.objectives += objective.objectives if isinstance(objective, ObjectiveSum) else [objective]
+
+    def value(self, numdata):
+        return sum(objective.value(numdata) for objective in self.objectives)
+
+    def partials(self, numdata):
+        dxyz = np.zeros_like(numdata.xyz)
+        dq = np.zeros(len(numdata.q))
+        for objective in self.objectives:
+            x, q = objective.partials(numdata)
+            dxyz += x
+            if q is not None:
+                dq += q
+        return dxyz, dq
+
+
+class TargetPointsObjective(Objective):
+    """Half the weighted sum of the squared distances of vertices to their target points.
+
+    Parameters
+    ----------
+    targets : FloatNx3
+        The target points.
+    vertices : list[int], optional
+        The vertices corresponding to the target points.
+        Defaults to all vertices.
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def __init__(self, targets: FloatNx3, vertices: Optional[List[int]] = None, weight: float = 1.0):
+        super(TargetPointsObjective, self).__init__(weight=weight)
+        self.targets = np.asarray(targets, dtype=float).reshape((-1, 3))
+        self.vertices = None if vertices is None else np.asarray(vertices, dtype=int)
+
+    def _difference(self, numdata):
+        xyz = numdata.xyz if self.vertices is None else numdata.xyz[self.vertices]
+        return xyz - self.targets
+
+    def value(self, numdata):
+        d = self._difference(numdata)
+        return 0.5 * self.weight * np.einsum("ij,ij->", d, d)
+
+    def partials(self, numdata):
+        dxyz = np.zeros_like(numdata.xyz)
+        if self.vertices is None:
+            dxyz[:] = self.weight * self._difference(numdata)
+        else:
+            np.add.at(dxyz, self.vertices, self.weight * self._difference(numdata))
+        return dxyz, None
+
+
+class TargetLengthsObjective(Objective):
+    """Half the weighted sum of the squared differences between the lengths of edges and their target lengths.
+
+    Parameters
+    ----------
+    lengths : list[float]
+        The target lengths.
+    edges : list[int], optional
+        The indices of the edges corresponding to the target lengths.
+        Defaults to all edges.
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def __init__(self, lengths: List[float], edges: Optional[List[int]] = None, weight: float = 1.0):
+        super(TargetLengthsObjective, self).__init__(weight=weight)
+        self.lengths = np.asarray(lengths, dtype=float).reshape(-1)
+        self.edges = None if edges is None else np.asarray(edges, dtype=int)
+
+    def value(self, numdata):
+        lengths = _edge_vectors(numdata, self.edges)[1]
+        return 0.5 * self.weight * np.sum((lengths - self.lengths) ** 2)
+
+    def partials(self, numdata):
+        vectors, lengths = _edge_vectors(numdata, self.edges)
+        scale = _divide(self.weight * (lengths - self.lengths), lengths)
+        return _scatter_edges(numdata, self.edges, scale[:, None] * vectors), None
+
+
+class TargetForcesObjective(Objective):
+    """Half the weighted sum of the squared differences between the forces in edges and their target forces.
+
+    Parameters
+    ----------
+    forces : list[float]
+        The target forces.
+    edges : list[int], optional
+        The indices of the edges corresponding to the target forces.
+        Defaults to all edges.
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def __init__(self, forces: List[float], edges: Optional[List[int]] = None, weight: float = 1.0):
+        super(TargetForcesObjective, self).__init__(weight=weight)
+        self.forces = np.asarray(forces, dtype=float).reshape(-1)
+        self.edges = None if edges is None else np.asarray(edges, dtype=int)
+
+    def _q(self, numdata):
+        q = numdata.q[:, 0]
+        return q if self.edges is None else q[self.edges]
+
+    def value(self, numdata):
+        lengths = _edge_vectors(numdata, self.edges)[1]
+        return 0.5 * self.weight * np.sum((self._q(numdata) * lengths - self.forces) ** 2)
+
+    def partials(self, numdata):
+        vectors, lengths = _edge_vectors(numdata, self.edges)
+        q = self._q(numdata)
+        dforces = self.weight * (q * lengths - self.forces)
+        dxyz = _scatter_edges(numdata, self.edges, _divide(dforces * q, lengths)[:, None] * vectors)
+        dq = np.zeros(len(numdata.q))
+        np.add.at(dq, slice(None) if self.edges is None else self.edges, dforces * lengths)
+        return dxyz, dq
+
+
+class RegularizationObjective(Objective):
+    """Half the weighted sum of the squared differences between the force densities and reference force densities.
+
+    Parameters
+    ----------
+    forcedensities : list[float]
+        The reference force densities of all edges.
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def __init__(self, forcedensities: List[float], weight: float = 1.0):
+        super(RegularizationObjective, self).__init__(weight=weight)
+        self.forcedensities = np.asarray(forcedensities, dtype=float).reshape(-1)
+
+    def value(self, numdata):
+        return 0.5 * self.weight * np.sum((numdata.q[:, 0] - self.forcedensities) ** 2)
+
+    def partials(self, numdata):
+        return np.zeros_like(numdata.xyz), self.weight * (numdata.q[:, 0] - self.forcedensities)
+
+
+class LoadPathObjective(Objective):
+    """The load path of the system, which is the sum of the products of the forces and the lengths of the edges.
+
+    With ``f = q l``, the load path is ``sum(q l^2)``.
+
+    Parameters
+    ----------
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def value(self, numdata):
+        vectors = numdata.C.dot(numdata.xyz)
+        return self.weight * np.einsum("i,ij,ij->", numdata.q[:, 0], vectors, vectors)
+
+    def partials(self, numdata):
+        vectors = numdata.C.dot(numdata.xyz)
+        dxyz = 2 * self.weight * numdata.C.T.dot(numdata.q * vectors)
+        dq = self.weight * np.einsum("ij,ij->i", vectors, vectors)
+        return dxyz, dq
+
+
+class MaxForceObjective(Objective):
+    """A smooth approximation of the maximum absolute force in the edges, as the p-norm of the forces.
+
+    Parameters
+    ----------
+    p : float, optional
+        The exponent of the norm.
+        Higher exponents approximate the maximum more closely, but make the objective less smooth.
+    weight : float, optional
+        The factor of the objective.
+
+    """
+
+    def __init__(self, p: float = 8.0, weight: float = 1.0):
+        super(MaxForceObjective, self).__init__(weight=weight)
+        self.p = p
+
+    def _forces(self, numdata):
+        vectors = numdata.C.dot(numdata.xyz)
+        lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+        return vectors, lengths, np.abs(numdata.q[:, 0]) * lengths
+
+    def value(self, numdata):
+        forces = self._forces(numdata)[2]
+        return self.weight * np.linalg.norm(forces, self.p)
+
+    def partials(self, numdata):
+        vectors, lengths, forces = self._forces(numdata)
+        norm = np.linalg.norm(forces, self.p)
+        if norm == 0:
+            return np.zeros_like(numdata.xyz), np.zeros(len(forces))
+        dforces = self.weight * (forces / norm) ** (self.p - 1)
+        q = numdata.q[:, 0]
+        scale = _divide(dforces * np.abs(q), lengths)
+        dxyz = numdata.C.T.dot(scale[:, None] * vectors)
+        dq = dforces * np.sign(q) * lengths
+        return dxyz, dq
+
+
+def _edge_vectors(numdata: FDNumericalData, edges: Optional[np.ndarray]):
+    """Compute the vectors and lengths of all edges, or of a selection of edges."""
+    vectors = numdata.C.dot(numdata.xyz)
+    if edges is not None:
+        vectors = vectors[edges]
+    return vectors, np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+
+
+def _scatter_edges(numdata: FDNumericalData, edges: Optional[np.ndarray], values: FloatNx3) -> FloatNx3:
+    """Compute the derivatives with respect to the vertex coordinates from derivatives with respect to the edge vectors."""
+    C = numdata.C if edges is None else numdata.C[edges]
+    return C.T.dot(values)
+
+
+def _divide(a, b):
+    return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
@@ -1,14 +1,43 @@
+from typing import Dict
 from typing import List
 from typing import NamedTuple
+from typing import Optional
 
 from compas_fd.types import FloatNx3
 
 
+class IterationInfo(NamedTuple):
+    """Convergence information of one iteration of an iterative solver.
+
+    Attributes
+    ----------
+    iteration : int
+        The number of the iteration, starting from 1.
+    max_residual : float
+        The maximum residual force at the free vertices.
+    max_tangent_residual : float
+        The maximum tangent component of the residual forces at the constrained vertices.
+    max_displacement : float
+        The maximum displacement of the vertices during the iteration.
+    timings : dict[str, float]
+        The wall-clock time in seconds of the phases of the iteration.
+
+    """
+
+    iteration: int
+    max_residual: float
+    max_tangent_residual: float
+    max_displacement: float
+    timings: Dict[str, float]
+
+
 class Result(NamedTuple):
     vertices: FloatNx3
     residuals: FloatNx3
     forces: List[float]
     lengths: List[float]
+    history: Optional[List[IterationInfo]] = None
+    forcedensities: Optional[List[float]] = None
 
     @classmethod
     def from_dict(cls, data):
@@ -17,4 +46,6 @@ class Result(NamedTuple):
             data["residuals"],
             data["forces"],
             data["lengths"],
+            data.get("history"),
+            data.get("forcedensities"),
         )
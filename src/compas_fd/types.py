@@ -18,6 +18,12 @@ FloatNx1 = Union[
 ]
 """An array-like object, with each item in the array containing one (1) float."""
 
+IntN = Union[
+    Sequence[int],
+    Annotated[npt.NDArray[np.int64], Literal["*"]],
+]
+"""An array-like object of integers."""
+
 IntNx2 = Union[
     Sequence[Annotated[Sequence[int], 2]],
     Annotated[npt.NDArray[np.int32], Literal["*, 2"]],
@@ -0,0 +1,14 @@
+import pytest
+from compas.datastructures import Mesh
+
+
+@pytest.fixture
+def params():
+    """Grid of 10 by 10 faces supported at its corners, with varying force densities and a uniform vertical load."""
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    q = [1.0 + 0.1 * (i % 7) for i in range(len(edges))]
+    loads = [[0, 0, -0.1] for _ in range(len(vertices))]
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from compas_fd.solvers.acceleration import Acceleration
+
+
+def linear_map(x):
+    # contraction with a slow mode
+    return np.array([0.95 * x[0] + 0.05, 0.8 * x[1]])
+
+
+@pytest.mark.parametrize("name", ["anderson", "aitken"])
+def test_accelerated_fixed_point(name):
+    accelerate = Acceleration.get_acceleration_cls(name)()
+    x = np.zeros(2)
+    for k in range(50):
+        g = linear_map(x)
+        if np.linalg.norm(g - x) < 1e-10:
+            break
+        x = accelerate(x, g)
+    assert np.allclose(x, [1.0, 0.0])
+    assert k < 50
+
+
+def test_safeguard_falls_back_to_plain_update():
+    accelerate = Acceleration.get_acceleration_cls("anderson")()
+    accelerate(np.zeros(2), np.ones(2))
+    g = 10 * np.ones(2)
+    assert np.allclose(accelerate(np.ones(2), g), g)
+    assert accelerate.fallbacks == 1
+
+
+def test_unknown_acceleration():
+    with pytest.raises(ValueError):
+        Acceleration.get_acceleration_cls("broyden")
@@ -0,0 +1,39 @@
+import numpy as np
+from compas.datastructures import Mesh
+
+from compas_fd.solvers import fd_batch_numpy
+from compas_fd.solvers import fd_numpy
+
+
+def test_batch_matches_fd_numpy():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    loads = [[0, 0, -1] for _ in range(len(vertices))]
+
+    rng = np.random.default_rng(0)
+    qs = rng.uniform(0.5, 5.0, (4, len(edges)))
+
+    result = fd_batch_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=qs, loads=loads)
+
+    for i, q in enumerate(qs):
+        single = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads)
+        assert np.allclose(result.vertices[i], single.vertices)
+        assert np.allclose(result.residuals[i], single.residuals)
+        assert np.allclose(result.forces[i], single.forces)
+        assert np.allclose(result.lengths[i], single.lengths)
+
+
+def test_batch_compression_pivoting():
+    vertices = [[0, 0, 0], [1, 0.3, 0.7], [2, 0.1, 0.2], [3, 0, 0]]
+    edges = [(0, 1), (1, 2), (2, 3)]
+    loads = [[0.3, 0.7, -1.1]] * 4
+    # the negative force density almost cancels the diagonal entry of the first free vertex
+    q = [2.7, -1.3 + 1e-12, 1.3]
+
+    result = fd_batch_numpy(vertices=vertices, fixed=[0, 3], edges=edges, forcedensities=[q], loads=loads)
+    single = fd_numpy(vertices=vertices, fixed=[0, 3], edges=edges, forcedensities=q, loads=loads)
+
+    assert np.abs(result.residuals[0, 1:3]).max() < 1e-8
+    assert np.allclose(result.vertices[0], single.vertices, rtol=1e-8)
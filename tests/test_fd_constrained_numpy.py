@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Plane
+from compas.geometry import Vector
+
+from compas_fd.constraints import Constraint
+from compas_fd.constraints import PlaneConstraint
+from compas_fd.solvers import constraint_groups
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+@pytest.fixture
+def problem():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    loads = [[0, 0, -0.1] for _ in range(len(vertices))]
+    q = [1.0] * len(edges)
+
+    constraints = [None] * len(vertices)
+    for vertex in mesh.vertices_where(vertex_degree=3):
+        x, y, z = mesh.vertex_coordinates(vertex)
+        if x == 0:
+            constraints[vertex] = Constraint(Line([0, 0, 0], [0, 10, 0]))
+        elif x == 10:
+            constraints[vertex] = Constraint(Plane([10, 0, 0], [1, 0, 0.5]))
+        elif y == 0:
+            constraints[vertex] = Constraint(Vector(0, 1, 0))
+        else:
+            constraints[vertex] = Constraint(Frame([0, 10, 0], [1, 0, 0], [0, 0, 1]))
+
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads, constraints=constraints)
+
+
+def test_grouped_constraints_match_individual_constraints(problem, monkeypatch):
+    grouped = fd_constrained_numpy(**problem)
+
+    monkeypatch.setattr(constraint_groups, "CONSTRAINT_GROUP", {})
+    for constraint in problem["constraints"]:
+        if constraint:
+            constraint.projected = False
+    individual = fd_constrained_numpy(**problem)
+
+    assert np.allclose(grouped.vertices, individual.vertices)
+    assert np.allclose(grouped.residuals, individual.residuals)
+
+
+def test_displacement_convergence(problem):
+    # constrained vertices that are excluded from the linear solve only move by the constraint updates
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    first = fd_constrained_numpy(kmax=1, **problem)
+    result = fd_constrained_numpy(tol_res=1e9, tol_disp=1e-9, **problem)
+
+    # the displacements between iterations are not zero after the first iteration
+    assert not np.allclose(first.vertices, result.vertices)
+
+    for vertex, constraint in enumerate(problem["constraints"]):
+        if isinstance(constraint, PlaneConstraint):
+            plane = constraint.geometry
+            assert np.isclose(np.dot(result.vertices[vertex] - np.array(plane.point), plane.normal), 0.0)
+
+
+def test_circle_constraints():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    mesh.translate([-5, -5, 0])
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    circle = Circle(6.0, Frame.worldXY())
+    constraints = [None] * len(vertices)
+    boundary = list(mesh.vertices_where(vertex_degree=3))
+    for vertex in boundary:
+        constraints[vertex] = Constraint(circle)
+
+    result = fd_constrained_numpy(
+        vertices=vertices,
+        fixed=fixed,
+        edges=edges,
+        forcedensities=[1.0] * len(edges),
+        loads=[[0, 0, -0.1]] * len(vertices),
+        constraints=constraints,
+    )
+
+    radii = np.linalg.norm(result.vertices[boundary, :2], axis=1)
+    assert np.allclose(radii, 6.0)
+    assert np.allclose(result.vertices[boundary, 2], 0.0)
+
+
+def test_callback_and_history(problem):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    infos = []
+    result = fd_constrained_numpy(callback=infos.append, history=True, tol_res=1e-1, tol_disp=1e-2, **problem)
+
+    assert result.history == infos
+    assert [info.iteration for info in infos] == list(range(1, len(infos) + 1))
+    assert len(infos) < 100
+    assert infos[-1].max_tangent_residual < 1e-1
+    assert infos[-1].max_displacement < 1e-2
+    assert set(infos[0].timings) == {"selfweight", "solve", "constraints"}
+
+    assert fd_constrained_numpy(**problem).history is None
+
+
+def test_callback_stops_iterations(problem):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    result = fd_constrained_numpy(callback=lambda info: info.iteration == 3, history=True, **problem)
+    assert len(result.history) == 3
+
+
+def test_warmstart_from_result(problem):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    tolerances = dict(tol_res=1e-1, tol_disp=1e-2)
+    cold = fd_constrained_numpy(history=True, **tolerances, **problem)
+
+    problem["forcedensities"] = [1.01] * len(problem["edges"])
+    warm = fd_constrained_numpy(history=True, warmstart=cold, **tolerances, **problem)
+    assert len(warm.history) < len(cold.history) // 5
+
+    # supports are taken from the input
+    problem["vertices"] = [list(xyz) for xyz in problem["vertices"]]
+    problem["vertices"][0][2] = 1.0
+    moved = fd_constrained_numpy(warmstart=cold, **tolerances, **problem)
+    assert moved.vertices[0, 2] == 1.0
+
+
+def test_warmstart_from_numdata(problem):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    numdata = FDNumericalData.from_params(problem["vertices"], problem["fixed"], problem["edges"], problem["forcedensities"], problem["loads"])
+    cold = fd_constrained_numpy(warmstart=numdata, history=True, tol_res=1e-1, tol_disp=1e-2, **problem)
+    factor = numdata.factorize()
+
+    problem["forcedensities"][0] = 2.0
+    warm = fd_constrained_numpy(warmstart=numdata, history=True, tol_res=1e-1, tol_disp=1e-2, **problem)
+    assert numdata.factorize() is factor
+    assert len(warm.history) < len(cold.history)
+    assert np.allclose(warm.vertices, numdata.xyz)
+
+
+def test_warmstart_from_numdata_keeps_previous_result(problem):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    numdata = FDNumericalData.from_params(problem["vertices"], problem["fixed"], problem["edges"], problem["forcedensities"], problem["loads"])
+    cold = fd_constrained_numpy(warmstart=numdata, tol_res=1e-1, tol_disp=1e-2, **problem)
+    vertices = cold.vertices.copy()
+    residuals = cold.residuals.copy()
+
+    problem["forcedensities"] = [2.0] * len(problem["edges"])
+    warm = fd_constrained_numpy(warmstart=numdata, tol_res=1e-1, tol_disp=1e-2, **problem)
+    assert warm.vertices is not cold.vertices
+    assert np.array_equal(cold.vertices, vertices)
+    assert np.array_equal(cold.residuals, residuals)
+    assert not np.allclose(warm.vertices, vertices)
+
+
+@pytest.mark.parametrize("acceleration", ["anderson", "aitken"])
+def test_acceleration(problem, acceleration):
+    problem["fixed"] = problem["fixed"] + [vertex for vertex, constraint in enumerate(problem["constraints"]) if constraint]
+    plain = fd_constrained_numpy(history=True, kmax=1000, **problem)
+    accelerated = fd_constrained_numpy(history=True, kmax=1000, acceleration=acceleration, **problem)
+
+    assert len(accelerated.history) * 3 < len(plain.history)
+    assert np.allclose(accelerated.vertices, plain.vertices, atol=1e-2)
+    for vertex, constraint in enumerate(problem["constraints"]):
+        if isinstance(constraint, PlaneConstraint):
+            plane = constraint.geometry
+            assert np.isclose(np.dot(accelerated.vertices[vertex] - np.array(plane.point), plane.normal), 0.0)
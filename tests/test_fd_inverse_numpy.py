@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from compas_fd.solvers import RegularizationObjective
+from compas_fd.solvers import TargetForcesObjective
+from compas_fd.solvers import TargetPointsObjective
+from compas_fd.solvers import fd_inverse_numpy
+from compas_fd.solvers import fd_numpy
+
+
+def test_recovers_target_shape(params):
+    q = np.random.default_rng(0).uniform(0.5, 2.0, len(params["edges"]))
+    target = fd_numpy(**dict(params, forcedensities=q))
+
+    objective = TargetPointsObjective(target.vertices)
+    result = fd_inverse_numpy(**dict(params, forcedensities=[1.0] * len(q)), objective=objective, maxiter=2000)
+
+    assert np.allclose(result.vertices, target.vertices, atol=1e-3)
+    free = np.setdiff1d(np.arange(len(params["vertices"])), params["fixed"])
+    assert np.allclose(result.residuals[free], 0, atol=1e-8)
+
+
+def test_bounds(params):
+    m = len(params["edges"])
+    objective = TargetForcesObjective([1.0] * m)
+    result = fd_inverse_numpy(**dict(params, forcedensities=[1.0] * m), objective=objective, bounds=(0.8, 1.5))
+
+    assert np.all(np.array(result.forcedensities) >= 0.8)
+    assert np.all(np.array(result.forcedensities) <= 1.5)
+
+
+def test_target_forces(params):
+    m = len(params["edges"])
+    start = fd_numpy(**dict(params, forcedensities=[1.0] * m))
+    forces = np.array(start.forces).ravel()
+    edges = [0, 10, 20]
+
+    objective = TargetForcesObjective(1.2 * forces[edges], edges=edges) + RegularizationObjective([1.0] * m, weight=1e-6)
+    result = fd_inverse_numpy(**dict(params, forcedensities=[1.0] * m), objective=objective)
+
+    assert np.allclose(np.array(result.forces).ravel()[edges], 1.2 * forces[edges], rtol=1e-3)
+
+
+def test_not_converged_warns(params):
+    m = len(params["edges"])
+    objective = TargetForcesObjective([1.0] * m)
+    with pytest.warns(RuntimeWarning, match="did not converge"):
+        result = fd_inverse_numpy(**dict(params, forcedensities=[1.0] * m), objective=objective, maxiter=1)
+    assert len(result.forcedensities) == m
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from compas_fd.solvers import FDOperator
+from compas_fd.solvers import LinearSolver
+from compas_fd.solvers import fd_matrix_free_numpy
+from compas_fd.solvers import fd_numpy
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+def test_operator_matches_matrices(params):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    n = len(params["vertices"])
+    A = FDOperator(params["edges"], params["forcedensities"], n)
+    Ai = FDOperator(params["edges"], params["forcedensities"], n, numdata.free)
+
+    X = np.random.default_rng(0).normal(size=(n, 3))
+    assert np.allclose(A.dot(X), numdata.A.dot(X))
+    assert np.allclose(Ai.dot(X[numdata.free]), numdata.Ai.dot(X[numdata.free]))
+    assert np.allclose(Ai.matvec(X[numdata.free, 0]), numdata.Ai.dot(X[numdata.free, 0]))
+    assert np.allclose(Ai.diagonal(), numdata.Ai.diagonal())
+
+
+def test_matrix_free_matches_fd_numpy(params):
+    result = fd_matrix_free_numpy(**params)
+    expected = fd_numpy(**params)
+
+    assert np.allclose(result.vertices, expected.vertices)
+    assert np.allclose(result.residuals, expected.residuals, atol=1e-8)
+    assert np.allclose(result.forces, expected.forces)
+    assert np.allclose(result.lengths, expected.lengths)
+
+
+def test_operator_requires_jacobi_preconditioner(params):
+    A = FDOperator(params["edges"], params["forcedensities"], len(params["vertices"]))
+    with pytest.raises(ValueError):
+        LinearSolver.get_solver_cls("cg")(A, preconditioner="ilu")
+
+
+def test_matrix_free_not_converged_warns(params):
+    with pytest.warns(RuntimeWarning):
+        fd_matrix_free_numpy(maxiter=2, **params)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Frame
+from compas.geometry import Line
+
+from compas_fd.constraints import Constraint
+from compas_fd.constraints import LineConstraint
+from compas_fd.solvers import fd_constrained_newton_numpy
+from compas_fd.solvers import fd_constrained_nullspace_numpy
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers.constraint_groups import group_constraints
+
+
+@pytest.fixture
+def circle_problem():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    mesh.translate([-5, -5, 0])
+    vertices = mesh.vertices_attributes("xyz")
+    edges = list(mesh.edges())
+    circle = Circle(6.0, Frame([0, 0, 0], [1, 0, 0], [0, 0.8, 0.6]))
+    constraints = [None] * len(vertices)
+    boundary = list(mesh.vertices_where(vertex_degree=3))
+    for vertex in boundary:
+        constraints[vertex] = Constraint(circle)
+    fixed = list(mesh.vertices_where(vertex_degree=2)) + boundary
+
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[1.0] * len(edges), loads=[[0, 0, -0.1]] * len(vertices), constraints=constraints)
+
+
+def test_circle_constraints(circle_problem):
+    result = fd_constrained_newton_numpy(history=True, **circle_problem)
+    assert len(result.history) < 10
+    assert result.history[-1].max_residual < 1e-8
+    assert result.history[-1].max_tangent_residual < 1e-8
+
+    expected = fd_constrained_numpy(kmax=1000, tol_res=1e-10, tol_disp=1e-10, acceleration="anderson", **circle_problem)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_converges_faster_than_linearization(circle_problem):
+    newton = fd_constrained_newton_numpy(history=True, tol_res=1e-10, **circle_problem)
+    linearized = fd_constrained_nullspace_numpy(history=True, tol_disp=1e-10, **circle_problem)
+    assert len(newton.history) < len(linearized.history)
+    assert np.allclose(newton.vertices, linearized.vertices, atol=1e-8)
+
+
+def test_circle_curvature():
+    circle = Circle(2.0, Frame([1, 2, 3], [0, 1, 0], [0, 0, 1]))
+    constraints = [Constraint(circle) for _ in range(3)]
+    (group,) = group_constraints(constraints)
+    xyz = np.array([[1, 5, 3], [1, 2, 0], [1, 0, 4]], dtype=float)
+    origin, basis = group.tangent_space(xyz, np.zeros_like(xyz))
+    curvature = group.curvature()
+    # the curvature vectors point to the center, with a length of one over the radius
+    assert np.allclose(curvature[:, :, 0, 0], ([1, 2, 3] - origin) / 4.0)
+    assert np.allclose(curvature[:, :, 1], 0.0)
+
+
+class Segment(Line):
+    pass
+
+
+class SegmentConstraint(LineConstraint):
+    pass
+
+
+def test_unsupported_constraint(circle_problem, monkeypatch):
+    monkeypatch.setitem(Constraint.GEOMETRY_CONSTRAINT, Segment, SegmentConstraint)
+    vertex = circle_problem["fixed"][0]
+    circle_problem["constraints"][vertex] = Constraint(Segment([0, 0, 0], [0, 10, 0]))
+
+    with pytest.raises(ValueError, match="SegmentConstraint"):
+        fd_constrained_newton_numpy(**circle_problem)
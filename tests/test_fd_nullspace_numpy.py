@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Plane
+from compas.geometry import Vector
+
+from compas_fd.constraints import Constraint
+from compas_fd.constraints import LineConstraint
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_constrained_nullspace_numpy
+
+
+@pytest.fixture
+def problem():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    loads = [[0, 0, -0.1] for _ in range(len(vertices))]
+    q = [1.0] * len(edges)
+
+    constraints = [None] * len(vertices)
+    for vertex in mesh.vertices_where(vertex_degree=3):
+        x, y, z = mesh.vertex_coordinates(vertex)
+        if x == 0:
+            constraints[vertex] = Constraint(Line([0, 0, 0], [0, 10, 0]))
+        elif x == 10:
+            constraints[vertex] = Constraint(Plane([10, 0, 0], [1, 0, 0.5]))
+        elif y == 0:
+            constraints[vertex] = Constraint(Vector(0, 1, 0))
+        else:
+            constraints[vertex] = Constraint(Frame([0, 10, 0], [1, 0, 0], [0, 0, 1]))
+    fixed += [vertex for vertex, constraint in enumerate(constraints) if constraint]
+
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads, constraints=constraints)
+
+
+@pytest.fixture
+def circle_problem():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    mesh.translate([-5, -5, 0])
+    vertices = mesh.vertices_attributes("xyz")
+    edges = list(mesh.edges())
+    circle = Circle(6.0, Frame.worldXY())
+    constraints = [None] * len(vertices)
+    boundary = list(mesh.vertices_where(vertex_degree=3))
+    for vertex in boundary:
+        constraints[vertex] = Constraint(circle)
+    fixed = list(mesh.vertices_where(vertex_degree=2)) + boundary
+
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[1.0] * len(edges), loads=[[0, 0, -0.1]] * len(vertices), constraints=constraints)
+
+
+def test_affine_constraints_in_one_solve(problem):
+    result = fd_constrained_nullspace_numpy(history=True, **problem)
+    assert len(result.history) == 1
+    assert result.history[0].max_residual < 1e-10
+    assert result.history[0].max_tangent_residual < 1e-10
+
+    expected = fd_constrained_numpy(kmax=1000, tol_res=1e-9, tol_disp=1e-10, acceleration="anderson", **problem)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_circle_constraints(circle_problem):
+    result = fd_constrained_nullspace_numpy(tol_disp=1e-10, history=True, **circle_problem)
+    assert result.history[-1].max_tangent_residual < 1e-8
+
+    boundary = [vertex for vertex, constraint in enumerate(circle_problem["constraints"]) if constraint]
+    assert np.allclose(np.linalg.norm(result.vertices[boundary, :2], axis=1), 6.0)
+    assert np.allclose(result.vertices[boundary, 2], 0.0)
+
+    expected = fd_constrained_numpy(kmax=1000, tol_res=1e-10, tol_disp=1e-10, acceleration="anderson", **circle_problem)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_line_end_holds_vertex():
+    # a vertex pulled beyond the end of its line stays at the end
+    vertices = [[0, 0, 0], [5, 0, 0], [10, 0, 0]]
+    constraints = [None, Constraint(Line([4, 0, 0], [5, 0, 0])), None]
+    loads = [[0, 0, 0], [10, 0, 0], [0, 0, 0]]
+    result = fd_constrained_nullspace_numpy(vertices=vertices, fixed=[0, 2], edges=[(0, 1), (1, 2)], forcedensities=[1.0, 1.0], loads=loads, constraints=constraints)
+    assert np.allclose(result.vertices[1], [5, 0, 0])
+
+
+class Segment(Line):
+    pass
+
+
+class SegmentConstraint(LineConstraint):
+    pass
+
+
+def test_unsupported_constraint(problem, monkeypatch):
+    monkeypatch.setitem(Constraint.GEOMETRY_CONSTRAINT, Segment, SegmentConstraint)
+    vertex = problem["fixed"][0]
+    problem["constraints"][vertex] = Constraint(Segment([0, 0, 0], [0, 10, 0]))
+
+    with pytest.raises(ValueError, match="SegmentConstraint"):
+        fd_constrained_nullspace_numpy(**problem)
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+from compas.matrices import connectivity_matrix
+from scipy.sparse import diags
+from scipy.sparse.linalg import spsolve
+
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+@pytest.fixture
+def numdata(params):
+    return FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+
+
+def test_factorization_is_cached(numdata):
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    x = numdata.solve(b)
+    factor = numdata.factorize()
+    assert numdata.factorize() is factor
+    assert np.allclose(x, spsolve(numdata.Ai, b))
+
+
+def test_factorization_is_invalidated(numdata):
+    factor = numdata.factorize()
+    numdata.update_forcedensities([0, 1, 2], [2.0, 3.0, 4.0], max_rank=0)
+    assert numdata.factorize() is not factor
+
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    assert np.allclose(numdata.solve(b), spsolve(numdata.Ai, b))
+
+
+def test_update_forcedensities_matches_rebuild(numdata):
+    factor = numdata.factorize()
+    edges = [0, 5, 17]
+    qs = [2.0, 0.5, 3.0]
+    numdata.update_forcedensities(edges, qs)
+
+    q = numdata.q.flatten()
+    q[edges] = qs
+    vertices = numdata.xyz
+    other = FDNumericalData.from_params(vertices, numdata.fixed, numdata.edges, q, numdata.p)
+    assert np.allclose(numdata.A.toarray(), other.A.toarray())
+    assert np.allclose(numdata.Ai.toarray(), other.Ai.toarray())
+    assert np.allclose(numdata.Af.toarray(), other.Af.toarray())
+
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    assert numdata.factorize() is factor
+    assert np.allclose(numdata.solve(b), spsolve(other.Ai, b))
+
+
+def test_update_forcedensities_exceeding_rank(numdata):
+    factor = numdata.factorize()
+    edges = list(range(10))
+    numdata.update_forcedensities(edges, [2.0] * 10, max_rank=5)
+    assert numdata.factorize() is not factor
+
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    assert np.allclose(numdata.solve(b), spsolve(numdata.Ai, b))
+
+
+def test_update_forcedensities_from_zero():
+    vertices = [[0, 0, 0], [1, 0, 0], [2, 0, 0], [1, 1, 0]]
+    edges = [(0, 1), (1, 2), (1, 3), (0, 3)]
+    numdata = FDNumericalData.from_params(vertices, [0, 2], edges, [1.0, 1.0, 0.0, 1.0])
+    numdata.update_forcedensities([2], [1.0])
+    other = FDNumericalData.from_params(vertices, [0, 2], edges, [1.0, 1.0, 1.0, 1.0])
+    assert np.allclose(numdata.A.toarray(), other.A.toarray())
+    assert np.allclose(numdata.Ai.toarray(), other.Ai.toarray())
+    assert np.allclose(numdata.Af.toarray(), other.Af.toarray())
+
+
+def test_from_mesh_to_mesh():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    mesh.update_default_edge_attributes(q=1.0)
+    mesh.update_default_vertex_attributes(is_anchor=False, px=0.0, py=0.0, pz=-0.1)
+    mesh.delete_vertex(55)
+    for vertex in mesh.vertices_where(vertex_degree=2):
+        mesh.vertex_attribute(vertex, "is_anchor", True)
+    edge = next(iter(mesh.edges()))
+    mesh.edge_attribute(edge, "q", 3.0)
+    # the attributes of an edge do not depend on its direction
+    u, v = list(mesh.edges())[1]
+    mesh.edge_attribute((v, u), "q", 2.0)
+
+    numdata = FDNumericalData.from_mesh(mesh)
+
+    vertex_index = mesh.vertex_index()
+    assert numdata.vertex_keys == list(mesh.vertices())
+    assert numdata.edge_keys == list(mesh.edges())
+    assert sorted(numdata.fixed) == sorted(vertex_index[vertex] for vertex in mesh.vertices_where(is_anchor=True))
+    assert numdata.q[0, 0] == 3.0
+    assert numdata.q[1, 0] == 2.0
+    assert np.allclose(numdata.p[:, 2], -0.1)
+
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    numdata.xyz[numdata.free] = numdata.solve(b)
+    numdata.residuals = numdata.p - numdata.A.dot(numdata.xyz)
+    numdata.lengths = np.linalg.norm(numdata.C.dot(numdata.xyz), axis=1).reshape((-1, 1))
+    numdata.forces = numdata.q * numdata.lengths
+    numdata.to_mesh(mesh)
+
+    for index, vertex in enumerate(numdata.vertex_keys):
+        assert np.allclose(mesh.vertex_attributes(vertex, "xyz"), numdata.xyz[index])
+        assert np.allclose(mesh.vertex_attributes(vertex, ["_rx", "_ry", "_rz"]), numdata.residuals[index])
+    for index, edge in enumerate(numdata.edge_keys):
+        assert mesh.edge_attribute(edge, "_f") == numdata.forces[index, 0]
+        assert mesh.edge_attribute(edge, "_l") == numdata.lengths[index, 0]
+
+
+def test_assembly_matches_triple_products():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))[::-1] + [12, 5]
+    edges = list(mesh.edges())
+    q = np.linspace(0.0, 2.0, len(edges))
+    numdata = FDNumericalData.from_params(vertices, fixed, edges, q)
+
+    C = connectivity_matrix(edges, "csr")
+    Q = diags([q], [0])
+    Ci = C[:, numdata.free]
+    Cf = C[:, numdata.fixed]
+    assert np.allclose(numdata.C.toarray(), C.toarray())
+    assert np.allclose(numdata.A.toarray(), (C.T @ Q @ C).toarray())
+    assert np.allclose(numdata.Ai.toarray(), (Ci.T @ Q @ Ci).toarray())
+    assert np.allclose(numdata.Af.toarray(), (Ci.T @ Q @ Cf).toarray())
+
+    numdata.q[:] = 1.0
+    numdata.assemble()
+    Q = diags([np.ones(len(edges))], [0])
+    assert np.allclose(numdata.Af.toarray(), (Ci.T @ Q @ Cf).toarray())
+
+
+def test_free_and_fixed_arrays():
+    vertices = [[0, 0, 0], [1, 0, 0], [2, 0, 0], [1, 1, 0], [2, 1, 0]]
+    edges = [(0, 1), (1, 2), (1, 3), (3, 4)]
+    numdata = FDNumericalData.from_params(vertices, [4, 0, 2, 0], edges, [1.0] * 4)
+    assert numdata.fixed.tolist() == [0, 2, 4]
+    assert numdata.free.tolist() == [1, 3]
+    assert numdata.permutation.tolist() == [1, 3, 0, 2, 4]
+
+
+def test_to_result_before_solve(numdata):
+    result = numdata.to_result()
+    assert result.residuals is None
+    assert np.allclose(result.vertices, numdata.xyz)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+
+from compas_fd.solvers import fd_numpy
+
+
+@pytest.mark.parametrize("solver", ["lu", "cg"])
+def test_load_cases_match_single_cases(solver):
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    q = np.random.default_rng(0).uniform(0.5, 5.0, len(edges))
+    cases = np.random.default_rng(1).normal(size=(4, len(vertices), 3))
+
+    result = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=cases, solver=solver)
+
+    assert result.vertices.shape == (4, len(vertices), 3)
+    assert result.forces.shape == (4, len(edges), 1)
+    for i, loads in enumerate(cases):
+        single = fd_numpy(vertices=vertices, fixed=fixed, edges=edges, forcedensities=q, loads=loads, solver=solver)
+        assert np.allclose(result.vertices[i], single.vertices)
+        assert np.allclose(result.residuals[i], single.residuals)
+        assert np.allclose(result.forces[i], single.forces)
+        assert np.allclose(result.lengths[i], single.lengths)
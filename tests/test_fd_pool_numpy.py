@@ -0,0 +1,86 @@
+import numpy as np
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Frame
+from compas.geometry import Line
+
+from compas_fd.constraints import Constraint
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_constrained_pool_numpy
+
+
+def make_job(q):
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    constraints = [None] * len(vertices)
+    for vertex in mesh.vertices_where(vertex_degree=3):
+        x, y, z = vertices[vertex]
+        if x == 0:
+            constraints[vertex] = Constraint(Line([0, 0, 0], [0, 10, 0]))
+    loads = [[0, 0, -1] for _ in range(len(vertices))]
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[q] * len(edges), loads=loads, constraints=constraints)
+
+
+def test_pool_matches_serial_and_reports_errors():
+    jobs = [make_job(1.0), make_job(2.0), make_job(3.0)]
+    jobs[1]["edges"] = jobs[1]["edges"][:-1]
+
+    outcomes = {outcome.index: outcome for outcome in fd_constrained_pool_numpy(jobs, max_workers=2, chunksize=2)}
+
+    assert sorted(outcomes) == [0, 1, 2]
+    assert outcomes[1].result is None
+    assert outcomes[1].error is not None
+
+    for index in (0, 2):
+        assert outcomes[index].error is None
+        expected = fd_constrained_numpy(**make_job(jobs[index]["forcedensities"][0]))
+        assert np.allclose(outcomes[index].result.vertices, expected.vertices)
+
+
+def make_circle_job():
+    mesh = Mesh.from_meshgrid(dx=10, nx=10)
+    mesh.translate([-5, -5, 0])
+    vertices = mesh.vertices_attributes("xyz")
+    edges = list(mesh.edges())
+    circle = Circle(6.0, Frame.worldXY())
+    boundary = list(mesh.vertices_where(vertex_degree=3))
+    constraints = [Constraint(circle) if vertex in boundary else None for vertex in range(len(vertices))]
+    fixed = list(mesh.vertices_where(vertex_degree=2)) + boundary
+    loads = [[0, 0, -0.1] for _ in range(len(vertices))]
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[1.0] * len(edges), loads=loads, constraints=constraints)
+
+
+class UnpicklableError(Exception):
+    def __init__(self):
+        super(UnpicklableError, self).__init__("unpicklable")
+        self.function = lambda: None
+
+
+def failing_callback(info):
+    raise UnpicklableError()
+
+
+def test_circle_constraint_data_round_trip():
+    constraint = Constraint(Circle(6.0, Frame.worldXY()))
+    other = type(constraint).__from_data__(constraint.__data__)
+    assert type(other) is type(constraint)
+    assert isinstance(other.geometry, Circle)
+    assert other.geometry.radius == 6.0
+
+
+def test_pool_circle_constraints_and_unpicklable_errors():
+    jobs = [make_circle_job(), dict(make_job(1.0), callback=failing_callback), make_job(2.0)]
+
+    outcomes = {outcome.index: outcome for outcome in fd_constrained_pool_numpy(jobs, max_workers=2, chunksize=3)}
+
+    assert outcomes[0].error is None
+    expected = fd_constrained_numpy(**make_circle_job())
+    assert np.allclose(outcomes[0].result.vertices, expected.vertices)
+
+    assert outcomes[1].result is None
+    assert "UnpicklableError" in outcomes[1].error
+    assert "failing_callback" in outcomes[1].traceback
+
+    assert outcomes[2].error is None
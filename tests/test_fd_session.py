@@ -0,0 +1,67 @@
+import numpy as np
+from compas.geometry import Line
+
+from compas_fd.constraints import Constraint
+from compas_fd.solvers import FDSession
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_numpy
+
+
+def test_edits_match_fd_numpy(params):
+    session = FDSession(**params)
+    session.solve()
+    factor = session.numdata.factorize()
+
+    session.set_forcedensities([3, 8], [2.0, 0.5])
+    session.set_loads([40, 41], [[0.1, 0, -0.5]] * 2)
+    session.move_vertices([params["fixed"][0]], [[0, 0, 2]])
+    result = session.solve()
+
+    # the edits do not require a new factorization
+    assert session.numdata.factorize() is factor
+
+    q = np.array(params["forcedensities"])
+    q[[3, 8]] = [2.0, 0.5]
+    loads = np.array(params["loads"])
+    loads[[40, 41]] = [0.1, 0, -0.5]
+    vertices = np.array(params["vertices"])
+    vertices[params["fixed"][0]] = [0, 0, 2]
+    expected = fd_numpy(vertices=vertices, fixed=params["fixed"], edges=params["edges"], forcedensities=q, loads=loads)
+
+    assert np.allclose(result.vertices, expected.vertices)
+    assert np.allclose(result.residuals, expected.residuals)
+    assert np.allclose(result.forces, expected.forces)
+
+
+def test_results_are_not_changed_by_edits(params):
+    session = FDSession(**params)
+    first = session.solve()
+    vertices = first.vertices.copy()
+
+    session.set_loads(list(range(len(vertices))), [[0, 0, -1.0]] * len(vertices))
+    session.solve()
+
+    assert np.array_equal(first.vertices, vertices)
+
+
+def test_toggle_constraint(params):
+    session = FDSession(**params)
+    session.solve()
+    vertex = 5
+    line = Line([0, 0, 0], [0, 10, 3])
+
+    session.set_constraint(vertex, Constraint(line))
+    assert vertex in session.fixed
+    result = session.solve(kmax=500, tol_res=1e-6, tol_disp=1e-8)
+
+    constraints = [None] * len(params["vertices"])
+    constraints[vertex] = Constraint(line)
+    expected = fd_constrained_numpy(**dict(params, fixed=params["fixed"] + [vertex]), constraints=constraints, kmax=500, tol_res=1e-6, tol_disp=1e-8)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-4)
+    assert np.linalg.norm(result.vertices[vertex] - params["vertices"][vertex]) > 0.1
+
+    # the vertex remains a support at its position on the line
+    position = result.vertices[vertex].copy()
+    session.set_constraint(vertex, None)
+    result = session.solve()
+    assert np.allclose(result.vertices[vertex], position)
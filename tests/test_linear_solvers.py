@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from compas_fd.solvers import LinearSolver
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_numpy
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+@pytest.mark.parametrize(
+    "solver, options",
+    [
+        ("lu", {}),
+        ("lu", {"symmetric": True}),
+        ("cg", {"preconditioner": None}),
+        ("cg", {"preconditioner": "jacobi"}),
+        ("cg", {"preconditioner": "ilu"}),
+        ("cg", {"preconditioner": "amg"}),
+        ("cholesky", {}),
+    ],
+)
+def test_solvers_match_lu(params, solver, options):
+    if solver == "cholesky":
+        pytest.importorskip("sksparse")
+    if options.get("preconditioner") == "amg":
+        pytest.importorskip("pyamg")
+    expected = fd_numpy(**params)
+    result = fd_numpy(solver=solver, solver_options=options, **params)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_cg_warm_start(params):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    numdata.set_solver("cg", preconditioner="jacobi")
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    x = numdata.solve(b)
+    cold = numdata.factorize().iterations
+    assert numdata.factorize().converged
+
+    numdata.solve(b, x0=x)
+    assert numdata.factorize().iterations < cold
+
+
+def test_cg_zero_rhs_with_initial_guess(params):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"])
+    numdata.set_solver("cg", preconditioner="jacobi")
+    b = np.zeros((len(numdata.free), 3))
+    x0 = np.random.default_rng(0).normal(size=b.shape)
+
+    x = numdata.solve(b, x0)
+    assert numdata.factorize().converged
+    assert numdata.factorize().iterations < len(numdata.free)
+    assert np.abs(x).max() < 1e-6
+
+
+def test_cg_not_converged_warns(params):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    numdata.set_solver("cg", preconditioner=None, maxiter=2)
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    with pytest.warns(RuntimeWarning):
+        numdata.solve(b)
+
+
+def test_cg_update_forcedensities(params):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], params["forcedensities"], params["loads"])
+    numdata.set_solver("cg")
+    factor = numdata.factorize()
+    numdata.update_forcedensities([0, 1], [3.0, 4.0])
+    assert numdata.factorize() is not factor
+
+    b = numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed])
+    assert np.allclose(numdata.Ai.dot(numdata.solve(b)), b)
+
+
+def test_constrained_with_cg(params):
+    constraints = [None] * len(params["vertices"])
+    expected = fd_constrained_numpy(constraints=constraints, **params)
+    result = fd_constrained_numpy(constraints=constraints, solver="cg", solver_options={"preconditioner": "ilu"}, **params)
+    assert np.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_unknown_solver():
+    with pytest.raises(ValueError):
+        LinearSolver.get_solver_cls("qr")
+
+
+def test_symmetric_lu_compression_pivoting():
+    vertices = [[0, 0, 0], [1, 0.3, 0.7], [2, 0.1, 0.2], [3, 0, 0]]
+    edges = [(0, 1), (1, 2), (2, 3)]
+    loads = [[0.3, 0.7, -1.1]] * 4
+    # the negative force density almost cancels the diagonal entry of the first free vertex
+    q = [2.7, -1.3 + 1e-12, 1.3]
+
+    result = fd_numpy(vertices=vertices, fixed=[0, 3], edges=edges, forcedensities=q, loads=loads, solver_options={"symmetric": True})
+    assert np.abs(result.residuals[1:3]).max() < 1e-8
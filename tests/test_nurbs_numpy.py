@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from compas.geometry import Circle
+from compas.geometry import Frame
+
+from compas_fd.solvers import nurbs_numpy
+from compas_fd.solvers.nurbs_numpy import CircleEvaluator
+from compas_fd.solvers.nurbs_numpy import NurbsCurveEvaluator
+from compas_fd.solvers.nurbs_numpy import NurbsSurfaceEvaluator
+
+H = 0.5 * 2**0.5
+
+
+@pytest.fixture
+def circle():
+    points = [[1, 0, 0], [1, 1, 0], [0, 1, 0], [-1, 1, 0], [-1, 0, 0], [-1, -1, 0], [0, -1, 0], [1, -1, 0], [1, 0, 0]]
+    weights = [1, H, 1, H, 1, H, 1, H, 1]
+    knots = [0, 0, 0, 0.25, 0.25, 0.5, 0.5, 0.75, 0.75, 1, 1, 1]
+    return NurbsCurveEvaluator(points, weights, knots, 2)
+
+
+@pytest.fixture
+def cylinder():
+    points = [[[1, 0, z], [1, 1, z], [0, 1, z]] for z in (0, 2)]
+    points = np.transpose(points, (1, 0, 2))
+    weights = [[1, 1], [H, H], [1, 1]]
+    return NurbsSurfaceEvaluator(points, weights, [0, 0, 0, 1, 1, 1], [0, 0, 1, 1], 2, 1)
+
+
+@pytest.fixture
+def closed_cylinder():
+    ring = [[1, 0], [1, 1], [0, 1], [-1, 1], [-1, 0], [-1, -1], [0, -1], [1, -1], [1, 0]]
+    points = [[[x, y, z] for z in (0, 2)] for x, y in ring]
+    weights = [[w, w] for w in (1, H, 1, H, 1, H, 1, H, 1)]
+    knots = [0, 0, 0, 0.25, 0.25, 0.5, 0.5, 0.75, 0.75, 1, 1, 1]
+    return NurbsSurfaceEvaluator(points, weights, knots, [0, 0, 1, 1], 2, 1)
+
+
+def test_curve_derivatives(circle):
+    t = np.array([0.1, 0.3, 0.6, 0.9])
+    e = 1e-6
+    C = circle.derivatives_at(t)
+    assert np.allclose(np.linalg.norm(C[0], axis=1), 1.0)
+    assert np.allclose((circle.point_at(t + e) - circle.point_at(t - e)) / (2 * e), C[1], atol=1e-6)
+    assert np.allclose((circle.derivatives_at(t + e, 1)[1] - circle.derivatives_at(t - e, 1)[1]) / (2 * e), C[2], atol=1e-6)
+
+
+def test_curve_closest_points(circle):
+    points = np.random.default_rng(0).uniform(-3, 3, (500, 3))
+    closest, params = circle.closest_points(points)
+    expected = points * [1, 1, 0]
+    expected /= np.linalg.norm(expected, axis=1).reshape((-1, 1))
+    assert np.allclose(closest, expected)
+    assert np.allclose(circle.point_at(params), closest)
+
+
+def test_surface_closest_points(cylinder):
+    rng = np.random.default_rng(0)
+    points = np.hstack((rng.uniform(0.2, 3, (500, 2)), rng.uniform(0.1, 1.9, (500, 1))))
+    closest, params = cylinder.closest_points(points)
+    expected = points.copy()
+    expected[:, :2] /= np.linalg.norm(points[:, :2], axis=1).reshape((-1, 1))
+    assert np.allclose(closest, expected)
+    normals = cylinder.normal_at(params[:, 0], params[:, 1])
+    assert np.allclose(np.abs(normals), np.abs(expected * [1, 1, 0]))
+
+
+def test_circle_evaluator():
+    circle = Circle(2.0, Frame([1, 2, 3], [0, 1, 0], [0, 0, 1]))
+    evaluator = CircleEvaluator.from_geometry(circle)
+    for t in (0.1, 0.45, 0.8):
+        assert np.allclose(evaluator.point_at([t])[0], circle.point_at(t))
+        assert np.allclose(evaluator.tangent_at([t])[0], circle.tangent_at(t))
+    closest, params = evaluator.closest_points(evaluator.point_at([0.1, 0.7]) + [5, 0, 0])
+    assert np.allclose(params, [0.1, 0.7])
+
+    t = np.array([0.1, 0.45, 0.8])
+    e = 1e-6
+    C = evaluator.derivatives_at(t, order=3)
+    assert np.allclose(C[0], evaluator.point_at(t))
+    for d in range(1, 4):
+        assert np.allclose((evaluator.derivatives_at(t + e, d - 1)[d - 1] - evaluator.derivatives_at(t - e, d - 1)[d - 1]) / (2 * e), C[d], rtol=1e-6, atol=1e-4)
+
+
+def test_curve_closest_points_warm_start(circle):
+    points = np.random.default_rng(0).uniform(-3, 3, (500, 3))
+    closest, params = circle.closest_points(points)
+    moved = points + np.random.default_rng(1).normal(0, 0.01, points.shape)
+    expected, _ = circle.closest_points(moved)
+    warm, _ = circle.closest_points(moved, params)
+    assert np.allclose(warm, expected)
+    # poor initial parameters fall back to the global search
+    warm, _ = circle.closest_points(moved, np.zeros(len(moved)))
+    assert np.allclose(warm, expected)
+
+
+def test_surface_closest_points_warm_start(cylinder):
+    rng = np.random.default_rng(0)
+    points = np.hstack((rng.uniform(0.2, 3, (500, 2)), rng.uniform(0.1, 1.9, (500, 1))))
+    closest, params = cylinder.closest_points(points)
+    moved = points + rng.normal(0, 0.01, points.shape)
+    expected, _ = cylinder.closest_points(moved)
+    warm, _ = cylinder.closest_points(moved, params)
+    assert np.allclose(warm, expected)
+
+
+def test_closed_surface_closest_points_warm_start(closed_cylinder, monkeypatch):
+    rng = np.random.default_rng(0)
+    # points on both sides of the seam at angle 0
+    angles = rng.uniform(-0.05, 0.05, 200)
+    radii = rng.uniform(0.5, 3, 200)
+    points = np.column_stack((radii * np.cos(angles), radii * np.sin(angles), rng.uniform(0.1, 1.9, 200)))
+    closest, params = closed_cylinder.closest_points(points)
+    # move the points to the other side of the seam
+    moved = np.column_stack((radii * np.cos(-angles), radii * np.sin(-angles), points[:, 2]))
+    expected = moved / np.linalg.norm(moved[:, :2], axis=1).reshape((-1, 1)) * [1, 1, 0] + moved * [0, 0, 1]
+    # the local search wraps across the seam without falling back to the global search
+    monkeypatch.setattr(nurbs_numpy, "_nearest", None)
+    warm, _ = closed_cylinder.closest_points(moved, params)
+    assert np.allclose(warm, expected)
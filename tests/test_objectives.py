@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from compas.datastructures import Mesh
+
+from compas_fd.solvers import LoadPathObjective
+from compas_fd.solvers import MaxForceObjective
+from compas_fd.solvers import RegularizationObjective
+from compas_fd.solvers import TargetForcesObjective
+from compas_fd.solvers import TargetLengthsObjective
+from compas_fd.solvers import TargetPointsObjective
+from compas_fd.solvers.fd_numerical_data import FDNumericalData
+
+
+def _equilibrium(params, q):
+    numdata = FDNumericalData.from_params(params["vertices"], params["fixed"], params["edges"], q, params["loads"])
+    numdata.xyz[numdata.free] = numdata.solve(numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed]))
+    return numdata
+
+
+@pytest.fixture
+def params():
+    mesh = Mesh.from_meshgrid(dx=10, nx=6)
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    loads = [[0.1, 0, -1.0] for _ in range(len(vertices))]
+    q = 1.0 + 0.5 * np.sin(np.arange(len(edges)))
+    return dict(vertices=vertices, fixed=fixed, edges=edges, loads=loads, forcedensities=q)
+
+
+@pytest.mark.parametrize(
+    "objective",
+    [
+        TargetPointsObjective([[5, 5, -3]] * 49),
+        TargetPointsObjective([[0, 0, 1], [3, 4, -2]], vertices=[14, 21], weight=2.0),
+        LoadPathObjective(),
+        MaxForceObjective(),
+        TargetLengthsObjective([2.0] * 84),
+        TargetForcesObjective([1.0, 3.0], edges=[0, 7], weight=2.0),
+        RegularizationObjective([1.0] * 84) + TargetForcesObjective([2.0] * 84),
+        LoadPathObjective(weight=0.1) + TargetPointsObjective([[5, 5, -3]] * 49),
+    ],
+)
+def test_gradient_matches_finite_differences(params, objective):
+    q = params["forcedensities"]
+    numdata = _equilibrium(params, q)
+    gradient = objective.gradient(numdata)
+
+    e = 1e-6
+    for edge in (0, 7, len(q) - 1):
+        qp = q.copy()
+        qm = q.copy()
+        qp[edge] += e
+        qm[edge] -= e
+        fd = (objective.value(_equilibrium(params, qp)) - objective.value(_equilibrium(params, qm))) / (2 * e)
+        assert np.isclose(gradient[edge], fd, rtol=1e-5, atol=1e-7)
+
+
+def test_jacobian_matches_finite_differences(params):
+    q = params["forcedensities"]
+    numdata = _equilibrium(params, q)
+    jacobian = numdata.forcedensity_jacobian()
+    assert jacobian.shape == (len(numdata.xyz), 3, len(q))
+
+    e = 1e-6
+    qp = q.copy()
+    qm = q.copy()
+    qp[3] += e
+    qm[3] -= e
+    fd = (_equilibrium(params, qp).xyz - _equilibrium(params, qm).xyz) / (2 * e)
+    assert np.allclose(jacobian[:, :, 3], fd, atol=1e-6)
+
+
+def test_gradient_after_update_forcedensities(params):
+    q = params["forcedensities"]
+    numdata = _equilibrium(params, q)
+    numdata.update_forcedensities([2, 5], [3.0, 0.5])
+    q = numdata.q[:, 0].copy()
+    numdata.xyz[numdata.free] = numdata.solve(numdata.p[numdata.free] - numdata.Af.dot(numdata.xyz[numdata.fixed]))
+
+    objective = LoadPathObjective()
+    assert np.allclose(objective.gradient(numdata), objective.gradient(_equilibrium(params, q)))
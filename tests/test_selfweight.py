@@ -1,6 +1,15 @@
+import os
+
+import numpy
 import pytest
 from compas.datastructures import Mesh
+from compas.geometry import cross_vectors
+from compas.geometry import length_vector
+
+import compas_fd
 from compas_fd.loads import SelfweightCalculator
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_numpy
 
 
 @pytest.fixture
@@ -29,3 +38,84 @@ def test_selfweight_meshgrid(meshgrid):
             area = 1.00
 
         assert selfweight[vertex] == area * t * density
+
+
+def reference_tributary_areas(calculator, xyz):
+    mesh = calculator.mesh
+    C = calculator.F.dot(xyz)
+    areas = numpy.zeros((xyz.shape[0], 1))
+    for u in mesh.vertices():
+        p0 = xyz[calculator.vertex_index[u]]
+        a = 0
+        for v in mesh.halfedge[u]:
+            p01 = xyz[calculator.vertex_index[v]] - p0
+            for fkey in (mesh.halfedge[u][v], mesh.halfedge[v][u]):
+                if fkey is not None and calculator.is_loaded[fkey]:
+                    p2 = C[calculator.fvertex_index[fkey]]
+                    a += 0.25 * length_vector(cross_vectors(p01, p2 - p0))
+        areas[calculator.vertex_index[u]] = a
+    return areas
+
+
+def test_tributary_areas_match_reference():
+    mesh = Mesh.from_obj(os.path.join(compas_fd.DATA, "hypar.obj"))
+    mesh.update_default_vertex_attributes(t=1.0)
+    calculator = SelfweightCalculator(mesh)
+    xyz = numpy.array(mesh.vertices_attributes("xyz"))
+    xyz += numpy.random.default_rng(0).normal(0, 0.1, xyz.shape)
+    calculator.is_loaded[list(mesh.faces())[0]] = False
+
+    assert numpy.array_equal(calculator.compute_tributary_areas(xyz), reference_tributary_areas(calculator, xyz))
+
+
+def _params(mesh):
+    vertices = mesh.vertices_attributes("xyz")
+    fixed = list(mesh.vertices_where(vertex_degree=2))
+    edges = list(mesh.edges())
+    return dict(vertices=vertices, fixed=fixed, edges=edges, forcedensities=[10.0] * len(edges))
+
+
+def test_fd_numpy_selfweight(meshgrid):
+    params = _params(meshgrid)
+    calls = []
+
+    def selfweight(xyz):
+        calls.append(1)
+        return SelfweightCalculator(meshgrid, density=0.1)(xyz)
+
+    result = fd_numpy(selfweight=selfweight, tol_load=1e-10, **params)
+    assert 2 < len(calls) < 100
+
+    # the selfweight is included in the residuals, such that they vanish at the free vertices
+    free = [vertex for vertex in range(len(params["vertices"])) if vertex not in params["fixed"]]
+    assert numpy.abs(result.residuals[free]).max() < 1e-6
+
+    expected = fd_constrained_numpy(constraints=[None] * len(params["vertices"]), selfweight=selfweight, kmax=1000, tol_disp=1e-12, **params)
+    assert numpy.allclose(result.vertices, expected.vertices, atol=1e-8)
+
+
+def test_fd_numpy_selfweight_load_cases(meshgrid):
+    params = _params(meshgrid)
+    selfweight = SelfweightCalculator(meshgrid, density=0.1)
+    cases = numpy.zeros((2, len(params["vertices"]), 3))
+    cases[1, :, 0] = 0.5
+
+    result = fd_numpy(selfweight=selfweight, loads=cases, tol_load=1e-10, **params)
+
+    for i, loads in enumerate(cases):
+        single = fd_numpy(selfweight=selfweight, loads=loads, tol_load=1e-10, **params)
+        assert numpy.allclose(result.vertices[i], single.vertices, atol=1e-8)
+        assert numpy.allclose(result.residuals[i], single.residuals, atol=1e-8)
+
+
+def test_fd_constrained_numpy_selfweight_refresh(meshgrid):
+    params = _params(meshgrid)
+    calculator = SelfweightCalculator(meshgrid, density=0.1)
+    calls = []
+
+    def selfweight(xyz):
+        calls.append(1)
+        return calculator(xyz)
+
+    fd_constrained_numpy(constraints=[None] * len(params["vertices"]), selfweight=selfweight, refresh=3, kmax=9, tol_disp=0.0, **params)
+    assert len(calls) == 3